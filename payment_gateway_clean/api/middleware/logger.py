@@ -1,44 +1,61 @@
 import time
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog import get_logger
 
 logger = get_logger()
 
-class LoggerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        start_time = time.time()
+class LoggerMiddleware:
+    """
+    Pure ASGI middleware that logs every HTTP request once the response is sent.
+    """
 
-        method = request.method
-        path = request.url.path
-        user_agent = request.headers.get("user-agent", "Unknown")
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        path = scope["path"]
+        user_agent = headers.get("user-agent", "Unknown")
+
+        client = scope.get("client")
         ip_address = (
-            request.headers.get("x-forwarded-for")
-            or request.headers.get("x-real-ip")
-            or (request.client.host if request.client else "127.0.0.1")
+            headers.get("x-forwarded-for")
+            or headers.get("x-real-ip")
+            or (client[0] if client else "127.0.0.1")
         )
 
-        current_user = getattr(request.state, "current_user", None)
+        current_user = scope.get("state", {}).get("current_user")
         user_id = getattr(current_user, "user_id", None)
         username = getattr(current_user, "username", None)
 
-        response = await call_next(request)
+        status_code = 500
 
-        process_time = (time.time() - start_time) * 1000
-        status_code = response.status_code
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        process_time = (time.perf_counter() - start_time) * 1000
 
         logger.info(
             "📝 HTTP Request",
             method=method,
             path=path,
             status=status_code,
-            duration=f"{process_time:.2f}ms",
+            duration_ms=round(process_time, 2),
             ip=ip_address,
             user_agent=user_agent,
             user_id=user_id,
             username=username,
         )
-
-        return response
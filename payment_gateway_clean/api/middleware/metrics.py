@@ -0,0 +1,59 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records request latency and in-flight requests.
+
+    Latency is labelled with the matched route template rather than the raw path,
+    so path parameters do not create a time series per id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start_time,
+                scope["method"],
+                route_template(scope),
+                str(status_code),
+            )
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the route that handled the request, e.g. "/api/transfer/{id}".
+    """
+    route = scope.get("route")
+    if route is None:
+        return "<unmatched>"
+
+    # The route's own path may be relative to the routers it was included
+    # through, so take the concrete prefix from the request path
+    route_segments = route.path.split("/")[1:]
+    path_segments = scope["path"].split("/")[1:]
+    prefix = path_segments[: max(len(path_segments) - len(route_segments), 0)]
+    return "/" + "/".join(prefix + route_segments)
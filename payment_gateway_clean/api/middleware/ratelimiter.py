@@ -1,48 +1,105 @@
-from datetime import datetime, timedelta
-from typing import Any, Unpack
+import math
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from structlog import get_logger
 
+from core.errors import AppError
 from core.exceptions.rate_limit_exception import RateLimitException
+from core.ratelimit.base import RateLimitBackend, RateLimitResult
+from core.security.jwt import JwtConfig
+from core.settings.base import BaseAppSettings
 
+logger = get_logger()
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+
+class RateLimitMiddleware:
     """
-    Middleware that handle requests rate limiting.
+    Pure ASGI middleware that handle requests rate limiting.
+
+    Clients are identified by the user id of a valid JWT, falling back to the
+    client IP. Limits come from ``rate_limit_routes`` for the longest matching
+    path prefix, otherwise from the user or anonymous default. Every response
+    carries the standard ``RateLimit-*`` headers.
     """
 
-    rate_limit_duration = timedelta(minutes=1)
-    rate_limit_requests = 100
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        settings: BaseAppSettings,
+        jwt_config: JwtConfig,
+    ):
+        self.app = app
+        self.backend = backend
+        self.jwt_config = jwt_config
+        self.window = settings.rate_limit_window_seconds
+        self.anonymous_limit = settings.rate_limit_requests
+        self.user_limit = settings.rate_limit_user_requests
+        self.route_limits = sorted(
+            settings.rate_limit_routes.items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
 
-    def __init__(self, *args: Unpack[tuple[Any]], **kwargs: Any):
-        super().__init__(*args, **kwargs)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        self.request_counts: dict[str, tuple[int, datetime]] = {}
+        identity, authenticated = self._identify(scope)
+        policy, limit = self._policy(scope["path"], authenticated)
 
-    
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        client_ip = request.client.host
+        try:
+            result = await self.backend.hit(f"{policy}:{identity}", limit, self.window)
+        except Exception as e:
+            # Fail open: an unavailable limiter store must not take the API down
+            logger.warning("Rate limiter backend unavailable", error=str(e))
+            await self.app(scope, receive, send)
+            return
 
-        request_count, last_request = self.request_counts.get(
-            client_ip, (0, datetime.min)
-        )
+        rate_limit_headers = self._headers(result)
+
+        if not result.allowed:
+            response = RateLimitException.get_response()
+            response.headers.update(rate_limit_headers)
+            response.headers["Retry-After"] = str(math.ceil(result.reset_after))
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.update(rate_limit_headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
-        elapsed_time = datetime.now() - last_request
+    def _identify(self, scope: Scope) -> tuple[str, bool]:
+        authorization = Headers(scope=scope).get("authorization")
+        if authorization:
+            token_prefix, _, token = authorization.partition(" ")
+            if token_prefix.lower() == "bearer" and token:
+                try:
+                    return f"user:{self.jwt_config.verify_token(token)}", True
+                except AppError:
+                    pass
 
-        if elapsed_time > self.rate_limit_duration:
-            request_count = 1
-        else:
-            if request_count >= self.rate_limit_requests:
-                return RateLimitException.get_response()
-            
-            request_count += 1
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        return f"ip:{client_ip}", False
 
-        self.request_counts[client_ip] = (request_count, datetime.now())
+    def _policy(self, path: str, authenticated: bool) -> tuple[str, int]:
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
 
-        response = await call_next(request)
+        return "*", self.user_limit if authenticated else self.anonymous_limit
 
-        return response
+    def _headers(self, result: RateLimitResult) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(result.limit),
+            "RateLimit-Remaining": str(result.remaining),
+            "RateLimit-Reset": str(math.ceil(result.reset_after)),
+            "RateLimit-Policy": f"{result.limit};w={self.window}",
+        }
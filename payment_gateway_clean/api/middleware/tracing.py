@@ -0,0 +1,46 @@
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.middleware.metrics import route_template
+from core.tracing import get_tracer, set_error, start_server_span
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that runs every HTTP request in a server span.
+
+    The span is renamed after the matched route template once the request is
+    handled, and continues the caller's trace when a traceparent header is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or get_tracer() is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with start_server_span(
+            f"{method} {scope['path']}",
+            Headers(scope=scope),
+            **{"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    set_error(span, f"HTTP {status_code}")
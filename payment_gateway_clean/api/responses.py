@@ -0,0 +1,36 @@
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.responses import Response, StreamingResponse
+
+
+class ModelResponse(Response):
+    """
+    Serializes a pydantic model straight to JSON bytes.
+
+    Returning one from a route skips FastAPI's response_model validation and
+    encoding, which would otherwise re-validate every item of a list the service
+    has just built. The route's response_model still documents the schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return to_json(content)
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Streams an async iterator of pydantic models as newline-delimited JSON.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, items: AsyncIterator[BaseModel], **kwargs):
+        super().__init__(self._encode(items), media_type=self.media_type, **kwargs)
+
+    @staticmethod
+    async def _encode(items: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+        async for item in items:
+            yield item.model_dump_json().encode("utf-8") + b"\n"
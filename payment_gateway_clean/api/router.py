@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.routes import auth, health_checker, saldo, topup, transfer, withdraw
+from api.routes import auth, health_checker, report, saldo, summary, topup, transfer, withdraw
 
 router = APIRouter()
 
@@ -19,3 +19,7 @@ router.include_router(router=transfer.router, tags=[
 
 router.include_router(router=withdraw.router, tags=[
                       "Withdraw"], prefix="/withdraw")
+
+router.include_router(router=summary.router, tags=["Summary"], prefix="/users")
+
+router.include_router(router=report.router, tags=["Report"], prefix="/reports")
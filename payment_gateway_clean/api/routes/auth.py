@@ -6,6 +6,7 @@ from domain.dtos.response.user import UserResponse
 from infrastructure.service.auth import AuthService
 from core.dependencies import get_auth_service, token_security, get_user_service
 from core.container import container
+from core.exceptions.base_exception import BaseInternalException
 from structlog import get_logger
 
 
@@ -18,7 +19,7 @@ async def register_user(
     request: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)
 ):
     """Register a new user."""
-    logger.info("🔐 Register attempt", payload=request.model_dump())
+    logger.info("🔐 Register attempt", payload=request)
     try:
         user = await auth_service.register_user(request)
 
@@ -29,6 +30,8 @@ async def register_user(
 
         logger.info("✅ User registered successfully", user=user)
         return user
+    except BaseInternalException:
+        raise
     except Exception as e:
         logger.error("🔥 Error during registration", error=str(e))
         raise HTTPException(
@@ -40,7 +43,7 @@ async def register_user(
 async def login_user(
     request: LoginRequest, auth_service: AuthService = Depends(get_auth_service)
 ):
-    logger.info("🔑 Login attempt", payload=request.model_dump())
+    logger.info("🔑 Login attempt", payload=request)
     try:
         user = await auth_service.login_user(request)
 
@@ -52,6 +55,8 @@ async def login_user(
 
         logger.info("✅ Login successful")
         return user
+    except BaseInternalException:
+        raise
     except Exception as e:
         logger.error("🔥 Error during login", error=str(e))
         raise HTTPException(
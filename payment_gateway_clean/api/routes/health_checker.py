@@ -1,9 +1,28 @@
 from fastapi import APIRouter, Depends
 from core.dependencies import token_security
+from core.container import container
 
 router = APIRouter()
 
 @router.get("")
 async def health_check(token: str =Depends(token_security)) -> dict:
     print("Hello {}".format(token))
-    return {"message": "hello health check"}
\ No newline at end of file
+    return {"message": "hello health check"}
+
+
+@router.get("/hashing")
+async def hashing_pool_stats(token: str = Depends(token_security)) -> dict:
+    """Password hashing pool queue depth, wait time and bcrypt time."""
+    return container.hashing_pool.stats()
+
+
+@router.get("/db-pool")
+async def db_pool_stats(token: str = Depends(token_security)) -> dict:
+    """Database connection pool occupancy and checkout wait time."""
+    return container.db_pool_stats()
+
+
+@router.get("/user-cache")
+async def user_cache_stats(token: str = Depends(token_security)) -> dict:
+    """User cache size, evictions and hit ratio."""
+    return container.user_cache_stats()
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from core.metrics import REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Request, database, pool and payment metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=REGISTRY.content_type)
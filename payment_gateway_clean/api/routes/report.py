@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from structlog import get_logger
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.report import ReportResponse
+from core.dependencies import get_report_service, token_security
+from domain.service.report import IReportService
+from api.responses import ModelResponse
+
+router = APIRouter()
+logger = get_logger()
+
+
+@router.get("/{kind}", response_model=ApiResponse[ReportResponse])
+async def get_report(
+    kind: Literal["topup", "transfer", "withdraw"],
+    group_by: Literal["day", "hour", "method", "user"] = Query("day", description="Bucket the totals by"),
+    start: Optional[datetime] = Query(None, description="Start of the period; defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="End of the period, exclusive; defaults to now"),
+    limit: int = Query(100, ge=1, le=1000, description="Users returned when grouping by user"),
+    report_service: IReportService = Depends(get_report_service),
+    token: str = Depends(token_security),
+):
+    """Retrieve the totals and counts of topups, transfers or withdrawals per day, hour, method or user."""
+    logger.info("📈 Fetching report", kind=kind, group_by=group_by, start=start, end=end)
+    try:
+        response = await report_service.get_report(kind, group_by, start, end, limit)
+    except Exception as e:
+        logger.error("🔥 Error while getting report", kind=kind, error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    if isinstance(response, ErrorResponse):
+        logger.warning("❌ Report not available", kind=kind, error=response.message)
+        raise HTTPException(status_code=400, detail=response.message)
+    logger.info("✅ Report retrieved", kind=kind, group_by=group_by, rows=len(response.data.rows))
+    return ModelResponse(response)
@@ -1,30 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
 from typing import List, Optional
 from structlog import get_logger
 from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.saldo import SaldoResponse
-from core.dependencies import get_saldo_service, token_security
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.saldo import SaldoBalanceAtResponse, SaldoResponse
+from core.container import container
+from core.dependencies import get_saldo_service, get_pagination, token_security
 from domain.service.saldo import ISaldoService
+from api.responses import ModelResponse, NDJSONResponse
 
 router = APIRouter()
 logger = get_logger()
 
 
-@router.get("/", response_model=ApiResponse[List[SaldoResponse]])
+@router.get("/", response_model=PaginatedApiResponse[List[SaldoResponse]])
 async def get_saldos(
+    pagination: PaginationRequest = Depends(get_pagination),
+    stream: bool = Query(False, description="Stream every saldo after the cursor as NDJSON"),
     token: str = Depends(token_security),
     saldo_service: ISaldoService = Depends(get_saldo_service),
 ):
-    """Retrieve a list of all saldos."""
-    logger.info("📦 Fetching all saldos")
+    """Retrieve a page of saldos, or stream all of them as NDJSON."""
+    if stream:
+        logger.info("📦 Streaming saldos", cursor=pagination.cursor)
+        # The body is sent after the route returns, so the stream opens a unit
+        # of work of its own instead of borrowing the request's session
+        return NDJSONResponse(
+            container.stream(
+                container.saldo_service, lambda service: service.stream_saldos(pagination.cursor)
+            )
+        )
+
+    logger.info("📦 Fetching saldos", limit=pagination.limit, cursor=pagination.cursor)
     try:
-        response = await saldo_service.get_saldos()
+        response = await saldo_service.get_saldos(pagination)
         if isinstance(response, ErrorResponse):
             logger.warning("⚠️ Failed to get saldos", error=response.message)
             raise HTTPException(status_code=500, detail=response.message)
         logger.info("✅ Saldos retrieved successfully")
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting saldos", error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -70,6 +86,27 @@ async def get_saldo_user(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.get("/user/{user_id}/at", response_model=ApiResponse[SaldoBalanceAtResponse])
+async def get_saldo_user_at(
+    user_id: int,
+    at: datetime = Query(..., description="Point in time to compute the balance at"),
+    saldo_service: ISaldoService = Depends(get_saldo_service),
+    token: str = Depends(token_security),
+):
+    """Retrieve a user's balance as of a point in time, computed from the ledger."""
+    logger.info("🕰️ Fetching historical balance for user", user_id=user_id, at=at.isoformat())
+    try:
+        response = await saldo_service.get_saldo_user_at(user_id, at)
+        if isinstance(response, ErrorResponse):
+            logger.warning("❌ Historical balance not available", user_id=user_id)
+            raise HTTPException(status_code=404, detail=response.message)
+        logger.info("✅ Historical balance retrieved", user_id=user_id)
+        return response
+    except Exception as e:
+        logger.error("🔥 Error while getting historical balance", user_id=user_id, error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
 @router.get("/users/{user_id}", response_model=ApiResponse[Optional[List[SaldoResponse]]])
 async def get_saldo_users(
     user_id: int,
@@ -84,7 +121,7 @@ async def get_saldo_users(
             logger.warning("❌ No saldos found for user", user_id=user_id)
             raise HTTPException(status_code=404, detail=response.message)
         logger.info("✅ All saldos for user retrieved", user_id=user_id)
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting saldos for user", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -97,7 +134,7 @@ async def create_saldo(
     token: str = Depends(token_security),
 ):
     """Create a new saldo."""
-    logger.info("📝 Creating new saldo", data=input.model_dump())
+    logger.info("📝 Creating new saldo", data=input)
     try:
         response = await saldo_service.create_saldo(input)
         if isinstance(response, ErrorResponse):
@@ -118,8 +155,8 @@ async def update_saldo(
     token: str = Depends(token_security),
 ):
     """Update an existing saldo by its ID."""
-    input.id = id
-    logger.info("✏️ Updating saldo", id=id, data=input.model_dump())
+    input.saldo_id = id
+    logger.info("✏️ Updating saldo", id=id, data=input)
     try:
         response = await saldo_service.update_saldo(input)
         if isinstance(response, ErrorResponse):
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from structlog import get_logger
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.summary import UserSummaryResponse
+from core.dependencies import get_summary_service, token_security
+from domain.service.summary import ISummaryService
+from api.responses import ModelResponse
+
+router = APIRouter()
+logger = get_logger()
+
+
+@router.get("/{user_id}/summary", response_model=ApiResponse[UserSummaryResponse])
+async def get_user_summary(
+    user_id: int,
+    days: int = Query(30, ge=1, le=366, description="Length of the period the totals cover"),
+    limit: int = Query(5, ge=1, le=50, description="Latest items returned per type"),
+    summary_service: ISummaryService = Depends(get_summary_service),
+    token: str = Depends(token_security),
+):
+    """Retrieve a user's balance, period totals and latest topups, transfers and withdrawals."""
+    logger.info("📊 Fetching user summary", user_id=user_id, days=days, limit=limit)
+    try:
+        response = await summary_service.get_user_summary(user_id, days, limit)
+    except Exception as e:
+        logger.error("🔥 Error while getting user summary", user_id=user_id, error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    if isinstance(response, ErrorResponse):
+        logger.warning("❌ User summary not available", user_id=user_id, error=response.message)
+        raise HTTPException(status_code=404, detail=response.message)
+    logger.info("✅ User summary retrieved", user_id=user_id)
+    return ModelResponse(response)
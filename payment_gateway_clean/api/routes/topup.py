@@ -1,30 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List, Optional
 from structlog import get_logger
 from domain.dtos.request.topup import CreateTopupRequest, UpdateTopupRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.topup import TopupResponse
-from core.dependencies import get_topup_service, token_security
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.topup import TopupBatchResponse, TopupResponse
+from core.container import container
+from core.dependencies import get_topup_service, get_idempotency, get_pagination, token_security
+from core.idempotency import IdempotentRequest
 from domain.service.topup import ITopupService
+from api.responses import ModelResponse, NDJSONResponse
+from api.uploads import iter_upload_rows
 
 router = APIRouter()
 logger = get_logger()
 
 
-@router.get("/", response_model=ApiResponse[List[TopupResponse]])
+@router.get("/", response_model=PaginatedApiResponse[List[TopupResponse]])
 async def get_topups(
+    pagination: PaginationRequest = Depends(get_pagination),
+    stream: bool = Query(False, description="Stream every topup after the cursor as NDJSON"),
     topup_service: ITopupService = Depends(get_topup_service),
     token: str = Depends(token_security)
 ):
-    """Retrieve a list of all topups."""
-    logger.info("📦 Fetching all topups")
+    """Retrieve a page of topups, or stream all of them as NDJSON."""
+    if stream:
+        logger.info("📦 Streaming topups", cursor=pagination.cursor)
+        # The body is sent after the route returns, so the stream opens a unit
+        # of work of its own instead of borrowing the request's session
+        return NDJSONResponse(
+            container.stream(
+                container.topup_service, lambda service: service.stream_topups(pagination.cursor)
+            )
+        )
+
+    logger.info("📦 Fetching topups", limit=pagination.limit, cursor=pagination.cursor)
     try:
-        response = await topup_service.get_topups()
+        response = await topup_service.get_topups(pagination)
         if isinstance(response, ErrorResponse):
             logger.warning("⚠️ Failed to get topups", error=response.message)
             raise HTTPException(status_code=500, detail=response.message)
         logger.info("✅ Topups retrieved successfully")
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting topups", error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -84,7 +101,7 @@ async def get_topup_users(
             logger.warning("❌ No topups found for user", user_id=user_id)
             raise HTTPException(status_code=404, detail=response.message)
         logger.info("✅ All topups for user retrieved", user_id=user_id)
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting topups for user", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -94,15 +111,21 @@ async def get_topup_users(
 async def create_topup(
     input: CreateTopupRequest,
     topup_service: ITopupService = Depends(get_topup_service),
+    idempotency: IdempotentRequest = Depends(get_idempotency),
     token: str = Depends(token_security)
 ):
     """Create a new topup."""
-    logger.info("📝 Creating new topup", data=input.model_dump())
+    if idempotency.replay is not None:
+        logger.info("🔁 Replaying topup for repeated Idempotency-Key")
+        return idempotency.replay
+
+    logger.info("📝 Creating new topup", data=input)
     try:
         response = await topup_service.create_topup(input)
         if isinstance(response, ErrorResponse):
             logger.warning("❌ Failed to create topup", error=response.message)
             raise HTTPException(status_code=400, detail=response.message)
+        await idempotency.save(response)
         logger.info("✅ Topup created successfully")
         return response
     except Exception as e:
@@ -110,6 +133,39 @@ async def create_topup(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post(
+    "/batch",
+    response_model=ApiResponse[TopupBatchResponse],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_topup_batch(
+    request: Request,
+    topup_service: ITopupService = Depends(get_topup_service),
+    token: str = Depends(token_security),
+):
+    """Ingest topups from a JSON array, NDJSON or CSV body, reporting failed rows."""
+    logger.info("📥 Ingesting topup batch", content_type=request.headers.get("content-type"))
+    try:
+        response = await topup_service.create_topup_batch(iter_upload_rows(request))
+        if isinstance(response, ErrorResponse):
+            logger.warning("❌ Failed to ingest topup batch", error=response.message)
+            raise HTTPException(status_code=400, detail=response.message)
+        logger.info("✅ Topup batch ingested", message=response.message)
+        return response
+    except Exception as e:
+        logger.error("🔥 Error while ingesting topup batch", error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
 @router.put("/{id}", response_model=ApiResponse[TopupResponse])
 async def update_topup(
     id: int,
@@ -118,8 +174,8 @@ async def update_topup(
     token: str = Depends(token_security)
 ):
     """Update an existing topup by its ID."""
-    input.id = id
-    logger.info("✏️ Updating topup", id=id, data=input.model_dump())
+    input.topup_id = id
+    logger.info("✏️ Updating topup", id=id, data=input)
     try:
         response = await topup_service.update_topup(input)
         if isinstance(response, ErrorResponse):
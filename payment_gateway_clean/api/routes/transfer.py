@@ -1,30 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from structlog import get_logger
 from domain.dtos.request.transfer import CreateTransferRequest, UpdateTransferRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.transfer import TransferResponse
-from core.dependencies import get_transfer_service, token_security
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.transfer import TransferBatchItemResponse, TransferResponse
+from core.container import container
+from core.dependencies import get_transfer_service, get_idempotency, get_pagination, token_security
+from core.idempotency import IdempotentRequest
 from domain.service.transfer import ITransferService
+from api.responses import ModelResponse, NDJSONResponse
 
 router = APIRouter()
 logger = get_logger()
 
 
-@router.get("/", response_model=ApiResponse[List[TransferResponse]])
+@router.get("/", response_model=PaginatedApiResponse[List[TransferResponse]])
 async def get_transfers(
+    pagination: PaginationRequest = Depends(get_pagination),
+    stream: bool = Query(False, description="Stream every transfer after the cursor as NDJSON"),
     transfer_service: ITransferService = Depends(get_transfer_service),
     token: str = Depends(token_security),
 ):
-    """Retrieve a list of all transfers."""
-    logger.info("📦 Fetching all transfers")
+    """Retrieve a page of transfers, or stream all of them as NDJSON."""
+    if stream:
+        logger.info("📦 Streaming transfers", cursor=pagination.cursor)
+        # The body is sent after the route returns, so the stream opens a unit
+        # of work of its own instead of borrowing the request's session
+        return NDJSONResponse(
+            container.stream(
+                container.transfer_service, lambda service: service.stream_transfers(pagination.cursor)
+            )
+        )
+
+    logger.info("📦 Fetching transfers", limit=pagination.limit, cursor=pagination.cursor)
     try:
-        response = await transfer_service.get_transfers()
+        response = await transfer_service.get_transfers(pagination)
         if isinstance(response, ErrorResponse):
             logger.warning("⚠️ Failed to get transfers", error=response.message)
             raise HTTPException(status_code=500, detail=response.message)
         logger.info("✅ Transfers retrieved successfully")
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting transfers", error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -84,7 +100,7 @@ async def get_transfer_users(
             logger.warning("❌ No transfers found for user", user_id=user_id)
             raise HTTPException(status_code=404, detail=response.message)
         logger.info("✅ All transfers for user retrieved", user_id=user_id)
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while getting transfers for user", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -94,15 +110,21 @@ async def get_transfer_users(
 async def create_transfer(
     input: CreateTransferRequest,
     transfer_service: ITransferService = Depends(get_transfer_service),
+    idempotency: IdempotentRequest = Depends(get_idempotency),
     token: str = Depends(token_security),
 ):
     """Create a new transfer."""
-    logger.info("📝 Creating new transfer", data=input.model_dump())
+    if idempotency.replay is not None:
+        logger.info("🔁 Replaying transfer for repeated Idempotency-Key")
+        return idempotency.replay
+
+    logger.info("📝 Creating new transfer", data=input)
     try:
         response = await transfer_service.create_transfer(input)
         if isinstance(response, ErrorResponse):
             logger.warning("❌ Failed to create transfer", error=response.message)
             raise HTTPException(status_code=400, detail=response.message)
+        await idempotency.save(response)
         logger.info("✅ Transfer created successfully")
         return response
     except Exception as e:
@@ -110,6 +132,26 @@ async def create_transfer(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post("/batch", response_model=ApiResponse[List[TransferBatchItemResponse]])
+async def create_transfer_batch(
+    inputs: List[CreateTransferRequest],
+    transfer_service: ITransferService = Depends(get_transfer_service),
+    token: str = Depends(token_security),
+):
+    """Create many transfers in one transaction, with a result for each item."""
+    logger.info("📝 Creating transfer batch", count=len(inputs))
+    try:
+        response = await transfer_service.create_transfer_batch(inputs)
+        if isinstance(response, ErrorResponse):
+            logger.warning("❌ Failed to create transfer batch", error=response.message)
+            raise HTTPException(status_code=400, detail=response.message)
+        logger.info("✅ Transfer batch processed", message=response.message)
+        return response
+    except Exception as e:
+        logger.error("🔥 Error while creating transfer batch", error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
 @router.put("/{id}", response_model=ApiResponse[TransferResponse])
 async def update_transfer(
     id: int,
@@ -118,8 +160,8 @@ async def update_transfer(
     token: str = Depends(token_security),
 ):
     """Update an existing transfer by its ID."""
-    input.id = id
-    logger.info("✏️ Updating transfer", id=id, data=input.model_dump())
+    input.transfer_id = id
+    logger.info("✏️ Updating transfer", id=id, data=input)
     try:
         response = await transfer_service.update_transfer(input)
         if isinstance(response, ErrorResponse):
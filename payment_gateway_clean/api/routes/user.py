@@ -1,30 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 from structlog import get_logger
 from domain.dtos.request.user import CreateUserRequest, UpdateUserRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from domain.dtos.response.user import UserResponse
-from core.dependencies import get_user_service, token_security
+from core.container import container
+from core.dependencies import get_user_service, get_pagination, token_security
 from domain.service.user import IUserService
+from core.exceptions.base_exception import BaseInternalException
+from api.responses import ModelResponse, NDJSONResponse
 
 router = APIRouter()
 logger = get_logger()
 
 
-@router.get("/users", response_model=ApiResponse[List[UserResponse]])
+@router.get("/users", response_model=PaginatedApiResponse[List[UserResponse]])
 async def get_users(
+    pagination: PaginationRequest = Depends(get_pagination),
+    stream: bool = Query(False, description="Stream every user after the cursor as NDJSON"),
     user_service: IUserService = Depends(get_user_service),
     token: str = Depends(token_security),
 ):
-    """Get a list of all users."""
-    logger.info("📄 Fetching all users")
+    """Get a page of users, or stream all of them as NDJSON."""
+    if stream:
+        logger.info("📄 Streaming users", cursor=pagination.cursor)
+        # The body is sent after the route returns, so the stream opens a unit
+        # of work of its own instead of borrowing the request's session
+        return NDJSONResponse(
+            container.stream(
+                container.user_service, lambda service: service.stream_users(pagination.cursor)
+            )
+        )
+
+    logger.info("📄 Fetching users", limit=pagination.limit, cursor=pagination.cursor)
     try:
-        response = await user_service.get_users()
+        response = await user_service.get_users(pagination)
         if isinstance(response, ErrorResponse):
             logger.warning("⚠️ Failed to retrieve users", error=response.message)
             raise HTTPException(status_code=500, detail="Failed to retrieve users")
         logger.info("✅ Users retrieved successfully")
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error while retrieving users", error=str(e))
         raise HTTPException(
@@ -61,7 +77,7 @@ async def create_user(
     token: str = Depends(token_security),
 ):
     """Create a new user."""
-    logger.info("📝 Creating new user", data=user_request.model_dump())
+    logger.info("📝 Creating new user", data=user_request)
     try:
         response = await user_service.create_user(user_request)
         if isinstance(response, ErrorResponse):
@@ -69,6 +85,8 @@ async def create_user(
             raise HTTPException(status_code=400, detail="Failed to create user")
         logger.info("✅ User created successfully")
         return response
+    except BaseInternalException:
+        raise
     except Exception as e:
         logger.error("🔥 Error while creating user", error=str(e))
         raise HTTPException(
@@ -85,7 +103,7 @@ async def update_user(
 ):
     """Update an existing user's information."""
     user_request.id = user_id
-    logger.info("✏️ Updating user", user_id=user_id, data=user_request.model_dump())
+    logger.info("✏️ Updating user", user_id=user_id, data=user_request)
     try:
         response = await user_service.update_user(user_request)
         if isinstance(response, ErrorResponse):
@@ -93,6 +111,8 @@ async def update_user(
             raise HTTPException(status_code=400, detail="Failed to update user")
         logger.info("✅ User updated successfully", user_id=user_id)
         return response
+    except BaseInternalException:
+        raise
     except Exception as e:
         logger.error("🔥 Error while updating user", user_id=user_id, error=str(e))
         raise HTTPException(
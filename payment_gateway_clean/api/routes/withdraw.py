@@ -1,30 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from structlog import get_logger
 from domain.dtos.request.withdraw import CreateWithdrawRequest, UpdateWithdrawRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.withdraw import WithdrawResponse
-from core.dependencies import get_withdraw_service, token_security
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.withdraw import WithdrawBatchItemResponse, WithdrawResponse
+from core.container import container
+from core.dependencies import get_withdraw_service, get_idempotency, get_pagination, token_security
+from core.idempotency import IdempotentRequest
 from domain.service.withdraw import IWithdrawService
+from api.responses import ModelResponse, NDJSONResponse
 
 router = APIRouter()
 logger = get_logger()
 
 
-@router.get("/", response_model=ApiResponse[List[WithdrawResponse]])
+@router.get("/", response_model=PaginatedApiResponse[List[WithdrawResponse]])
 async def get_withdraws(
+    pagination: PaginationRequest = Depends(get_pagination),
+    stream: bool = Query(False, description="Stream every withdrawal after the cursor as NDJSON"),
     withdraw_service: IWithdrawService = Depends(get_withdraw_service),
     token: str = Depends(token_security),
 ):
-    """Retrieve a list of all withdrawal records."""
-    logger.info("📄 Fetching all withdrawals")
+    """Retrieve a page of withdrawal records, or stream all of them as NDJSON."""
+    if stream:
+        logger.info("📄 Streaming withdrawals", cursor=pagination.cursor)
+        # The body is sent after the route returns, so the stream opens a unit
+        # of work of its own instead of borrowing the request's session
+        return NDJSONResponse(
+            container.stream(
+                container.withdraw_service, lambda service: service.stream_withdraws(pagination.cursor)
+            )
+        )
+
+    logger.info("📄 Fetching withdrawals", limit=pagination.limit, cursor=pagination.cursor)
     try:
-        response = await withdraw_service.get_withdraws()
+        response = await withdraw_service.get_withdraws(pagination)
         if isinstance(response, ErrorResponse):
             logger.warning("⚠️ Failed to fetch withdrawals", error=response.message)
             raise HTTPException(status_code=500, detail=response.message)
         logger.info("✅ Withdrawals fetched successfully")
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error fetching withdrawals", error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -84,7 +100,7 @@ async def get_withdraw_users(
             logger.warning("❌ Withdrawals not found for user", user_id=user_id)
             raise HTTPException(status_code=404, detail=response.message)
         logger.info("✅ User withdrawals fetched", user_id=user_id)
-        return response
+        return ModelResponse(response)
     except Exception as e:
         logger.error("🔥 Error fetching withdrawals by user", user_id=user_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -94,15 +110,21 @@ async def get_withdraw_users(
 async def create_withdraw(
     input: CreateWithdrawRequest,
     withdraw_service: IWithdrawService = Depends(get_withdraw_service),
+    idempotency: IdempotentRequest = Depends(get_idempotency),
     token: str = Depends(token_security),
 ):
     """Create a new withdrawal record."""
-    logger.info("✍️ Creating withdrawal", payload=input.model_dump())
+    if idempotency.replay is not None:
+        logger.info("🔁 Replaying withdrawal for repeated Idempotency-Key")
+        return idempotency.replay
+
+    logger.info("✍️ Creating withdrawal", payload=input)
     try:
         response = await withdraw_service.create_withdraw(input)
         if isinstance(response, ErrorResponse):
             logger.warning("❌ Failed to create withdrawal", error=response.message)
             raise HTTPException(status_code=400, detail=response.message)
+        await idempotency.save(response)
         logger.info("✅ Withdrawal created successfully")
         return response
     except Exception as e:
@@ -110,6 +132,26 @@ async def create_withdraw(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post("/batch", response_model=ApiResponse[List[WithdrawBatchItemResponse]])
+async def create_withdraw_batch(
+    inputs: List[CreateWithdrawRequest],
+    withdraw_service: IWithdrawService = Depends(get_withdraw_service),
+    token: str = Depends(token_security),
+):
+    """Create many withdrawals in one transaction, with a result for each item."""
+    logger.info("✍️ Creating withdraw batch", count=len(inputs))
+    try:
+        response = await withdraw_service.create_withdraw_batch(inputs)
+        if isinstance(response, ErrorResponse):
+            logger.warning("❌ Failed to create withdraw batch", error=response.message)
+            raise HTTPException(status_code=400, detail=response.message)
+        logger.info("✅ Withdraw batch processed", message=response.message)
+        return response
+    except Exception as e:
+        logger.error("🔥 Error while creating withdraw batch", error=str(e))
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
 @router.put("/{id}", response_model=ApiResponse[Optional[WithdrawResponse]])
 async def update_withdraw(
     id: int,
@@ -118,8 +160,8 @@ async def update_withdraw(
     token: str = Depends(token_security),
 ):
     """Update an existing withdrawal record."""
-    input.id = id
-    logger.info("✏️ Updating withdrawal", id=id, payload=input.model_dump())
+    input.withdraw_id = id
+    logger.info("✏️ Updating withdrawal", id=id, payload=input)
     try:
         response = await withdraw_service.update_withdraw(input)
         if isinstance(response, ErrorResponse):
@@ -0,0 +1,61 @@
+import csv
+import json
+from typing import AsyncIterator, Union
+
+from starlette.requests import Request
+
+
+async def iter_upload_rows(request: Request) -> AsyncIterator[Union[dict, ValueError]]:
+    """
+    Streams the rows of a JSON array, NDJSON or CSV request body.
+
+    NDJSON and CSV bodies are read line by line as they arrive. A line that cannot
+    be parsed is yielded as a ValueError so the caller can report it and move on.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type == "application/json":
+        body = await request.json()
+        if not isinstance(body, list):
+            raise ValueError("Expected a JSON array of rows")
+        for row in body:
+            yield row if isinstance(row, dict) else ValueError("Row is not a JSON object")
+        return
+
+    if content_type == "application/x-ndjson":
+        async for line in _iter_lines(request):
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ValueError(f"Invalid JSON: {e.msg}")
+                continue
+            yield row if isinstance(row, dict) else ValueError("Row is not a JSON object")
+        return
+
+    if content_type == "text/csv":
+        header = None
+        async for line in _iter_lines(request):
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            yield dict(zip(header, values))
+        return
+
+    raise ValueError(f"Unsupported content type: {content_type or 'none'}")
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.decode("utf-8").rstrip("\r")
+
+    if buffer.strip():
+        yield buffer.decode("utf-8").rstrip("\r")
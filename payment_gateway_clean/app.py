@@ -1,3 +1,7 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
 import uvicorn
 from fastapi import FastAPI
 from structlog import get_logger
@@ -6,23 +10,58 @@ from starlette.middleware.cors import CORSMiddleware
 # Middleware & Router
 from api.middleware.ratelimiter import RateLimitMiddleware
 from api.middleware.logger import LoggerMiddleware
+from api.middleware.metrics import MetricsMiddleware
+from api.middleware.tracing import TracingMiddleware
 from api.router import router as api_router
+from api.routes.metrics import router as metrics_router
 
 # Core configuration & logging
 from core.logging import configure_logger
 from core.config import get_app_settings
+from core.container import container
+from core.exceptions.base_exception import BaseInternalException, internal_exception_handler
+
+
+@contextlib.asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    settings = get_app_settings()
+    jobs = []
+    if settings.saldo_shard_compaction_interval_seconds > 0:
+        jobs.append(asyncio.create_task(container.run_saldo_compaction()))
+    if settings.ledger_checkpoint_interval_seconds > 0:
+        jobs.append(asyncio.create_task(container.run_ledger_checkpoints()))
+    if settings.idempotency_sweep_interval_seconds > 0:
+        jobs.append(asyncio.create_task(container.run_idempotency_sweeper()))
+    if settings.outbox_relay_interval_seconds > 0:
+        jobs.append(asyncio.create_task(container.run_outbox_relay()))
+    if settings.report_rollup_interval_seconds > 0:
+        jobs.append(asyncio.create_task(container.run_report_rollups()))
+
+    yield
+
+    for job in jobs:
+        job.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await job
+    # Release worker pools and pooled resources on shutdown
+    await container.close()
 
 
 def create_app() -> FastAPI:
     # Load application settings
     settings = get_app_settings()
 
+    # Configure structured logging
+    configure_logger(
+        json_logs=settings.logging_json, high_throughput=settings.logging_high_throughput
+    )
+
     # Init logger
     logger = get_logger()
-    logger.info(f"Starting app with environment: {settings.app_env}")
+    logger.info("Starting app", environment=settings.app_env)
 
     # Initialize FastAPI instance
-    application = FastAPI(**settings.fastapi_kwargs)
+    application = FastAPI(**settings.fastapi_kwargs, lifespan=lifespan)
 
     # Enable CORS for frontend access
     application.add_middleware(
@@ -34,14 +73,25 @@ def create_app() -> FastAPI:
     )
 
     # Add custom middlewares
-    application.add_middleware(RateLimitMiddleware)
+    application.add_middleware(
+        RateLimitMiddleware,
+        backend=container.rate_limit_backend,
+        settings=settings,
+        jwt_config=container.get_jwt(),
+    )
     application.add_middleware(LoggerMiddleware)
+    if settings.metrics_enabled:
+        application.add_middleware(MetricsMiddleware)
+    if settings.tracing_exporter != "none":
+        application.add_middleware(TracingMiddleware)
+
+    # Map internal exceptions (rate limiting, saturation, ...) to their status codes
+    application.add_exception_handler(BaseInternalException, internal_exception_handler)
 
     # Register API routes
     application.include_router(api_router, prefix="/api")
-
-    # Configure structured logging
-    configure_logger()
+    if settings.metrics_enabled:
+        application.include_router(metrics_router)
 
     return application
 
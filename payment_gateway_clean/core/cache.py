@@ -0,0 +1,148 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Iterable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Per-process LRU cache whose entries also expire ``ttl`` seconds after being set.
+
+    Lookups are counted so the hit ratio can be reported. A ``max_size`` of 0
+    disables the cache: nothing is stored and every lookup is a miss.
+
+    A reader that loads a value from its source takes a ``token()`` first and
+    passes it to ``set()``. If the key was invalidated in between, the value may
+    predate the change and is not stored. Invalidation stamps are kept for the
+    last ``max_size`` keys; a token older than the oldest one dropped is refused
+    for every key, so a forgotten stamp can only cost a miss.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+        self._invalidated: OrderedDict[K, int] = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def peek(self, key: K) -> Optional[V]:
+        """
+        Look up a live entry without counting the lookup or refreshing its position.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def token(self) -> int:
+        """
+        Stamp to pass to set() for a value about to be loaded from the source.
+        """
+        return self._clock
+
+    def invalidated_since(self, key: K, token: int) -> bool:
+        return self._invalidated.get(key, self._floor) > token
+
+    def set(self, key: K, value: V, token: Optional[int] = None) -> None:
+        if self.max_size <= 0:
+            return
+        if token is not None and self.invalidated_since(key, token):
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+        if self.max_size <= 0:
+            return
+        self._clock += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > self.max_size:
+            _, self._floor = self._invalidated.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class UserScopedCache(Generic[K, V]):
+    """
+    Per-process cache of values computed for a single user, dropped when that user's rows change.
+
+    A user's entries (one per variant, e.g. per period and page size) live together
+    in one LRUCache slot, so a single invalidation drops all of them. Writers
+    invalidate inside their transaction and again once it commits. A reader takes
+    a ``token()`` before computing a value, and ``set()`` drops the value if the
+    user was invalidated since, so a read that started before a commit cannot put
+    the old value back. Other workers catch up when the TTL runs out.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60):
+        self._users: LRUCache[int, dict[K, V]] = LRUCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: int, key: K) -> Optional[V]:
+        entries = self._users.get(user_id)
+        return entries.get(key) if entries is not None else None
+
+    def token(self) -> int:
+        return self._users.token()
+
+    def set(self, user_id: int, key: K, value: V, token: Optional[int] = None) -> None:
+        if token is not None and self._users.invalidated_since(user_id, token):
+            return
+        entries = self._users.peek(user_id)
+        if entries is None:
+            entries = {}
+            self._users.set(user_id, entries)
+        entries[key] = value
+
+    def invalidate(self, session: AsyncSession, user_ids: Iterable[int]) -> None:
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        self._evict(user_ids)
+        event.listen(
+            session.sync_session, "after_commit",
+            lambda _: self._evict(user_ids), once=True,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return self._users.stats()
+
+    def _evict(self, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self._users.invalidate(user_id)
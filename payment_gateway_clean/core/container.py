@@ -1,16 +1,24 @@
+import asyncio
 import contextlib
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from structlog import get_logger
 
 from core.config import get_app_settings
+from core.metrics import REGISTRY, UNIT_OF_WORK_ROLLBACKS, instrument_engine
+from core.pool import pool_stats
+from core.tracing import configure_tracing, trace_engine
 from core.settings.base import BaseAppSettings
 
 from domain.repository.user import IUserRepository
 from infrastructure.repository.user import UserRepository
+from infrastructure.repository.user_cache import CachedUserRepository
 
 from domain.repository.saldo import ISaldoRepository
 from infrastructure.repository.saldo import SaldoRepository
+from infrastructure.repository.saldo_shard import SaldoShards
 
 from domain.repository.topup import ITopupRepository
 from infrastructure.repository.topup import TopupRepository
@@ -21,6 +29,18 @@ from infrastructure.repository.transfer import TransferRepository
 from domain.repository.withdraw import IWithdrawRepository
 from infrastructure.repository.withdraw import WithdrawRepository
 
+from domain.repository.ledger import ILedgerRepository
+from infrastructure.repository.ledger import LedgerRepository
+
+from infrastructure.repository.idempotency import IdempotencyRepository
+
+from infrastructure.repository.summary import SummaryRepository
+
+from infrastructure.repository.report import ReportRepository
+
+from domain.repository.outbox import IOutboxRepository
+from infrastructure.repository.outbox import OutboxRepository
+
 from domain.service.user import IUserService
 from infrastructure.service.user import UserService
 
@@ -39,8 +59,32 @@ from infrastructure.service.withdraw import WithdrawService
 from domain.service.auth import IAuthService
 from infrastructure.service.auth import AuthService
 
+from domain.service.summary import ISummaryService
+from infrastructure.service.summary import SummaryService
+
+from domain.service.report import IReportService
+from infrastructure.service.report import ReportService
+
 from core.security.jwt import JwtConfig
 from core.security.hashpassword import Hashing
+from core.security.hashpool import HashingPool
+from core.idempotency import IdempotencyStore
+from core.cache import LRUCache, UserScopedCache
+
+from core.outbox.base import OutboxSink
+from core.outbox.file import FileOutboxSink
+from core.outbox.memory import InMemoryOutboxSink
+from core.outbox.relay import OutboxRelay
+
+from core.ratelimit.base import RateLimitBackend
+from core.ratelimit.memory import InMemoryRateLimitBackend
+from core.ratelimit.redis import create_redis_backend
+
+
+logger = get_logger()
+
+S = TypeVar("S")
+T = TypeVar("T")
 
 
 class Container:
@@ -48,106 +92,363 @@ class Container:
         self._settings = settings
         self._engine = create_async_engine(**settings.sqlalchemy_engine_props)
         self._session = async_sessionmaker(bind=self._engine, expire_on_commit=False)
+        self._hashing_pool = HashingPool(
+            workers=settings.hashing_pool_workers,
+            max_pending=settings.hashing_pool_max_pending,
+            use_processes=settings.hashing_pool_use_processes,
+        )
+        self._hashing = Hashing(self._hashing_pool)
+        self._rate_limit_backend: RateLimitBackend | None = None
+        self._outbox_relay: OutboxRelay | None = None
+        self._jwt = JwtConfig(
+            settings.jwt_secret_key,
+            settings.jwt_token_expiration_minutes,
+            algorithm=settings.jwt_algorithm,
+            backend=settings.jwt_backend,
+            cache_size=settings.jwt_cache_size,
+            cache_ttl=settings.jwt_cache_ttl_seconds,
+        )
+        self._user_cache = LRUCache(
+            max_size=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+        )
+        self._summary_cache = UserScopedCache(
+            max_size=settings.summary_cache_size, ttl=settings.summary_cache_ttl_seconds
+        )
+        self._summary = SummaryService(
+            self.unit_of_work,
+            lambda session: SummaryRepository(session, shards=self.saldo_shards(session)),
+            self._summary_cache,
+        )
+        self._idempotency = IdempotencyStore(
+            self.unit_of_work,
+            IdempotencyRepository,
+            ttl=settings.idempotency_ttl_seconds,
+            lock_timeout=settings.idempotency_lock_timeout_seconds,
+            cache_size=settings.idempotency_cache_size,
+        )
+
+        if settings.metrics_enabled:
+            instrument_engine(self._engine)
+            REGISTRY.stats("db_pool", "Database connection pool statistic.", self.db_pool_stats)
+            REGISTRY.stats("hashing_pool", "Password hashing pool statistic.", self._hashing_pool.stats)
+            REGISTRY.stats("user_cache", "User cache statistic.", self.user_cache_stats)
+            REGISTRY.stats("summary_cache", "User summary cache statistic.", self._summary_cache.stats)
+
+        self._span_exporter = configure_tracing(settings)
+        if self._span_exporter is not None:
+            trace_engine(self._engine)
 
     @property
     def session(self) -> async_sessionmaker:
         return self._session
 
+    @property
+    def span_exporter(self):
+        return self._span_exporter
 
-    def get_jwt(self) -> JwtConfig:
-        return JwtConfig(self._settings.jwt_secret_key, self._settings.jwt_token_expiration_minutes)
+    @property
+    def hashing_pool(self) -> HashingPool:
+        return self._hashing_pool
 
-    async def user_repository(self) -> IUserRepository:
-        session = self._session()
-        return UserRepository(session)
+    @property
+    def rate_limit_backend(self) -> RateLimitBackend:
+        if self._rate_limit_backend is None:
+            if self._settings.rate_limit_backend == "redis":
+                self._rate_limit_backend = create_redis_backend(
+                    self._settings.rate_limit_redis_url
+                )
+            else:
+                self._rate_limit_backend = InMemoryRateLimitBackend(
+                    max_keys=self._settings.rate_limit_max_keys
+                )
+        return self._rate_limit_backend
+
+    @property
+    def outbox_relay(self) -> OutboxRelay:
+        if self._outbox_relay is None:
+            if self._settings.outbox_sink == "memory":
+                sink: OutboxSink = InMemoryOutboxSink()
+            elif self._settings.outbox_sink == "file":
+                sink = FileOutboxSink(self._settings.outbox_file_path)
+            else:
+                raise ValueError(f"Unknown outbox sink: {self._settings.outbox_sink}")
+            self._outbox_relay = OutboxRelay(
+                self.unit_of_work,
+                OutboxRepository,
+                sink,
+                batch_size=self._settings.outbox_batch_size,
+            )
+        return self._outbox_relay
+
+    def db_pool_stats(self) -> dict:
+        return pool_stats(self._engine.pool)
+
+    def user_cache_stats(self) -> dict:
+        return self._user_cache.stats()
+
+    async def close(self) -> None:
+        self._hashing_pool.shutdown()
+        if self._rate_limit_backend is not None:
+            await self._rate_limit_backend.close()
+        if self._outbox_relay is not None:
+            await self._outbox_relay.sink.close()
+        await self._engine.dispose()
 
-    async def saldo_repository(self) -> ISaldoRepository:
-        session = self._session
 
-        return SaldoRepository(
-            session
-        )
+    def get_jwt(self) -> JwtConfig:
+        return self._jwt
 
-    async def topup_repository(self) -> ITopupRepository:
-        session = self._session
+    @property
+    def idempotency(self) -> IdempotencyStore:
+        return self._idempotency
 
-        return TopupRepository(
-            session
+    @property
+    def summary_service(self) -> ISummaryService:
+        return self._summary
+
+    @contextlib.asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """
+        One session for the whole request: every repository shares it, it is
+        committed once if the block succeeds, rolled back otherwise, and always closed.
+        """
+        session = self._session()
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            UNIT_OF_WORK_ROLLBACKS.inc()
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def stream(
+        self,
+        service: Callable[[AsyncSession], Awaitable[S]],
+        items: Callable[[S], AsyncIterator[T]],
+    ) -> AsyncIterator[T]:
+        """
+        Stream items from a service built on a unit of work of its own.
+
+        A streamed body is sent after the route returns, and whether the request's
+        session is still open by then depends on when the framework tears its
+        dependencies down. This unit of work lasts exactly as long as the iteration.
+        """
+        async with self.unit_of_work() as session:
+            async for item in items(await service(session)):
+                yield item
+
+    def saldo_shards(self, session: AsyncSession) -> SaldoShards:
+        return SaldoShards(
+            session,
+            hot_user_ids=self._settings.saldo_hot_user_ids,
+            shard_count=self._settings.saldo_shard_count,
         )
 
-    async def transfer_repository(self) -> ITransferRepository:
-        session = self._session
-
+    async def compact_saldo_shards(self) -> int:
+        """
+        Fold every user's shards back into their saldo row, one transaction per user.
+        """
+        async with self.unit_of_work() as session:
+            user_ids = await self.saldo_shards(session).users_with_balance()
+
+        for user_id in user_ids:
+            async with self.unit_of_work() as session:
+                await self.saldo_shards(session).compact(user_id)
+
+        return len(user_ids)
+
+    async def run_saldo_compaction(self) -> None:
+        """
+        Compact saldo shards every saldo_shard_compaction_interval_seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self._settings.saldo_shard_compaction_interval_seconds)
+            try:
+                compacted = await self.compact_saldo_shards()
+                if compacted:
+                    logger.info("Saldo shards compacted", users=compacted)
+            except Exception as e:
+                logger.error("Saldo shard compaction failed", error=str(e))
+
+    async def create_ledger_checkpoints(self) -> int:
+        """
+        Checkpoint every user's ledger balance over the transactions that have ended.
+        """
+        async with self.unit_of_work() as session:
+            return await LedgerRepository(session).create_checkpoints()
+
+    async def run_ledger_checkpoints(self) -> None:
+        """
+        Checkpoint ledger balances every ledger_checkpoint_interval_seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self._settings.ledger_checkpoint_interval_seconds)
+            try:
+                checkpoints = await self.create_ledger_checkpoints()
+                if checkpoints:
+                    logger.info("Ledger checkpoints created", users=checkpoints)
+            except Exception as e:
+                logger.error("Ledger checkpointing failed", error=str(e))
+
+    async def run_idempotency_sweeper(self) -> None:
+        """
+        Delete expired idempotency keys every idempotency_sweep_interval_seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self._settings.idempotency_sweep_interval_seconds)
+            try:
+                deleted = await self._idempotency.delete_expired()
+                if deleted:
+                    logger.info("Expired idempotency keys deleted", keys=deleted)
+            except Exception as e:
+                logger.error("Idempotency key sweep failed", error=str(e))
+
+    async def run_outbox_relay(self) -> None:
+        """
+        Drain the outbox to its sink every outbox_relay_interval_seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self._settings.outbox_relay_interval_seconds)
+            try:
+                published = await self.outbox_relay.drain()
+                if published:
+                    logger.debug("Outbox events published", events=published)
+            except Exception as e:
+                logger.error("Outbox relay failed", error=str(e))
+
+    async def roll_up_reports(self) -> int:
+        """
+        Fold every ledger entry of the transactions that have ended into the report rollups, one transaction per batch.
+        """
+        batch_size = self._settings.report_rollup_batch_size
+        total = 0
+        while True:
+            async with self.unit_of_work() as session:
+                read = await ReportRepository(session).roll_up(batch_size)
+            total += read
+            if read < batch_size:
+                return total
+
+    async def run_report_rollups(self) -> None:
+        """
+        Roll new ledger entries up into the report tables every report_rollup_interval_seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self._settings.report_rollup_interval_seconds)
+            try:
+                entries = await self.roll_up_reports()
+                if entries:
+                    logger.info("Report rollups updated", entries=entries)
+            except Exception as e:
+                logger.error("Report rollup failed", error=str(e))
+
+    async def user_repository(self, session: AsyncSession) -> IUserRepository:
+        return CachedUserRepository(UserRepository(session), self._user_cache, session)
+
+    async def saldo_repository(self, session: AsyncSession) -> ISaldoRepository:
+        return SaldoRepository(session, shards=self.saldo_shards(session))
+
+    async def topup_repository(self, session: AsyncSession) -> ITopupRepository:
+        return TopupRepository(session, summary_cache=self._summary_cache)
+
+    async def transfer_repository(self, session: AsyncSession) -> ITransferRepository:
         return TransferRepository(
-            session
+            session, shards=self.saldo_shards(session), summary_cache=self._summary_cache
         )
 
-    async def withdraw_repository(self) -> IWithdrawRepository:
-        session = self._session
-
+    async def withdraw_repository(self, session: AsyncSession) -> IWithdrawRepository:
         return WithdrawRepository(
-            session
+            session, shards=self.saldo_shards(session), summary_cache=self._summary_cache
         )
 
-    async def auth_service(self) -> IAuthService:
-        user_repo = await self.user_repository()
+    async def ledger_repository(self, session: AsyncSession) -> ILedgerRepository:
+        return LedgerRepository(session, summary_cache=self._summary_cache)
+
+    async def outbox_repository(self, session: AsyncSession) -> IOutboxRepository:
+        return OutboxRepository(session)
+
+    async def auth_service(self, session: AsyncSession) -> IAuthService:
+        user_repo = await self.user_repository(session)
         return AuthService(
             repository=user_repo,
-            hashing=Hashing(),
+            hashing=self._hashing,
             jwt_config=self.get_jwt()
         )
 
-    async def user_service(self) -> IUserService:
-        user_repo = await self.user_repository()
+    async def user_service(self, session: AsyncSession) -> IUserService:
+        user_repo = await self.user_repository(session)
 
         return UserService(
             repository=user_repo,
-            hashing=Hashing()
+            hashing=self._hashing
         )
 
     
-    async def saldo_service(self) -> ISaldoService:
-        user_repo = await self.user_repository()
-        saldo_repo = await self.saldo_repository()
+    async def saldo_service(self, session: AsyncSession) -> ISaldoService:
+        user_repo = await self.user_repository(session)
+        saldo_repo = await self.saldo_repository(session)
+        ledger_repo = await self.ledger_repository(session)
 
         return SaldoService(
             user_repository=user_repo,
-            saldo_repository=saldo_repo
+            saldo_repository=saldo_repo,
+            ledger_repository=ledger_repo
         )
 
-    async def topup_service(self) -> ITopupService:
-        user_repo = await self.user_repository()
-        saldo_repo = await self.saldo_repository()
-        topup_repo = await self.topup_repository()
+    async def topup_service(self, session: AsyncSession) -> ITopupService:
+        user_repo = await self.user_repository(session)
+        saldo_repo = await self.saldo_repository(session)
+        topup_repo = await self.topup_repository(session)
+        ledger_repo = await self.ledger_repository(session)
+        outbox_repo = await self.outbox_repository(session)
 
         return TopupService(
             topup_repository=topup_repo,
             user_repository=user_repo,
-            saldo_repository=saldo_repo
+            saldo_repository=saldo_repo,
+            ledger_repository=ledger_repo,
+            outbox_repository=outbox_repo,
+            batch_chunk_size=self._settings.topup_batch_chunk_size,
         )
 
-    async def transfer_service(self) -> ITransferService:
-        user_repo = await self.user_repository()
-        saldo_repo = await self.saldo_repository()
-        transfer_repo = await self.transfer_repository()
+    async def transfer_service(self, session: AsyncSession) -> ITransferService:
+        user_repo = await self.user_repository(session)
+        saldo_repo = await self.saldo_repository(session)
+        transfer_repo = await self.transfer_repository(session)
+        ledger_repo = await self.ledger_repository(session)
+        outbox_repo = await self.outbox_repository(session)
 
         return TransferService(
-            transfer_repository==transfer_repo,
+            transfer_repository=transfer_repo,
             user_repository=user_repo,
-            saldo_repository=saldo_repo
+            saldo_repository=saldo_repo,
+            ledger_repository=ledger_repo,
+            outbox_repository=outbox_repo,
+            batch_max_items=self._settings.transfer_batch_max_items,
+            batch_chunk_size=self._settings.transfer_batch_chunk_size
         )
 
-    async def withdraw_service(self) -> IWithdrawService:
-        user_repo = await self.user_repository()
-        saldo_repo = await self.saldo_repository()
-        withdraw_repo = await self.withdraw_repository()
+    async def withdraw_service(self, session: AsyncSession) -> IWithdrawService:
+        user_repo = await self.user_repository(session)
+        saldo_repo = await self.saldo_repository(session)
+        withdraw_repo = await self.withdraw_repository(session)
+        ledger_repo = await self.ledger_repository(session)
+        outbox_repo = await self.outbox_repository(session)
 
         return WithdrawService(
             withdraw_repository=withdraw_repo,
             user_repository=user_repo,
-            saldo_repository=saldo_repo
+            saldo_repository=saldo_repo,
+            ledger_repository=ledger_repo,
+            outbox_repository=outbox_repo,
+            batch_max_items=self._settings.withdraw_batch_max_items,
         )
 
+    async def report_service(self, session: AsyncSession) -> IReportService:
+        return ReportService(report_repository=ReportRepository(session))
+
 
 
 
@@ -1,15 +1,19 @@
-from typing import Annotated
+from collections.abc import AsyncIterator
+from typing import Annotated, Optional
 
-from fastapi import Depends, Query
+from fastapi import Depends, Header, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.container import container
+from core.errors import AppError
+from core.idempotency import IdempotentRequest
 from core.security.httptoken import HTTPTokenHeader
 
 from infrastructure.service.auth import AuthService
 from infrastructure.service.user import UserService
 
-from core.security.jwt import JwtConfig
+
+from domain.dtos.request.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, PaginationRequest
 
 
 
@@ -28,32 +32,53 @@ token_security_optional = HTTPTokenHeader(
 )
 
 
+async def get_db_session() -> AsyncIterator[AsyncSession]:
+    async with container.unit_of_work() as session:
+        yield session
+
+
 JWTToken = Annotated[str, Depends(token_security)]
-DBSession = Annotated[AsyncSession, Depends(container.session)]
+DBSession = Annotated[AsyncSession, Depends(get_db_session)]
+
+
+def get_pagination(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[int] = Query(None, ge=0),
+) -> PaginationRequest:
+    return PaginationRequest(limit=limit, cursor=cursor)
+
+
+async def get_auth_service(session: DBSession):
+    return await container.auth_service(session)
+
+async def get_user_service(session: DBSession):
+    return await container.user_service(session)
+
 
+async def get_saldo_service(session: DBSession):
+    return await container.saldo_service(session)
 
-async def get_auth_service():
-    return await container.auth_service()
 
-async def get_user_service():
-    return await container.user_service()
+async def get_topup_service(session: DBSession):
+    return await container.topup_service(session)
 
 
-async def get_saldo_service():
-    return await container.saldo_service()
 
+async def get_transfer_service(session: DBSession):
+    return await container.transfer_service(session)
 
-async def get_topup_service():
-    return await container.topup_service()
 
+async def get_withdraw_service(session: DBSession):
+    return await container.withdraw_service(session)
 
 
-async def get_transfer_service():
-    return await container.transfer_service()
+async def get_report_service(session: DBSession):
+    return await container.report_service(session)
 
 
-async def get_withdraw_service():
-    return await container.withdraw_service()
+def get_summary_service():
+    # Runs its queries in units of work of its own rather than the request's session
+    return container.summary_service
 
 
 
@@ -61,8 +86,47 @@ async def get_current_user(
     token: str = Depends(token_security),
     user_service = Depends(get_user_service),
 ):
-    jwt_user = JwtConfig.verify_token(token)
+    jwt_user = container.get_jwt().verify_token(token)
 
     current_user = await user_service.find_by_id(id=jwt_user)
 
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_idempotency(
+    request: Request,
+    session: DBSession,
+    token: JWTToken,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+) -> AsyncIterator[IdempotentRequest]:
+    """
+    Claims the request's Idempotency-Key, or hands the route the response to replay.
+
+    The key is scoped to the caller and the endpoint, and bound to the request body.
+    The claim ends with the request's transaction: waiters wake once the saved
+    response commits, and a claim that ends without one is released for retries.
+    """
+    if idempotency_key is None:
+        yield IdempotentRequest()
+        return
+
+    try:
+        user_id = container.get_jwt().verify_token(token)
+    except AppError as e:
+        raise HTTPException(status_code=401, detail=e.message)
+
+    store = container.idempotency
+    key = store.scoped_key(user_id, request.url.path, idempotency_key)
+    fingerprint = store.fingerprint(await request.body())
+
+    stored = await store.begin(key, fingerprint)
+    idempotent_request = IdempotentRequest(store, session, key, fingerprint, stored)
+    if stored is not None:
+        yield idempotent_request
+        return
+
+    try:
+        yield idempotent_request
+    finally:
+        # Teardown runs before get_db_session commits, so finish hooks the commit
+        await store.finish(session, key, idempotent_request.completed)
\ No newline at end of file
@@ -30,6 +30,11 @@ class ValidationError(AppError):
         super().__init__(f"Validation error: {validation_error}")
 
 
+class ConcurrencyError(AppError):
+    def __init__(self, reason: str):
+        super().__init__(f"Concurrency error: {reason}")
+
+
 class PasswordError(AppError):
     def __init__(self, reason: str):
         super().__init__(f"Password error: {reason}")
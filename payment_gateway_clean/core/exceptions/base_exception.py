@@ -35,4 +35,17 @@ class BaseInternalException(Exception):
                 "type": cls.__name__,
                 "message": cls._message,
             },
-        )
\ No newline at end of file
+        )
+
+async def internal_exception_handler(
+    request: Request, exc: BaseInternalException
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.get_status_code(),
+        content={
+            "status": "error",
+            "status_code": exc.get_status_code(),
+            "type": type(exc).__name__,
+            "message": exc.get_message(),
+        },
+    )
@@ -0,0 +1,9 @@
+from core.exceptions.base_exception import BaseInternalException
+
+class HashingPoolSaturatedException(BaseInternalException):
+    """
+        Exception raised when the password hashing pool has too many pending jobs.
+    """
+
+    _status_code = 503
+    _message = "Password hashing is saturated. Please try again later."
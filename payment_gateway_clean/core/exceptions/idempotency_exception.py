@@ -0,0 +1,18 @@
+from core.exceptions.base_exception import BaseInternalException
+
+class IdempotencyKeyInProgressException(BaseInternalException):
+    """
+        Exception raised when a request with the same idempotency key is still being processed.
+    """
+
+    _status_code = 409
+    _message = "A request with this Idempotency-Key is still in progress. Please retry later."
+
+
+class IdempotencyKeyMismatchException(BaseInternalException):
+    """
+        Exception raised when an idempotency key is reused with a different request body.
+    """
+
+    _status_code = 422
+    _message = "This Idempotency-Key was already used with a different request body."
@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncContextManager, Callable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from core.exceptions.idempotency_exception import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyMismatchException,
+)
+from domain.repository.idempotency import IIdempotencyRepository
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: str
+    expires_at: datetime
+
+    def to_response(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+class IdempotencyStore:
+    """
+    Remembers the response of requests sent with an Idempotency-Key header.
+
+    Keys live in the idempotency_keys table, fronted by a per-process LRU of completed
+    responses. The first request claims its key; a duplicate either replays the stored
+    response or, while the first one is in flight, waits for it: on an in-process event
+    when both hit the same worker, otherwise by polling the table.
+    """
+
+    def __init__(
+        self,
+        unit_of_work: Callable[[], AsyncContextManager[AsyncSession]],
+        repository: Callable[[AsyncSession], IIdempotencyRepository],
+        ttl: float = 86_400,
+        lock_timeout: float = 60,
+        cache_size: int = 10_000,
+        poll_interval: float = 0.05,
+    ):
+        self.unit_of_work = unit_of_work
+        self.repository = repository
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.cache_size = cache_size
+        self.poll_interval = poll_interval
+        self._cache: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Event] = {}
+        self._releases: set[asyncio.Task] = set()
+
+    @staticmethod
+    def scoped_key(user_id: int, path: str, idempotency_key: str) -> str:
+        """
+        Digest of the client key scoped to its user and endpoint.
+        """
+        return hashlib.sha256(f"{user_id}:{path}:{idempotency_key}".encode("utf-8")).hexdigest()
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Claim a key for a new request, or return the response already stored for it.
+
+        :raises IdempotencyKeyMismatchException: If the key was used with another body.
+        :raises IdempotencyKeyInProgressException: If the first request is still running after lock_timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout
+
+        while True:
+            stored = self._cached(key)
+            if stored is not None:
+                return self._check(stored, fingerprint)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                try:
+                    await asyncio.wait_for(in_flight.wait(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    raise IdempotencyKeyInProgressException()
+                continue
+
+            now = datetime.utcnow()
+            async with self.unit_of_work() as session:
+                repository = self.repository(session)
+                claimed = await repository.claim(
+                    key,
+                    fingerprint,
+                    locked_until=now + timedelta(seconds=self.lock_timeout),
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+                record = None if claimed else await repository.find(key)
+
+            if claimed:
+                self._in_flight[key] = asyncio.Event()
+                return None
+
+            if record is not None:
+                if record.status_code is not None:
+                    stored = StoredResponse(
+                        record.fingerprint, record.status_code, record.response_body, record.expires_at
+                    )
+                    self._remember(key, stored)
+                    return self._check(stored, fingerprint)
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyMismatchException()
+
+            if loop.time() >= deadline:
+                raise IdempotencyKeyInProgressException()
+            await asyncio.sleep(self.poll_interval)
+
+    async def complete(
+        self, session: AsyncSession, key: str, fingerprint: str, status_code: int, body: str
+    ) -> None:
+        """
+        Store the response in the request's own transaction, so it commits with the request's writes.
+        """
+        await self.repository(session).complete(key, status_code, body)
+
+        stored = StoredResponse(
+            fingerprint, status_code, body, datetime.utcnow() + timedelta(seconds=self.ttl)
+        )
+        event.listen(
+            session.sync_session, "after_commit",
+            lambda _: self._remember(key, stored), once=True,
+        )
+
+    async def finish(self, session: AsyncSession, key: str, completed: bool) -> None:
+        """
+        End a claimed request once the request's transaction does.
+
+        Waiters wake only after the stored response has committed, so they replay it
+        instead of racing the first request's writes; if the transaction rolls back, or
+        commits without a response, the key is released for retries first.
+        """
+        if not session.in_transaction():
+            # Nothing of the request's is left to commit, and a rollback would fire no event
+            if completed:
+                self._wake(key)
+            else:
+                await self.release(key)
+            return
+
+        ended = False
+
+        def on_commit(_) -> None:
+            nonlocal ended
+            if ended:
+                return
+            ended = True
+            if completed:
+                self._wake(key)
+            else:
+                self._release_later(key)
+
+        def on_rollback(_) -> None:
+            nonlocal ended
+            if ended:
+                return
+            ended = True
+            self._release_later(key)
+
+        event.listen(session.sync_session, "after_commit", on_commit, once=True)
+        event.listen(session.sync_session, "after_rollback", on_rollback, once=True)
+
+    async def release(self, key: str) -> None:
+        """
+        Release a claimed key for retries and wake its waiters.
+        """
+        try:
+            async with self.unit_of_work() as session:
+                await self.repository(session).release(key)
+        finally:
+            self._wake(key)
+
+    async def delete_expired(self) -> int:
+        """
+        Delete expired keys from the table and the cache.
+        """
+        now = datetime.utcnow()
+        for key in [key for key, stored in self._cache.items() if stored.expires_at <= now]:
+            del self._cache[key]
+
+        async with self.unit_of_work() as session:
+            return await self.repository(session).delete_expired(now)
+
+    def _wake(self, key: str) -> None:
+        in_flight = self._in_flight.pop(key, None)
+        if in_flight is not None:
+            in_flight.set()
+
+    def _release_later(self, key: str) -> None:
+        # Transaction events are synchronous, so the release runs as its own task
+        task = asyncio.get_running_loop().create_task(self.release(key))
+        self._releases.add(task)
+        task.add_done_callback(self._releases.discard)
+
+    @staticmethod
+    def fingerprint(body: bytes) -> str:
+        """
+        Digest of a request body, used to reject a key reused for a different request.
+        """
+        return hashlib.sha256(body).hexdigest()
+
+    def _cached(self, key: str) -> Optional[StoredResponse]:
+        stored = self._cache.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at <= datetime.utcnow():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return stored
+
+    def _remember(self, key: str, stored: StoredResponse) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _check(self, stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyMismatchException()
+        return stored
+
+
+class IdempotentRequest:
+    """
+    What a route sees of the store: the response to replay, if any, and a way to save its own.
+
+    Without an Idempotency-Key header there is nothing to replay and save does nothing.
+    """
+
+    def __init__(
+        self,
+        store: Optional[IdempotencyStore] = None,
+        session: Optional[AsyncSession] = None,
+        key: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        stored: Optional[StoredResponse] = None,
+    ):
+        self.store = store
+        self.session = session
+        self.key = key
+        self.fingerprint = fingerprint
+        self.stored = stored
+        self.completed = False
+
+    @property
+    def replay(self) -> Optional[Response]:
+        return self.stored.to_response() if self.stored is not None else None
+
+    async def save(self, response: BaseModel, status_code: int = 200) -> None:
+        if self.key is None or self.stored is not None:
+            return
+        await self.store.complete(
+            self.session, self.key, self.fingerprint, status_code, response.model_dump_json()
+        )
+        self.completed = True
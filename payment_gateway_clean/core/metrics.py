@@ -0,0 +1,293 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterator, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class Metric:
+    """
+    A named family of samples, one per combination of label values.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def samples(self) -> Iterator[tuple[str, tuple, tuple, float]]:
+        for labels, value in self._values.items():
+            yield self.name, self.labelnames, labels, value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: observations per bucket (the last one is +Inf), then the sum
+        self._observations: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        observations = self._observations.get(labels)
+        if observations is None:
+            observations = self._observations[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        observations[bisect_left(self.buckets, value)] += 1
+        observations[-1] += value
+
+    def samples(self) -> Iterator[tuple[str, tuple, tuple, float]]:
+        labelnames = self.labelnames + ("le",)
+        for labels, observations in self._observations.items():
+            count = 0
+            for bound, observed in zip(self.buckets + (float("inf"),), observations):
+                count += observed
+                yield f"{self.name}_bucket", labelnames, labels + (_format_bound(bound),), count
+            yield f"{self.name}_sum", self.labelnames, labels, observations[-1]
+            yield f"{self.name}_count", self.labelnames, labels, count
+
+
+class StatsGauge(Metric):
+    """
+    Exposes every numeric entry of a stats() dict as a gauge named after its key.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, stats: Callable[[], dict]):
+        super().__init__(name, documentation)
+        self.stats = stats
+
+    def samples(self) -> Iterator[tuple[str, tuple, tuple, float]]:
+        for key, value in self.stats().items():
+            if isinstance(value, (int, float)):
+                yield f"{self.name}_{key}", (), (), value
+
+
+class Registry:
+    """
+    Metrics of this process, rendered in the Prometheus text exposition format.
+
+    Updates are plain dict operations on the event loop thread, cheap enough for
+    every request and every query.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def stats(self, name: str, documentation: str, stats: Callable[[], dict]) -> StatsGauge:
+        # The latest source wins, so a rebuilt container reports its own pools
+        self._metrics.pop(name, None)
+        return self.register(StatsGauge(name, documentation, stats))
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            if not isinstance(metric, StatsGauge):
+                lines.append(f"# HELP {metric.name} {metric.documentation}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labelnames, labels, value in metric.samples():
+                if isinstance(metric, StatsGauge):
+                    lines.append(f"# HELP {name} {metric.documentation}")
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labelnames: tuple, labels: tuple) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+)
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by the repository method that issued it.",
+    ("operation",),
+)
+DB_QUERY_ERRORS = REGISTRY.counter(
+    "db_query_errors_total",
+    "Database statements that raised, by the repository method that issued them.",
+    ("operation",),
+)
+UNIT_OF_WORK_ROLLBACKS = REGISTRY.counter(
+    "unit_of_work_rollbacks_total",
+    "Units of work rolled back instead of committed.",
+)
+PAYMENT_TRANSACTIONS = REGISTRY.counter(
+    "payment_transactions_total",
+    "Committed money movements by type (topup, transfer, withdraw, ...).",
+    ("type",),
+)
+PAYMENT_AMOUNT = REGISTRY.counter(
+    "payment_amount_total",
+    "Committed amount of money moved by type.",
+    ("type",),
+)
+OUTBOX_EVENTS_PUBLISHED = REGISTRY.counter(
+    "outbox_events_published_total",
+    "Outbox events published by the relay.",
+)
+
+# Repository method whose statements are running, set by instrument_repository
+db_operation: ContextVar[str] = ContextVar("db_operation", default="other")
+
+
+def instrument_repository(cls: type) -> type:
+    """
+    Attribute the statements of every public repository method to "Class.method".
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method):
+            setattr(cls, name, _instrument_coroutine(f"{cls.__name__}.{name}", method))
+        elif inspect.isasyncgenfunction(method):
+            setattr(cls, name, _instrument_async_generator(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _instrument_coroutine(operation: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = db_operation.set(operation)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            db_operation.reset(token)
+
+    return wrapper
+
+
+def _instrument_async_generator(operation: str, method: Callable) -> Callable:
+    # The operation is only set while the generator runs, never across a yield,
+    # so it does not leak into the consumer's context
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        items = method(*args, **kwargs)
+        try:
+            while True:
+                token = db_operation.set(operation)
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    db_operation.reset(token)
+                yield item
+        finally:
+            await items.aclose()
+
+    return wrapper
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Time every statement the engine executes and count the ones that fail.
+
+    The engine's dialect methods that run statements are wrapped rather than
+    listened to: any cursor event makes SQLAlchemy dispatch every execution event
+    for every statement, which costs more than the timing itself.
+    """
+    dialect = engine.sync_engine.dialect
+    for name in ("do_execute", "do_executemany", "do_execute_no_params"):
+        setattr(dialect, name, _timed_execute(getattr(dialect, name)))
+
+
+def _timed_execute(execute: Callable) -> Callable:
+    @functools.wraps(execute)
+    def wrapper(cursor, statement, *args):
+        started = time.perf_counter()
+        try:
+            execute(cursor, statement, *args)
+        except Exception:
+            DB_QUERY_ERRORS.inc(db_operation.get())
+            raise
+        DB_QUERY_DURATION.observe(time.perf_counter() - started, db_operation.get())
+
+    return wrapper
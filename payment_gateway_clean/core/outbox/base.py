@@ -0,0 +1,23 @@
+import abc
+from typing import List
+
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+
+
+class OutboxSink(abc.ABC):
+    """
+    Where OutboxRelay publishes the events it drains from the outbox table.
+    """
+
+    @abc.abstractmethod
+    async def publish(self, events: List[OutboxEventRecordDTO]) -> None:
+        """
+        Deliver a batch of events in order; raising puts the whole batch back in the outbox.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Release any file or connection held by the sink.
+        """
+        pass
@@ -0,0 +1,30 @@
+import asyncio
+from typing import List
+
+from core.outbox.base import OutboxSink
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+
+
+class FileOutboxSink(OutboxSink):
+    """
+    Appends events to a file as JSON lines, for consumers that tail it.
+
+    Each batch is written and flushed in a worker thread so the event loop never
+    waits on the disk. Delivery is at least once: a batch written just before its
+    transaction fails is written again, so consumers dedupe on event_id.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+
+    async def publish(self, events: List[OutboxEventRecordDTO]) -> None:
+        lines = b"".join(event.model_dump_json().encode("utf-8") + b"\n" for event in events)
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: bytes) -> None:
+        self._file.write(lines)
+        self._file.flush()
+
+    async def close(self) -> None:
+        self._file.close()
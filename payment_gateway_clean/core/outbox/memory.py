@@ -0,0 +1,30 @@
+import asyncio
+from typing import List
+
+from core.outbox.base import OutboxSink
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+
+
+class InMemoryOutboxSink(OutboxSink):
+    """
+    In-process stand-in for a message broker: every subscriber gets its own queue.
+
+    Events published while nobody is subscribed are dropped, like a topic without
+    consumers.
+    """
+
+    def __init__(self):
+        self._subscribers: List[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.remove(queue)
+
+    async def publish(self, events: List[OutboxEventRecordDTO]) -> None:
+        for queue in self._subscribers:
+            for event in events:
+                queue.put_nowait(event)
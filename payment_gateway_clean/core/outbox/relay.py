@@ -0,0 +1,52 @@
+from typing import AsyncContextManager, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.metrics import OUTBOX_EVENTS_PUBLISHED
+from core.outbox.base import OutboxSink
+from domain.repository.outbox import IOutboxRepository
+
+
+class OutboxRelay:
+    """
+    Moves events from the outbox table to a sink, off the request path.
+
+    Requests only insert outbox rows in their own transaction. The relay later takes
+    a batch with DELETE ... RETURNING, publishes it and commits; if publishing
+    fails the transaction rolls back and the batch is taken again next time.
+    """
+
+    def __init__(
+        self,
+        unit_of_work: Callable[[], AsyncContextManager[AsyncSession]],
+        repository: Callable[[AsyncSession], IOutboxRepository],
+        sink: OutboxSink,
+        batch_size: int = 500,
+    ):
+        self.unit_of_work = unit_of_work
+        self.repository = repository
+        self.sink = sink
+        self.batch_size = batch_size
+
+    async def relay_batch(self) -> int:
+        """
+        Publish one batch of the oldest events, returning how many were published.
+        """
+        async with self.unit_of_work() as session:
+            events = await self.repository(session).take(self.batch_size)
+            if events:
+                await self.sink.publish(events)
+
+        OUTBOX_EVENTS_PUBLISHED.inc(amount=len(events))
+        return len(events)
+
+    async def drain(self) -> int:
+        """
+        Publish batches until the outbox is empty, returning how many events were published.
+        """
+        published = 0
+        while True:
+            count = await self.relay_batch()
+            published += count
+            if count < self.batch_size:
+                return published
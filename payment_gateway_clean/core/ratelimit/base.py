@@ -0,0 +1,29 @@
+import abc
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+
+
+class RateLimitBackend(abc.ABC):
+    """
+    Storage and algorithm behind RateLimitMiddleware.
+    """
+
+    @abc.abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        """
+        Record one request for ``key`` and report whether it fits in ``limit`` per ``window`` seconds.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Release any connection held by the backend.
+        """
+        pass
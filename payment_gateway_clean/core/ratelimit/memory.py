@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+
+from core.ratelimit.base import RateLimitBackend, RateLimitResult
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process token bucket: each key holds ``limit`` tokens refilled evenly over ``window``.
+
+    Buckets live in an LRU capped at ``max_keys``. A bucket idle for a full window
+    has refilled completely, so it is dropped as well; memory therefore stays
+    bounded even when scanned by many distinct clients.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        refill_rate = limit / window
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = float(limit)
+        else:
+            tokens, updated_at, _ = bucket
+            tokens = min(float(limit), tokens + (now - updated_at) * refill_rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now, now + window)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=int(tokens),
+            reset_after=(limit - tokens) / refill_rate,
+        )
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (_, _, expires_at) = next(iter(self._buckets.items()))
+            if expires_at > now:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
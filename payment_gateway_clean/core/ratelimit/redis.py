@@ -0,0 +1,58 @@
+import math
+import time
+from typing import Any
+
+from core.ratelimit.base import RateLimitBackend, RateLimitResult
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Sliding-window counter shared by every worker through a Redis-protocol store.
+
+    Each key keeps one counter per fixed window; the estimate weights the previous
+    window by how much of it still overlaps the sliding window. That needs only
+    INCR/PEXPIRE/GET in a single pipeline, so any Redis-compatible server (or a
+    local fake such as fakeredis) works without Lua scripting.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time.time()
+        current_window = math.floor(now / window)
+        elapsed = now - current_window * window
+
+        current_key = f"{self.prefix}:{key}:{current_window}"
+        previous_key = f"{self.prefix}:{key}:{current_window - 1}"
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.pexpire(current_key, int(window * 2000))
+            pipe.get(previous_key)
+            current_count, _, previous_count = await pipe.execute()
+
+        previous_weight = (window - elapsed) / window
+        estimated = int(previous_count or 0) * previous_weight + int(current_count)
+
+        return RateLimitResult(
+            allowed=estimated <= limit,
+            limit=limit,
+            remaining=max(0, math.floor(limit - estimated)),
+            reset_after=window - elapsed,
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_redis_backend(url: str) -> RedisRateLimitBackend:
+    try:
+        from redis import asyncio as aioredis
+    except ImportError as e:
+        raise RuntimeError(
+            "rate_limit_backend=redis requires the 'redis' package"
+        ) from e
+
+    return RedisRateLimitBackend(aioredis.from_url(url))
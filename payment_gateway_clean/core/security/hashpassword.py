@@ -1,15 +1,18 @@
-import bcrypt
 from typing import Union
 from core.errors import BcryptError, HashingError
+from core.exceptions.hashing_pool_exception import HashingPoolSaturatedException
+from core.security.hashpool import HashingPool
 
 
 class Hashing:
     """
     A utility class for password hashing and verification using bcrypt.
+
+    The bcrypt work runs on a bounded HashingPool so it never blocks the event loop.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, pool: HashingPool):
+        self.pool = pool
 
     async def hash_password(self, password: str) -> str:
         """
@@ -18,10 +21,13 @@ class Hashing:
         :param password: The plain-text password to be hashed.
         :return: The hashed password as a string.
         :raises HashingError: If the password cannot be hashed.
+        :raises HashingPoolSaturatedException: If the hashing pool is full.
         """
         try:
-            hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+            hashed = await self.pool.hash_password(password.encode("utf-8"))
             return hashed.decode("utf-8")
+        except HashingPoolSaturatedException:
+            raise
         except Exception as e:
             raise HashingError(f"Error hashing password: {str(e)}")
 
@@ -32,11 +38,16 @@ class Hashing:
         :param hashed_password: The hashed password.
         :param password: The plain-text password to be verified.
         :raises BcryptError: If the passwords do not match or if there is an error during verification.
+        :raises HashingPoolSaturatedException: If the hashing pool is full.
         """
         try:
-            if bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8")):
+            if await self.pool.check_password(
+                password.encode("utf-8"), hashed_password.encode("utf-8")
+            ):
                 return  # Password matches
             else:
                 raise BcryptError("Passwords do not match.")
+        except HashingPoolSaturatedException:
+            raise
         except Exception as e:
             raise BcryptError(f"Error verifying password: {str(e)}")
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import bcrypt
+
+from core.exceptions.hashing_pool_exception import HashingPoolSaturatedException
+
+T = TypeVar("T")
+
+
+def _timed(func: Callable[..., T], *args: Any) -> tuple[T, float, float]:
+    """
+    Runs inside the worker and reports when the job actually started and finished,
+    so queueing delay can be told apart from bcrypt work.
+    """
+    started = time.monotonic()
+    result = func(*args)
+    return result, started, time.monotonic()
+
+
+def _hashpw(password: bytes) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+
+def _checkpw(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class HashingPool:
+    """
+    A bounded worker pool that keeps bcrypt off the event loop.
+
+    At most ``max_pending`` jobs may be queued or running at once; beyond that
+    new jobs are rejected with HashingPoolSaturatedException (HTTP 503) instead
+    of piling up behind each other.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool = False):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if use_processes
+            else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        )
+
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+
+    async def hash_password(self, password: bytes) -> bytes:
+        return await self._submit(_hashpw, password)
+
+    async def check_password(self, password: bytes, hashed_password: bytes) -> bool:
+        return await self._submit(_checkpw, password, hashed_password)
+
+    async def _submit(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HashingPoolSaturatedException()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            enqueued = time.monotonic()
+            result, started, finished = await loop.run_in_executor(
+                self._executor, _timed, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        wait_seconds = max(started - enqueued, 0.0)
+        hash_seconds = finished - started
+        self._completed += 1
+        self._wait_seconds_total += wait_seconds
+        self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+        self._hash_seconds_total += hash_seconds
+        self._hash_seconds_max = max(self._hash_seconds_max, hash_seconds)
+        return result
+
+    def stats(self) -> dict:
+        completed = self._completed or 1
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_seconds_total": self._wait_seconds_total,
+            "wait_seconds_avg": self._wait_seconds_total / completed,
+            "wait_seconds_max": self._wait_seconds_max,
+            "hash_seconds_total": self._hash_seconds_total,
+            "hash_seconds_avg": self._hash_seconds_total / completed,
+            "hash_seconds_max": self._hash_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
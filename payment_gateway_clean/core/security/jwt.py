@@ -1,13 +1,39 @@
-from jose import jwt
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+
+import jwt as pyjwt
+from jose import jwt as jose_jwt
 from domain.dtos.record.claims import Claims
 from core.errors import TokenGenerationError, TokenExpiredError, TokenValidationError
 
 class JwtConfig:
-    def __init__(self, jwt_secret: str, jwt_expired: int):
+    """
+    Issues and verifies JWT tokens.
+
+    Verified tokens are kept in a bounded LRU cache keyed on the token digest,
+    so repeated requests with the same token skip the signature check. An entry
+    never outlives the token's ``exp``.
+    """
+
+    def __init__(
+        self,
+        jwt_secret: str,
+        jwt_expired: int,
+        algorithm: str = "HS256",
+        backend: str = "pyjwt",
+        cache_size: int = 10_000,
+        cache_ttl: float = 300,
+    ):
         self.jwt_secret = jwt_secret
         self.jwt_token_expiration_minutes = jwt_expired
+        self.algorithm = algorithm
+        self.backend = backend
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
 
     def generate_token(self, user_id: int) -> str:
         """
@@ -19,36 +45,65 @@ class JwtConfig:
         """
         try:
             # Set the expiration time based on the provided expiration duration
-            exp_time = datetime.utcnow() + timedelta(minutes=self.jwt_token_expiration_minutes)
+            now = datetime.now(timezone.utc)
+            exp_time = now + timedelta(minutes=self.jwt_token_expiration_minutes)
             claims = Claims(
-                user_id=user_id, 
+                user_id=user_id,
                 exp=exp_time.timestamp(),  # Set the expiration as a Unix timestamp
-                iat=datetime.utcnow().timestamp()
+                iat=now.timestamp()
             )
             # Encode the token
-            token = jwt.encode(claims.dict(), self.jwt_secret, algorithm="HS256")
-           
-            return token
+            if self.backend == "jose":
+                return jose_jwt.encode(claims.model_dump(), self.jwt_secret, algorithm=self.algorithm)
+
+            return pyjwt.encode(claims.model_dump(), self.jwt_secret, algorithm=self.algorithm)
         except Exception as e:
             raise TokenGenerationError(f"Failed to generate token: {str(e)}")
 
     def verify_token(self, token: str) -> Optional[int]:
+        """
+        Verifies a JWT token and returns its user ID.
+
+        :param token: Encoded JWT token
+        :return: ID of the user the token was issued to
+        :raises TokenExpiredError: If the token has expired
+        :raises TokenValidationError: If the token is invalid
+        """
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            user_id, expires_at = cached
+            if expires_at > now:
+                self._cache.move_to_end(key)
+                return user_id
+            del self._cache[key]
+
+        claims = self._decode(token)
+
+        # Use UTC time for comparison
+        if claims.exp <= now:
+            raise TokenExpiredError("Token has expired")
+
+        if self.cache_size > 0:
+            self._cache[key] = (claims.user_id, min(claims.exp, now + self.cache_ttl))
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return claims.user_id
+
+    def _decode(self, token: str) -> Claims:
         try:
             # Decode the token and verify its signature and claims
-            decoded_token = jwt.decode(token, self.jwt_secret, algorithms="HS256")
-            claims = Claims(**decoded_token)
-
-            # Use UTC time for comparison
-            current_time = datetime.utcnow().timestamp()
-            
-            # Check if the current time is before the expiration time
-            if claims.exp > current_time:
-                return claims.user_id
+            if self.backend == "jose":
+                decoded_token = jose_jwt.decode(token, self.jwt_secret, algorithms=[self.algorithm])
             else:
-                raise TokenExpiredError("Token has expired")
-        except jwt.ExpiredSignatureError:
+                decoded_token = pyjwt.decode(token, self.jwt_secret, algorithms=[self.algorithm])
+            return Claims(**decoded_token)
+        except (pyjwt.ExpiredSignatureError, jose_jwt.ExpiredSignatureError):
             raise TokenExpiredError("Token has expired")
-        except jwt.JWTError as e:
+        except (pyjwt.InvalidTokenError, jose_jwt.JWTError) as e:
             raise TokenValidationError(f"Invalid token: {str(e)}")
         except Exception as e:
             raise TokenValidationError(f"Token validation failed: {str(e)}")
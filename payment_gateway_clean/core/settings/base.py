@@ -2,6 +2,8 @@ from pydantic import Extra, computed_field
 from pydantic_settings import BaseSettings
 from sqlalchemy import URL
 
+from core.pool import MonitoredQueuePool
+
 
 class AppEnvTypes:
     production : str = "prod"
@@ -19,9 +21,97 @@ class BaseAppSettings(BaseSettings):
     postgres_password: str
     postgres_db: str
 
+    # Connection pool sizing, per worker process
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # asyncpg prepared statement cache; set to 0 behind PgBouncer in transaction mode
+    db_statement_cache_size: int = 100
+    db_command_timeout: float = 60
+
     jwt_secret_key: str
     jwt_token_expiration_minutes: int = 60 * 24 * 7  # one week.
     jwt_algorithm: str = "HS256"
+    # "pyjwt" or "jose"
+    jwt_backend: str = "pyjwt"
+    jwt_cache_size: int = 10_000
+    jwt_cache_ttl_seconds: float = 300
+
+    transfer_batch_max_items: int = 1000
+    # Transfers applied per SAVEPOINT in a batch; 0 applies the whole batch at once
+    transfer_batch_chunk_size: int = 0
+
+    withdraw_batch_max_items: int = 1000
+
+    # Hot accounts whose balance is spread over saldo_shard_count sub-balance rows
+    saldo_hot_user_ids: list[int] = []
+    saldo_shard_count: int = 8
+    # How often shards are folded back into saldo; 0 disables the background job
+    saldo_shard_compaction_interval_seconds: float = 60
+
+    # Topup rows validated and written per SAVEPOINT by the batch ingestion endpoint
+    topup_batch_chunk_size: int = 1000
+
+    # How often ledger balances are checkpointed; 0 disables the background job
+    ledger_checkpoint_interval_seconds: float = 300
+
+    # How long a stored Idempotency-Key response can be replayed
+    idempotency_ttl_seconds: float = 86_400
+    # How long an in-flight request holds its key before a duplicate may take it over
+    idempotency_lock_timeout_seconds: float = 60
+    idempotency_cache_size: int = 10_000
+    # How often expired keys are deleted; 0 disables the background job
+    idempotency_sweep_interval_seconds: float = 3600
+
+    # Where the outbox relay publishes money movement events: "file" or "memory" (in process, for tests)
+    outbox_sink: str = "file"
+    outbox_file_path: str = "outbox_events.ndjson"
+    outbox_batch_size: int = 500
+    # How often the relay drains the outbox; 0 disables the background job
+    outbox_relay_interval_seconds: float = 1
+
+    # Users cached by the read-through cache in front of the user repository; 0 disables it
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: float = 60
+
+    # Render logs as JSON instead of the colored console format
+    logging_json: bool = False
+    # JSON logs filtered at configuration time, rendered with orjson and written off the event loop thread
+    logging_high_throughput: bool = False
+
+    # Per-user dashboard summaries, dropped whenever the user's rows change; 0 disables the cache
+    summary_cache_size: int = 10_000
+    summary_cache_ttl_seconds: float = 60
+
+    # How often new ledger entries are folded into the report rollups; 0 disables the background job
+    report_rollup_interval_seconds: float = 60
+    # Ledger entries folded in per transaction
+    report_rollup_batch_size: int = 10_000
+
+    # Serve Prometheus metrics on /metrics and instrument requests and queries for it
+    metrics_enabled: bool = True
+
+    # Span exporter: "none", "console", "otlp" or "memory" (kept in process, for tests)
+    tracing_exporter: str = "none"
+    # Fraction of new traces recorded; requests continuing a caller's trace follow its decision
+    tracing_sample_ratio: float = 1.0
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_service_name: str = "payment-gateway"
+
+    hashing_pool_workers: int = 4
+    hashing_pool_max_pending: int = 64
+    hashing_pool_use_processes: bool = False
+
+    # Rate limiting: "memory" is per worker, "redis" is shared by every worker
+    rate_limit_backend: str = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_window_seconds: int = 60
+    rate_limit_requests: int = 100
+    rate_limit_user_requests: int = 100
+    rate_limit_routes: dict[str, int] = {}
+    rate_limit_max_keys: int = 100_000
 
     class Config:
         env_file = ".env"
@@ -39,7 +129,23 @@ class BaseAppSettings(BaseSettings):
             database=self.postgres_db,
         )
 
+    @property
+    def sqlalchemy_connect_args(self) -> dict:
+        return dict(
+            statement_cache_size=self.db_statement_cache_size,
+            command_timeout=self.db_command_timeout,
+        )
+
     @computed_field  
     @property
     def sqlalchemy_engine_props(self) -> dict:
-        return dict(url=self.sql_db_uri)
\ No newline at end of file
+        return dict(
+            url=self.sql_db_uri,
+            poolclass=MonitoredQueuePool,
+            pool_size=self.db_pool_size,
+            max_overflow=self.db_max_overflow,
+            pool_timeout=self.db_pool_timeout,
+            pool_recycle=self.db_pool_recycle,
+            pool_pre_ping=self.db_pool_pre_ping,
+            connect_args=self.sqlalchemy_connect_args,
+        )
\ No newline at end of file
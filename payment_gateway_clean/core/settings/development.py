@@ -17,4 +17,4 @@ class DevAppSettings(AppSettings):
     @computed_field
     @property
     def sqlalchemy_engine_props(self) -> dict:
-        return dict(url=self.sql_db_uri, echo=True)
\ No newline at end of file
+        return dict(super().sqlalchemy_engine_props, echo=True)
\ No newline at end of file
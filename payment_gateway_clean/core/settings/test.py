@@ -24,5 +24,6 @@ class TestAppSettings(AppSettings):
             url=self.sql_db_uri,
             echo=False,
             poolclass=NullPool,
-            isolation_level="AUTOCOMMIT"
+            isolation_level="AUTOCOMMIT",
+            connect_args=self.sqlalchemy_connect_args,
         )
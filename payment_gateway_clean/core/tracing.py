@@ -0,0 +1,190 @@
+import functools
+import inspect
+from typing import Any, Callable, Mapping, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.settings.base import BaseAppSettings
+from domain.dtos.response.api import ErrorResponse
+
+try:
+    from opentelemetry import context, propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # tracing is an optional extra
+    trace = None
+
+# Set by configure_tracing; while it is None every traced call runs untouched
+_tracer: Optional[Any] = None
+
+
+def configure_tracing(settings: BaseAppSettings) -> Optional[Any]:
+    """
+    Build the tracer for settings.tracing_exporter and return its span exporter.
+
+    "console" prints finished spans, "otlp" sends them to tracing_otlp_endpoint and
+    "memory" keeps them in an InMemorySpanExporter, exported synchronously so tests
+    can read them as soon as a request returns. "none" leaves tracing off.
+    """
+    global _tracer
+
+    if settings.tracing_exporter == "none":
+        _tracer = None
+        return None
+
+    try:
+        if trace is None:
+            raise ImportError("opentelemetry")
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+            SimpleSpanProcessor,
+        )
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        raise RuntimeError(
+            "tracing_exporter requires the 'opentelemetry-sdk' package"
+        ) from e
+
+    if settings.tracing_exporter == "memory":
+        exporter = InMemorySpanExporter()
+        processor = SimpleSpanProcessor(exporter)
+    elif settings.tracing_exporter == "console":
+        exporter = ConsoleSpanExporter()
+        processor = BatchSpanProcessor(exporter)
+    elif settings.tracing_exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                "tracing_exporter=otlp requires the 'opentelemetry-exporter-otlp-proto-http' package"
+            ) from e
+        exporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+        processor = BatchSpanProcessor(exporter)
+    else:
+        raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(processor)
+    _tracer = provider.get_tracer("payment_gateway")
+    return exporter
+
+
+def get_tracer() -> Optional[Any]:
+    return _tracer
+
+
+def start_server_span(name: str, headers: Mapping[str, str], **attributes: Any):
+    """
+    Start the span of an incoming request, continuing the caller's trace from its traceparent header.
+    """
+    return _tracer.start_as_current_span(
+        name, context=propagate.extract(headers), kind=SpanKind.SERVER, attributes=attributes
+    )
+
+
+def set_error(span: Any, description: str) -> None:
+    span.set_status(Status(StatusCode.ERROR, description))
+
+
+def trace_methods(cls: type) -> type:
+    """
+    Run every public method of a service or repository in a span named "Class.method".
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method):
+            setattr(cls, name, _trace_coroutine(f"{cls.__name__}.{name}", method))
+        elif inspect.isasyncgenfunction(method):
+            setattr(cls, name, _trace_async_generator(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _trace_coroutine(span_name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return await method(*args, **kwargs)
+
+        with _tracer.start_as_current_span(span_name) as span:
+            result = await method(*args, **kwargs)
+            # Services report failures as an ErrorResponse instead of raising
+            if isinstance(result, ErrorResponse):
+                set_error(span, result.message)
+            return result
+
+    return wrapper
+
+
+def _trace_async_generator(span_name: str, method: Callable) -> Callable:
+    # The span is only current while the generator runs, never across a yield,
+    # so it does not leak into the consumer's context
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if _tracer is None:
+            async for item in method(*args, **kwargs):
+                yield item
+            return
+
+        span = _tracer.start_span(span_name)
+        items = method(*args, **kwargs)
+        try:
+            while True:
+                token = context.attach(trace.set_span_in_context(span))
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    context.detach(token)
+                yield item
+        except Exception as e:
+            span.record_exception(e)
+            set_error(span, str(e))
+            raise
+        finally:
+            await items.aclose()
+            span.end()
+
+    return wrapper
+
+
+def trace_engine(engine: AsyncEngine) -> None:
+    """
+    Give every statement the engine executes its own span carrying the SQL.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None:
+            return
+        span = _tracer.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            attributes={
+                "db.system": conn.dialect.name,
+                "db.statement": statement,
+                "db.executemany": executemany,
+            },
+        )
+        context._tracing_span = span
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_tracing_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            set_error(span, str(exception_context.original_exception))
+            span.end()
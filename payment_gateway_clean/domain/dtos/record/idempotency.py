@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class IdempotencyRecordDTO(BaseModel):
+    key: str
+    fingerprint: str
+    status_code: Optional[int]
+    response_body: Optional[str]
+    locked_until: datetime
+    expires_at: datetime
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class OutboxEventRecordDTO(BaseModel):
+    event_id: int
+    event_type: str
+    txn_ref: str
+    payload: dict
+    created_at: datetime
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ReportRowRecordDTO(BaseModel):
+    # Only the column the report is grouped by is set
+    bucket: Optional[datetime] = None
+    method: Optional[str] = None
+    user_id: Optional[int] = None
+    amount: int
+    count: int
@@ -9,8 +9,9 @@ class SaldoRecordDTO(BaseModel):
     total_balance: int
     withdraw_amount: Optional[int]
     withdraw_time: Optional[datetime]
+    version: int = 0
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class UserTotalsRecordDTO(BaseModel):
+    user_id: int
+    # None while the user has no saldo
+    balance: Optional[int]
+    topup_amount: int
+    topup_count: int
+    transfer_in_amount: int
+    transfer_in_count: int
+    transfer_out_amount: int
+    transfer_out_count: int
+    withdraw_amount: int
+    withdraw_count: int
@@ -11,4 +11,4 @@ class TopupRecordDTO(BaseModel):
     updated_at: datetime
 
     class Config:
-        orm_config = True
\ No newline at end of file
+        from_attributes = True
@@ -10,4 +10,4 @@ class WithdrawRecordDTO(BaseModel):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
\ No newline at end of file
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class CreateLedgerEntryRequest(BaseModel):
+    txn_ref: str
+    # None is the outside world, e.g. the payment channel behind a topup
+    user_id: Optional[int]
+    amount: int
+    entry_type: str
+
+    @staticmethod
+    def topup(topup_id: int, user_id: int, amount: int) -> List['CreateLedgerEntryRequest']:
+        """
+        Money entering the system: credit the user, debit the outside world.
+        """
+        return CreateLedgerEntryRequest.between(f"topup:{topup_id}", "topup", None, user_id, amount)
+
+    @staticmethod
+    def withdraw(withdraw_id: int, user_id: int, amount: int) -> List['CreateLedgerEntryRequest']:
+        """
+        Money leaving the system: debit the user, credit the outside world.
+        """
+        return CreateLedgerEntryRequest.between(f"withdraw:{withdraw_id}", "withdraw", user_id, None, amount)
+
+    @staticmethod
+    def transfer(transfer_id: int, transfer_from: int, transfer_to: int, amount: int) -> List['CreateLedgerEntryRequest']:
+        """
+        Money moving between two users.
+        """
+        return CreateLedgerEntryRequest.between(f"transfer:{transfer_id}", "transfer", transfer_from, transfer_to, amount)
+
+    @staticmethod
+    def between(
+        txn_ref: str, entry_type: str, debit_user_id: Optional[int], credit_user_id: Optional[int], amount: int
+    ) -> List['CreateLedgerEntryRequest']:
+        """
+        A balanced pair of entries moving amount from one account to another.
+        """
+        return [
+            CreateLedgerEntryRequest(txn_ref=txn_ref, user_id=debit_user_id, amount=-amount, entry_type=entry_type),
+            CreateLedgerEntryRequest(txn_ref=txn_ref, user_id=credit_user_id, amount=amount, entry_type=entry_type),
+        ]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+
+
+class CreateOutboxEventRequest(BaseModel):
+    event_type: str
+    txn_ref: str
+    payload: dict
+
+    @staticmethod
+    def movements(event_type: str, entries: List[CreateLedgerEntryRequest]) -> List['CreateOutboxEventRequest']:
+        """
+        One event per balanced pair of ledger entries, naming who paid whom and how much.
+        """
+        return [
+            CreateOutboxEventRequest(
+                event_type=event_type,
+                txn_ref=credit.txn_ref,
+                payload={
+                    "from_user_id": debit.user_id,
+                    "to_user_id": credit.user_id,
+                    "amount": credit.amount,
+                },
+            )
+            for debit, credit in zip(entries[::2], entries[1::2])
+            if credit.amount
+        ]
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+T = TypeVar("T")
+
+
+class PaginationRequest(BaseModel):
+    limit: int = Field(
+        DEFAULT_PAGE_LIMIT,
+        ge=1,
+        le=MAX_PAGE_LIMIT,
+        description="Maximum number of records to return",
+    )
+    cursor: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Return records after this id (the next_cursor of the previous page)",
+    )
+
+    @property
+    def fetch_limit(self) -> int:
+        """
+        Number of rows to request: one extra row tells whether another page exists.
+        """
+        return self.limit + 1
+
+    def split_page(self, records: List[T], get_id: Callable[[T], int]) -> Tuple[List[T], Optional[int]]:
+        """
+        Trims records fetched with fetch_limit to the page size and returns the next cursor.
+        """
+        if len(records) <= self.limit:
+            return records, None
+
+        page = records[: self.limit]
+        return page, get_id(page[-1])
@@ -19,3 +19,16 @@ class UpdateSaldoRequest(BaseModel):
 class UpdateSaldoBalanceRequest(BaseModel):
     total_balance: int
     user_id: int
+
+
+class UpdateSaldoDeltaRequest(BaseModel):
+    user_id: int
+    amount: int
+    # Lowest balance the update may leave behind; None allows any result
+    min_balance: Optional[int] = 0
+
+
+class UpdateSaldoWithdraw(BaseModel):
+    user_id: int
+    withdraw_amount: int
+    withdraw_time: datetime
@@ -20,6 +20,10 @@ class ApiResponse(BaseModel, Generic[T]):
         super().__init__(status=status, message=message, data=data, **kwargs)
 
 
+class PaginatedApiResponse(ApiResponse[T], Generic[T]):
+    next_cursor: Optional[int] = None
+
+
 class ErrorResponse(BaseModel):
     status: str
     message: str
\ No newline at end of file
@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from domain.dtos.record.report import ReportRowRecordDTO
+
+
+class ReportRow(BaseModel):
+    bucket: Optional[datetime] = None
+    method: Optional[str] = None
+    user_id: Optional[int] = None
+    amount: int
+    count: int
+
+    @staticmethod
+    def from_dto(dto: ReportRowRecordDTO) -> 'ReportRow':
+        """
+        Converts a ReportRowRecordDTO to a ReportRow.
+        """
+        return ReportRow(
+            bucket=dto.bucket,
+            method=dto.method,
+            user_id=dto.user_id,
+            amount=dto.amount,
+            count=dto.count
+        )
+
+    @staticmethod
+    def from_dtos(dtos: List[ReportRowRecordDTO]) -> List['ReportRow']:
+        """
+        Converts a list of ReportRowRecordDTO to a list of ReportRow.
+        """
+        return [ReportRow.from_dto(dto) for dto in dtos]
+
+
+class ReportResponse(BaseModel):
+    kind: str
+    group_by: str
+    # Rows cover movements posted in [start, end)
+    start: datetime
+    end: datetime
+    # Movements posted after this time are not rolled up yet
+    as_of: Optional[datetime]
+    total_amount: int
+    total_count: int
+    rows: List[ReportRow]
@@ -27,3 +27,9 @@ class SaldoResponse(BaseModel):
         Converts a list of SaldoRecordDTO to a list of SaldoResponse.
         """
         return [SaldoResponse.from_dto(dto) for dto in dtos]
+
+
+class SaldoBalanceAtResponse(BaseModel):
+    user_id: int
+    balance: int
+    at: datetime
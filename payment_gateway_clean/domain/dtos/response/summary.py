@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from domain.dtos.response.topup import TopupResponse
+from domain.dtos.response.transfer import TransferResponse
+from domain.dtos.response.withdraw import WithdrawResponse
+
+
+class PeriodTotals(BaseModel):
+    amount: int
+    count: int
+
+
+class UserSummaryResponse(BaseModel):
+    user_id: int
+    balance: Optional[int]
+    # Totals cover the records created since this time
+    since: datetime
+    topups: PeriodTotals
+    transfers_in: PeriodTotals
+    transfers_out: PeriodTotals
+    withdraws: PeriodTotals
+    recent_topups: List[TopupResponse]
+    recent_transfers: List[TransferResponse]
+    recent_withdraws: List[WithdrawResponse]
@@ -29,3 +29,15 @@ class TopupResponse(BaseModel):
         Converts a list of TopupRecordDTO to a list of TopupResponse.
         """
         return [TopupResponse.from_dto(dto) for dto in dtos]
+
+
+class TopupBatchFailure(BaseModel):
+    row: int
+    message: str
+
+
+class TopupBatchResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    failures: List[TopupBatchFailure]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from domain.dtos.record.transfer import TransferRecordDTO
 
@@ -30,3 +30,10 @@ class TransferResponse(BaseModel):
         """
         return [TransferResponse.from_dto(dto) for dto in dtos]
 
+
+
+class TransferBatchItemResponse(BaseModel):
+    index: int
+    status: str
+    message: Optional[str] = None
+    data: Optional[TransferResponse] = None
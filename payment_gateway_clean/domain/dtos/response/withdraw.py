@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from domain.dtos.record.withdraw import WithdrawRecordDTO
 
@@ -26,4 +26,10 @@ class WithdrawResponse(BaseModel):
         """
         Converts a list of WithdrawRecordDTO to a list of WithdrawResponse.
         """
-        return [WithdrawResponse.from_dto(dto) for dto in dtos]
\ No newline at end of file
+        return [WithdrawResponse.from_dto(dto) for dto in dtos]
+
+class WithdrawBatchItemResponse(BaseModel):
+    index: int
+    status: str
+    message: Optional[str] = None
+    data: Optional[WithdrawResponse] = None
@@ -0,0 +1,45 @@
+import abc
+from datetime import datetime
+from typing import Optional
+from domain.dtos.record.idempotency import IdempotencyRecordDTO
+
+
+class IIdempotencyRepository(abc.ABC):
+    """
+    Idempotency Repository interface for storing the outcome of idempotent requests.
+    """
+
+    @abc.abstractmethod
+    async def claim(self, key: str, fingerprint: str, locked_until: datetime, expires_at: datetime) -> bool:
+        """
+        Claim a key for a new request, returning False if another request holds or has completed it.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find(self, key: str) -> Optional[IdempotencyRecordDTO]:
+        """
+        Find the record stored for a key.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def complete(self, key: str, status_code: int, response_body: str) -> None:
+        """
+        Store the response of the request holding a key.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def release(self, key: str) -> None:
+        """
+        Drop the claim on a key whose request failed, so a retry can run again.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def delete_expired(self, now: datetime) -> int:
+        """
+        Delete every key that expired before now, returning how many were removed.
+        """
+        pass
@@ -0,0 +1,31 @@
+import abc
+from datetime import datetime
+from typing import List
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+
+
+class ILedgerRepository(abc.ABC):
+    """
+    Ledger Repository interface for the append-only record of money movements.
+    """
+
+    @abc.abstractmethod
+    async def record(self, entries: List[CreateLedgerEntryRequest]) -> None:
+        """
+        Append balanced entries to the ledger.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def balance_at(self, user_id: int, at: datetime) -> int:
+        """
+        Compute a user's balance at a point in time from the nearest checkpoint plus later entries.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def create_checkpoints(self) -> int:
+        """
+        Roll every user's latest checkpoint forward over the transactions that have ended, returning the number of checkpoints written.
+        """
+        pass
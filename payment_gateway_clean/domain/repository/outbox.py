@@ -0,0 +1,24 @@
+import abc
+from typing import List
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+from domain.dtos.request.outbox import CreateOutboxEventRequest
+
+
+class IOutboxRepository(abc.ABC):
+    """
+    Outbox Repository interface for events written in the same transaction as the change they describe.
+    """
+
+    @abc.abstractmethod
+    async def add(self, events: List[CreateOutboxEventRequest]) -> None:
+        """
+        Queue events for the relay.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def take(self, limit: int) -> List[OutboxEventRecordDTO]:
+        """
+        Remove and return up to limit of the oldest events, skipping rows another relay holds.
+        """
+        pass
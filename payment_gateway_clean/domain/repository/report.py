@@ -0,0 +1,47 @@
+import abc
+from datetime import datetime
+from typing import List, Optional
+from domain.dtos.record.report import ReportRowRecordDTO
+
+
+class IReportRepository(abc.ABC):
+    """
+    Report Repository interface for the rollup tables behind the reporting endpoints.
+    """
+
+    @abc.abstractmethod
+    async def roll_up(self, limit: int) -> int:
+        """
+        Fold up to limit ledger entries of transactions that have ended past the watermark into the rollups, returning how many were read.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_rolled_up_to(self) -> Optional[datetime]:
+        """
+        Find the time the rollups include every movement up to.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_by_hour(self, kind: str, start: datetime, end: datetime) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of one movement type per hour in [start, end), oldest first.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_by_method(self, kind: str, start: datetime, end: datetime) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of one movement type per method in [start, end), largest first.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_by_user(
+        self, kind: str, start: datetime, end: datetime, limit: int
+    ) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of the limit users that moved the most in [start, end), largest first.
+        """
+        pass
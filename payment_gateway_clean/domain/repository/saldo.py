@@ -1,7 +1,13 @@
 import abc
-from typing import List, Optional, Any
+from typing import AsyncIterator, Callable, List, Optional, Any
 from domain.dtos.record.saldo import SaldoRecordDTO
-from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoBalanceRequest, UpdateSaldoRequest
+from domain.dtos.request.saldo import (
+    CreateSaldoRequest,
+    UpdateSaldoBalanceRequest,
+    UpdateSaldoDeltaRequest,
+    UpdateSaldoRequest,
+    UpdateSaldoWithdraw,
+)
 
 class ISaldoRepository(abc.ABC):
     """
@@ -9,9 +15,16 @@ class ISaldoRepository(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def find_all(self) -> List[SaldoRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[SaldoRecordDTO]:
         """
-        Retrieve all saldo records.
+        Retrieve a page of saldo records ordered by ID, starting after the given cursor.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[SaldoRecordDTO]:
+        """
+        Stream saldo records ordered by ID without loading them all into memory.
         """
         pass
 
@@ -57,6 +70,45 @@ class ISaldoRepository(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def apply_delta(self, input: UpdateSaldoDeltaRequest) -> SaldoRecordDTO:
+        """
+        Atomically add a signed amount to a user's balance, enforcing the minimum balance.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def update_saldo_withdraw(self, input: UpdateSaldoWithdraw) -> SaldoRecordDTO:
+        """
+        Atomically debit a withdrawal if the balance covers it and record it as the last withdrawal.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def update_balance_optimistic(
+        self, user_id: int, compute: Callable[[int], int], max_retries: int = 3
+    ) -> SaldoRecordDTO:
+        """
+        Set the balance to compute(current balance), retrying if another writer changed it first.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def compact_shards(self) -> int:
+        """
+        Fold every user's shards back into their saldo row, returning the number of users compacted.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def lock_by_user_id(
+        self, id: int, nowait: bool = False, skip_locked: bool = False
+    ) -> Optional[SaldoRecordDTO]:
+        """
+        Lock a user's saldo row until the end of the current transaction.
+        """
+        pass
+
     @abc.abstractmethod
     async def delete(self, id: int) -> None:
         """
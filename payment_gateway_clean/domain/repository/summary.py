@@ -0,0 +1,41 @@
+import abc
+from datetime import datetime
+from typing import List, Optional
+from domain.dtos.record.summary import UserTotalsRecordDTO
+from domain.dtos.record.topup import TopupRecordDTO
+from domain.dtos.record.transfer import TransferRecordDTO
+from domain.dtos.record.withdraw import WithdrawRecordDTO
+
+
+class ISummaryRepository(abc.ABC):
+    """
+    Summary Repository interface for the read-only queries behind a user's dashboard summary.
+    """
+
+    @abc.abstractmethod
+    async def find_totals(self, user_id: int, since: datetime) -> Optional[UserTotalsRecordDTO]:
+        """
+        Find a user's balance and the totals and counts of each movement type created since the given time.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_recent_topups(self, user_id: int, limit: int) -> List[TopupRecordDTO]:
+        """
+        Retrieve a user's latest topups, newest first.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_recent_transfers(self, user_id: int, limit: int) -> List[TransferRecordDTO]:
+        """
+        Retrieve the latest transfers a user sent or received, newest first.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def find_recent_withdraws(self, user_id: int, limit: int) -> List[WithdrawRecordDTO]:
+        """
+        Retrieve a user's latest withdrawals, newest first.
+        """
+        pass
@@ -1,5 +1,6 @@
 import abc
-from typing import List, Optional, Any
+from typing import AsyncIterator, List, Optional, Any, Union
+from core.errors import AppError
 from domain.dtos.record.topup import TopupRecordDTO
 from domain.dtos.request.topup import CreateTopupRequest, UpdateTopupRequest, UpdateTopupAmount
 
@@ -10,9 +11,16 @@ class ITopupRepository(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def find_all(self) -> List[TopupRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[TopupRecordDTO]:
         """
-        Retrieve all topup records.
+        Retrieve a page of topup records ordered by ID, starting after the given cursor.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[TopupRecordDTO]:
+        """
+        Stream topup records ordered by ID without loading them all into memory.
         """
         pass
 
@@ -44,6 +52,13 @@ class ITopupRepository(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def create_batch(self, inputs: List[CreateTopupRequest]) -> List[Union[int, AppError]]:
+        """
+        Insert a chunk of topups and credit their users' saldo, returning the new topup_id or the error for each input.
+        """
+        pass
+
     @abc.abstractmethod
     async def update(self, input: UpdateTopupRequest) -> TopupRecordDTO:
         """
@@ -1,5 +1,6 @@
 import abc
-from typing import List, Optional, Any
+from typing import AsyncIterator, List, Optional, Any, Union
+from core.errors import AppError
 from domain.dtos.record.transfer import TransferRecordDTO
 from domain.dtos.request.transfer import CreateTransferRequest, UpdateTransferRequest, UpdateTransferAmountRequest
 
@@ -9,9 +10,16 @@ class ITransferRepository(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def find_all(self) -> List[TransferRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[TransferRecordDTO]:
         """
-        Retrieve all transfer records.
+        Retrieve a page of transfer records ordered by ID, starting after the given cursor.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[TransferRecordDTO]:
+        """
+        Stream transfer records ordered by ID without loading them all into memory.
         """
         pass
 
@@ -43,6 +51,22 @@ class ITransferRepository(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def execute_transfer(self, input: CreateTransferRequest) -> TransferRecordDTO:
+        """
+        Debit the sender, credit the receiver and record the transfer in a single transaction.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def execute_transfer_batch(
+        self, inputs: List[CreateTransferRequest], chunk_size: int
+    ) -> List[Union[TransferRecordDTO, AppError]]:
+        """
+        Apply many transfers with set-based statements, returning one result per input.
+        """
+        pass
+
     @abc.abstractmethod
     async def update(self, input: UpdateTransferRequest) -> TransferRecordDTO:
         """
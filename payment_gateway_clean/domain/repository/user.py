@@ -1,5 +1,5 @@
 import abc
-from typing import List, Optional, Any
+from typing import AsyncIterator, List, Optional, Any
 from domain.dtos.record.user import UserRecordDTO
 from domain.dtos.request.user import CreateUserRequest, UpdateUserRequest
 
@@ -17,9 +17,16 @@ class IUserRepository(abc.ABC):
         pass
 
     @abc.abstractmethod
-    async def find_all(self) -> List[UserRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[UserRecordDTO]:
         """
-        Find all user records in the repository.
+        Retrieve a page of user records ordered by ID, starting after the given cursor.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[UserRecordDTO]:
+        """
+        Stream user records ordered by ID without loading them all into memory.
         """
         pass
 
@@ -44,6 +51,13 @@ class IUserRepository(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def exists(self, user_id: int) -> bool:
+        """
+        Check whether a user with the given ID exists, without loading the row.
+        """
+        pass
+
     @abc.abstractmethod
     async def update_user(self, user: UpdateUserRequest) -> UserRecordDTO:
         """
@@ -1,5 +1,6 @@
 import abc
-from typing import List, Optional, Any
+from typing import AsyncIterator, List, Optional, Any, Union
+from core.errors import AppError
 from domain.dtos.record.withdraw import WithdrawRecordDTO
 from domain.dtos.request.withdraw import (
     CreateWithdrawRequest,
@@ -13,9 +14,16 @@ class IWithdrawRepository(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def find_all(self) -> List[WithdrawRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[WithdrawRecordDTO]:
         """
-        Retrieve all withdrawal records.
+        Retrieve a page of withdrawal records ordered by ID, starting after the given cursor.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[WithdrawRecordDTO]:
+        """
+        Stream withdrawal records ordered by ID without loading them all into memory.
         """
         pass
 
@@ -47,6 +55,15 @@ class IWithdrawRepository(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def execute_withdraw_batch(
+        self, inputs: List[CreateWithdrawRequest]
+    ) -> List[Union[WithdrawRecordDTO, AppError]]:
+        """
+        Debit and record many withdrawals at once, returning one result per input.
+        """
+        pass
+
     @abc.abstractmethod
     async def update(self, input: UpdateWithdrawRequest) -> WithdrawRecordDTO:
         """
@@ -0,0 +1,25 @@
+import abc
+from datetime import datetime
+from typing import Optional, Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.report import ReportResponse
+
+
+class IReportService(abc.ABC):
+    """
+    Abstract base class defining the interface for ReportService.
+    """
+
+    @abc.abstractmethod
+    async def get_report(
+        self,
+        kind: str,
+        group_by: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        limit: int,
+    ) -> Union[ApiResponse[ReportResponse], ErrorResponse]:
+        """
+        Retrieve the totals of topups, transfers or withdrawals grouped by day, hour, method or user.
+        """
+        pass
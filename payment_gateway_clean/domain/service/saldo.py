@@ -1,7 +1,9 @@
 import abc
-from typing import List, Optional, Any, Union
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.saldo import SaldoResponse
+from typing import AsyncIterator, List, Optional, Any, Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from datetime import datetime
+from domain.dtos.response.saldo import SaldoBalanceAtResponse, SaldoResponse
+from domain.dtos.request.pagination import PaginationRequest
 from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoRequest
 
 
@@ -11,9 +13,16 @@ class ISaldoService(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def get_saldos(self) -> Union[ApiResponse[List[SaldoResponse]], ErrorResponse]:
+    async def get_saldos(self, pagination: PaginationRequest) -> Union[PaginatedApiResponse[List[SaldoResponse]], ErrorResponse]:
         """
-        Retrieve a list of all saldos.
+        Retrieve a page of saldos using keyset pagination.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_saldos(self, cursor: Optional[int] = None) -> AsyncIterator[SaldoResponse]:
+        """
+        Stream all saldos after the given cursor.
         """
         pass
 
@@ -38,6 +47,13 @@ class ISaldoService(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def get_saldo_user_at(self, user_id: int, at: datetime) -> Union[ApiResponse[SaldoBalanceAtResponse], ErrorResponse]:
+        """
+        Retrieve a user's balance as of a point in time from the ledger.
+        """
+        pass
+
     @abc.abstractmethod
     async def create_saldo(self, input: CreateSaldoRequest) -> Union[ApiResponse[SaldoResponse], ErrorResponse]:
         """
@@ -0,0 +1,19 @@
+import abc
+from typing import Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.summary import UserSummaryResponse
+
+
+class ISummaryService(abc.ABC):
+    """
+    Abstract base class defining the interface for SummaryService.
+    """
+
+    @abc.abstractmethod
+    async def get_user_summary(
+        self, user_id: int, days: int, limit: int
+    ) -> Union[ApiResponse[UserSummaryResponse], ErrorResponse]:
+        """
+        Retrieve a user's balance, totals over the last days and latest limit items of each type.
+        """
+        pass
@@ -1,7 +1,8 @@
 import abc
-from typing import List, Optional, Any, Union
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.topup import TopupResponse
+from typing import AsyncIterator, List, Optional, Any, Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.topup import TopupBatchResponse, TopupResponse
+from domain.dtos.request.pagination import PaginationRequest
 from domain.dtos.request.topup import CreateTopupRequest, UpdateTopupRequest
 
 
@@ -11,9 +12,16 @@ class ITopupService(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def get_topups(self) -> Union[ApiResponse[List[TopupResponse]], ErrorResponse]:
+    async def get_topups(self, pagination: PaginationRequest) -> Union[PaginatedApiResponse[List[TopupResponse]], ErrorResponse]:
         """
-        Retrieve a list of all topups.
+        Retrieve a page of topups using keyset pagination.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_topups(self, cursor: Optional[int] = None) -> AsyncIterator[TopupResponse]:
+        """
+        Stream all topups after the given cursor.
         """
         pass
 
@@ -45,6 +53,13 @@ class ITopupService(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def create_topup_batch(self, rows: AsyncIterator[Union[dict, ValueError]]) -> Union[ApiResponse[TopupBatchResponse], ErrorResponse]:
+        """
+        Ingest a stream of topup rows in chunks, reporting the rows that failed.
+        """
+        pass
+
     @abc.abstractmethod
     async def update_topup(self, input: UpdateTopupRequest) -> Union[ApiResponse[TopupResponse], ErrorResponse]:
         """
@@ -1,7 +1,8 @@
 import abc
-from typing import List, Optional, Any, Union
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.transfer import TransferResponse
+from typing import AsyncIterator, List, Optional, Any, Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.transfer import TransferBatchItemResponse, TransferResponse
+from domain.dtos.request.pagination import PaginationRequest
 from domain.dtos.request.transfer import CreateTransferRequest, UpdateTransferRequest
 
 
@@ -11,9 +12,16 @@ class ITransferService(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def get_transfers(self) -> Union[ApiResponse[List[TransferResponse]], ErrorResponse]:
+    async def get_transfers(self, pagination: PaginationRequest) -> Union[PaginatedApiResponse[List[TransferResponse]], ErrorResponse]:
         """
-        Retrieve a list of all transfers.
+        Retrieve a page of transfers using keyset pagination.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_transfers(self, cursor: Optional[int] = None) -> AsyncIterator[TransferResponse]:
+        """
+        Stream all transfers after the given cursor.
         """
         pass
 
@@ -45,6 +53,13 @@ class ITransferService(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def create_transfer_batch(self, inputs: List[CreateTransferRequest]) -> Union[ApiResponse[List[TransferBatchItemResponse]], ErrorResponse]:
+        """
+        Create many transfers at once, reporting the outcome of each item.
+        """
+        pass
+
     @abc.abstractmethod
     async def update_transfer(self, input: UpdateTransferRequest) -> Union[ApiResponse[TransferResponse], ErrorResponse]:
         """
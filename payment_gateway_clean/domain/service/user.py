@@ -1,7 +1,8 @@
 import abc
-from typing import List, Optional, Any, Union, List
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from typing import AsyncIterator, List, Optional, Any, Union, List
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from domain.dtos.response.user import UserResponse
+from domain.dtos.request.pagination import PaginationRequest
 from domain.dtos.request.user import CreateUserRequest, UpdateUserRequest
 
 
@@ -11,9 +12,16 @@ class IUserService(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def get_users(self) -> Union[ApiResponse[List[UserResponse]], ErrorResponse]:
+    async def get_users(self, pagination: PaginationRequest) -> Union[PaginatedApiResponse[List[UserResponse]], ErrorResponse]:
         """
-        Retrieve a list of all users.
+        Retrieve a page of users using keyset pagination.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_users(self, cursor: Optional[int] = None) -> AsyncIterator[UserResponse]:
+        """
+        Stream all users after the given cursor.
         """
         pass
 
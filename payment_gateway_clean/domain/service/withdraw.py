@@ -1,7 +1,8 @@
 import abc
-from typing import List, Optional, Any, Union
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.withdraw import WithdrawResponse
+from typing import AsyncIterator, List, Optional, Any, Union
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.withdraw import WithdrawBatchItemResponse, WithdrawResponse
+from domain.dtos.request.pagination import PaginationRequest
 from domain.dtos.request.withdraw import CreateWithdrawRequest, UpdateWithdrawRequest
 
 
@@ -11,9 +12,16 @@ class IWithdrawService(abc.ABC):
     """
 
     @abc.abstractmethod
-    async def get_withdraws(self) -> Union[ApiResponse[List[WithdrawResponse]], ErrorResponse]:
+    async def get_withdraws(self, pagination: PaginationRequest) -> Union[PaginatedApiResponse[List[WithdrawResponse]], ErrorResponse]:
         """
-        Retrieve a list of all withdrawal records.
+        Retrieve a page of withdrawal records using keyset pagination.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stream_withdraws(self, cursor: Optional[int] = None) -> AsyncIterator[WithdrawResponse]:
+        """
+        Stream all withdrawal records after the given cursor.
         """
         pass
 
@@ -45,6 +53,13 @@ class IWithdrawService(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    async def create_withdraw_batch(self, inputs: List[CreateWithdrawRequest]) -> Union[ApiResponse[List[WithdrawBatchItemResponse]], ErrorResponse]:
+        """
+        Create many withdrawals at once, reporting the outcome of each item.
+        """
+        pass
+
     @abc.abstractmethod
     async def update_withdraw(self, input: UpdateWithdrawRequest) -> Union[ApiResponse[Optional[WithdrawResponse]], ErrorResponse]:
         """
@@ -0,0 +1,38 @@
+"""add user lookup indexes
+
+Revision ID: 5c1f9e2a7b3d
+Revises: 08271ac386f6
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f9e2a7b3d'
+down_revision: Union[str, None] = '08271ac386f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Transfers are looked up by either side of the transfer, newest first
+    op.create_index('ix_transfers_transfer_from_created_at', 'transfers', ['transfer_from', 'created_at'])
+    op.create_index('ix_transfers_transfer_to_created_at', 'transfers', ['transfer_to', 'created_at'])
+
+    op.create_index('ix_topups_user_id_created_at', 'topups', ['user_id', 'created_at'])
+    op.create_index('ix_withdraws_user_id_created_at', 'withdraws', ['user_id', 'created_at'])
+
+    # Every user owns exactly one saldo row
+    op.create_index('ix_saldo_user_id', 'saldo', ['user_id'], unique=True)
+
+    # users.email is already covered by the index backing its UNIQUE constraint
+
+def downgrade():
+    op.drop_index('ix_saldo_user_id', table_name='saldo')
+    op.drop_index('ix_withdraws_user_id_created_at', table_name='withdraws')
+    op.drop_index('ix_topups_user_id_created_at', table_name='topups')
+    op.drop_index('ix_transfers_transfer_to_created_at', table_name='transfers')
+    op.drop_index('ix_transfers_transfer_from_created_at', table_name='transfers')
@@ -0,0 +1,26 @@
+"""add saldo version
+
+Revision ID: 9a4d2c6e8f10
+Revises: 5c1f9e2a7b3d
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d2c6e8f10'
+down_revision: Union[str, None] = '5c1f9e2a7b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Optimistic concurrency counter, bumped on every balance change
+    op.add_column('saldo', sa.Column('version', sa.Integer, nullable=False, server_default='0'))
+
+def downgrade():
+    op.drop_column('saldo', 'version')
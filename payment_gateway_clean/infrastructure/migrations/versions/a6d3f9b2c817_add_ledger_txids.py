@@ -0,0 +1,60 @@
+"""add ledger txids
+
+Revision ID: a6d3f9b2c817
+Revises: c9d4e2f6a813
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f9b2c817'
+down_revision: Union[str, None] = 'c9d4e2f6a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # The transaction that wrote each entry; existing entries all get this migration's
+    op.add_column(
+        'ledger_entries',
+        sa.Column(
+            'txid', sa.BigInteger, nullable=False,
+            server_default=sa.text("(pg_current_xact_id()::text::bigint)"),
+        )
+    )
+    # Stamped by the database, in naive UTC like the rest of the ledger
+    op.alter_column('ledger_entries', 'created_at', server_default=sa.text("timezone('UTC', now())"))
+    op.create_index('ix_ledger_entries_txid_entry_id', 'ledger_entries', ['txid', 'entry_id'])
+    op.create_index('ix_ledger_entries_user_id_txid', 'ledger_entries', ['user_id', 'txid'])
+
+    # Checkpoints are derived from the ledger; the background job rebuilds them
+    op.execute("DELETE FROM ledger_checkpoints")
+    op.add_column('ledger_checkpoints', sa.Column('through_txid', sa.BigInteger, nullable=False))
+
+    # Carry the rollups' position over to (txid, entry_id) order
+    op.add_column(
+        'report_watermarks',
+        sa.Column('last_txid', sa.BigInteger, nullable=False, server_default='0')
+    )
+    op.execute(
+        """
+        UPDATE report_watermarks w
+        SET last_txid = COALESCE(
+            (SELECT MAX(txid) FROM ledger_entries WHERE entry_id <= w.last_entry_id), 0
+        )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('report_watermarks', 'last_txid')
+    op.drop_column('ledger_checkpoints', 'through_txid')
+    op.drop_index('ix_ledger_entries_user_id_txid', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_txid_entry_id', table_name='ledger_entries')
+    op.alter_column('ledger_entries', 'created_at', server_default=sa.text('CURRENT_TIMESTAMP'))
+    op.drop_column('ledger_entries', 'txid')
@@ -0,0 +1,34 @@
+"""add outbox events
+
+Revision ID: b3e6d8f1a247
+Revises: f2a8c5d7b914
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e6d8f1a247'
+down_revision: Union[str, None] = 'f2a8c5d7b914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Money movement events waiting for the relay; rows are deleted once published
+    op.create_table(
+        'outbox_events',
+        sa.Column('event_id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('event_type', sa.String(32), nullable=False),
+        sa.Column('txn_ref', sa.String(64), nullable=False),
+        sa.Column('payload', sa.JSON, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, nullable=False, server_default=func.current_timestamp())
+    )
+
+def downgrade():
+    op.drop_table('outbox_events')
@@ -0,0 +1,36 @@
+"""add saldo shards
+
+Revision ID: c7e3b1d94a25
+Revises: 9a4d2c6e8f10
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3b1d94a25'
+down_revision: Union[str, None] = '9a4d2c6e8f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Sub-balances of hot accounts, folded back into saldo by compaction
+    op.create_table(
+        'saldo_shards',
+        sa.Column('shard_id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.user_id'), nullable=False),
+        sa.Column('shard_no', sa.Integer, nullable=False),
+        sa.Column('balance', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+    )
+    op.create_index('ix_saldo_shards_user_id_shard_no', 'saldo_shards', ['user_id', 'shard_no'], unique=True)
+
+def downgrade():
+    op.drop_index('ix_saldo_shards_user_id_shard_no', table_name='saldo_shards')
+    op.drop_table('saldo_shards')
@@ -0,0 +1,106 @@
+"""add report rollups
+
+Revision ID: c9d4e2f6a813
+Revises: b3e6d8f1a247
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d4e2f6a813'
+down_revision: Union[str, None] = 'b3e6d8f1a247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every movement in the ledger so far, counted once on the side of the user who made
+# it, as ReportRepository._add counts them: the credited user of a topup, the debited
+# one of a withdrawal or transfer. Adjustments change the amount, not the count.
+MOVEMENTS = """
+    SELECT le.kind,
+           le.user_id,
+           CASE WHEN le.kind = 'topup' THEN le.amount ELSE -le.amount END AS amount,
+           CASE WHEN le.entry_type = le.kind THEN 1 ELSE 0 END AS count,
+           date_trunc('hour', le.created_at) AS bucket,
+           COALESCE(t.topup_method, '') AS method
+    FROM (
+        SELECT user_id, amount, entry_type, created_at,
+               split_part(txn_ref, ':', 1) AS kind,
+               split_part(txn_ref, ':', 2)::integer AS ref
+        FROM ledger_entries
+        WHERE user_id IS NOT NULL
+    ) le
+    LEFT JOIN topups t ON le.kind = 'topup' AND t.topup_id = le.ref
+    LEFT JOIN transfers tr ON le.kind = 'transfer' AND tr.transfer_id = le.ref
+    WHERE le.kind IN ('topup', 'transfer', 'withdraw')
+      AND (
+          le.kind <> 'transfer'
+          OR le.user_id = tr.transfer_from
+          -- The transfer is gone; its original entries still say who paid
+          OR (tr.transfer_id IS NULL AND le.amount < 0)
+      )
+"""
+
+
+def upgrade():
+    # Hourly volume per movement type and topup method; serves hour, day and method reports
+    op.create_table(
+        'report_rollups_hourly',
+        sa.Column('kind', sa.String(16), primary_key=True),
+        sa.Column('bucket', sa.TIMESTAMP, primary_key=True),
+        sa.Column('method', sa.String(50), primary_key=True),
+        sa.Column('amount', sa.BigInteger, nullable=False),
+        sa.Column('count', sa.Integer, nullable=False)
+    )
+    # Daily volume per movement type and user; serves user reports
+    op.create_table(
+        'report_rollups_daily_users',
+        sa.Column('kind', sa.String(16), primary_key=True),
+        sa.Column('day', sa.TIMESTAMP, primary_key=True),
+        sa.Column('user_id', sa.Integer, primary_key=True),
+        sa.Column('amount', sa.BigInteger, nullable=False),
+        sa.Column('count', sa.Integer, nullable=False)
+    )
+    # How far into the ledger the rollups have got
+    op.create_table(
+        'report_watermarks',
+        sa.Column('name', sa.String(32), primary_key=True),
+        sa.Column('last_entry_id', sa.Integer, nullable=False),
+        sa.Column('rolled_up_to', sa.TIMESTAMP, nullable=True)
+    )
+
+    # Roll up everything already in the ledger, history included, and start the
+    # background job past it
+    op.execute(
+        f"""
+        INSERT INTO report_rollups_hourly (kind, bucket, method, amount, count)
+        SELECT kind, bucket, method, SUM(amount), SUM(count)
+        FROM ({MOVEMENTS}) movements
+        GROUP BY kind, bucket, method
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO report_rollups_daily_users (kind, day, user_id, amount, count)
+        SELECT kind, date_trunc('day', bucket), user_id, SUM(amount), SUM(count)
+        FROM ({MOVEMENTS}) movements
+        GROUP BY kind, date_trunc('day', bucket), user_id
+        """
+    )
+    # Ledger timestamps are naive UTC
+    op.execute(
+        """
+        INSERT INTO report_watermarks (name, last_entry_id, rolled_up_to)
+        SELECT 'ledger', COALESCE(MAX(entry_id), 0), CURRENT_TIMESTAMP AT TIME ZONE 'UTC'
+        FROM ledger_entries
+        """
+    )
+
+def downgrade():
+    op.drop_table('report_watermarks')
+    op.drop_table('report_rollups_daily_users')
+    op.drop_table('report_rollups_hourly')
@@ -0,0 +1,118 @@
+"""add ledger
+
+Revision ID: e4b7a9d1c362
+Revises: c7e3b1d94a25
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a9d1c362'
+down_revision: Union[str, None] = 'c7e3b1d94a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Append-only double-entry postings; a NULL user_id is the outside world
+    op.create_table(
+        'ledger_entries',
+        sa.Column('entry_id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('txn_ref', sa.String(64), nullable=False),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.user_id'), nullable=True),
+        sa.Column('amount', sa.Integer, nullable=False),
+        sa.Column('entry_type', sa.String(32), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, nullable=False, server_default=func.current_timestamp())
+    )
+    op.create_index('ix_ledger_entries_txn_ref', 'ledger_entries', ['txn_ref'])
+    op.create_index('ix_ledger_entries_user_id_created_at', 'ledger_entries', ['user_id', 'created_at'])
+
+    # Per-user running balances, so history queries only sum entries after a checkpoint
+    op.create_table(
+        'ledger_checkpoints',
+        sa.Column('checkpoint_id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.user_id'), nullable=False),
+        sa.Column('balance', sa.Integer, nullable=False),
+        sa.Column('as_of', sa.TIMESTAMP, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, server_default=func.current_timestamp())
+    )
+    op.create_index('ix_ledger_checkpoints_user_id_as_of', 'ledger_checkpoints', ['user_id', 'as_of'], unique=True)
+
+    # Post the existing topups, transfers and withdrawals at the time they were created,
+    # with the same txn_ref and entry_type the services use
+    op.execute(
+        """
+        INSERT INTO ledger_entries (txn_ref, user_id, amount, entry_type, created_at)
+        SELECT txn_ref, user_id, amount, entry_type, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM (
+            SELECT 'topup:' || topup_id AS txn_ref, NULL::integer AS user_id, -topup_amount AS amount,
+                   'topup' AS entry_type, created_at, topup_id AS ref, 0 AS side
+            FROM topups
+            UNION ALL
+            SELECT 'topup:' || topup_id, user_id, topup_amount, 'topup', created_at, topup_id, 1
+            FROM topups
+            UNION ALL
+            SELECT 'transfer:' || transfer_id, transfer_from, -transfer_amount, 'transfer', created_at, transfer_id, 0
+            FROM transfers
+            UNION ALL
+            SELECT 'transfer:' || transfer_id, transfer_to, transfer_amount, 'transfer', created_at, transfer_id, 1
+            FROM transfers
+            UNION ALL
+            SELECT 'withdraw:' || withdraw_id, user_id, -withdraw_amount, 'withdraw', created_at, withdraw_id, 0
+            FROM withdraws
+            UNION ALL
+            SELECT 'withdraw:' || withdraw_id, NULL, withdraw_amount, 'withdraw', created_at, withdraw_id, 1
+            FROM withdraws
+        ) movements
+        ORDER BY created_at, ref, side
+        """
+    )
+    # Open every account with whatever its current balance, shards included, is not
+    # explained by those movements, dated no later than its first movement, so the
+    # ledger ends at exactly the balance each account has today
+    op.execute(
+        """
+        WITH accounts AS (
+            SELECT s.saldo_id,
+                   s.user_id,
+                   s.total_balance + COALESCE(
+                       (SELECT SUM(balance) FROM saldo_shards sh WHERE sh.user_id = s.user_id), 0
+                   ) - COALESCE(
+                       (SELECT SUM(amount) FROM ledger_entries le WHERE le.user_id = s.user_id), 0
+                   ) AS opening,
+                   LEAST(
+                       COALESCE(s.created_at, CURRENT_TIMESTAMP),
+                       COALESCE(
+                           (SELECT MIN(created_at) FROM ledger_entries le WHERE le.user_id = s.user_id),
+                           CURRENT_TIMESTAMP
+                       )
+                   ) AS opened_at
+            FROM saldo s
+        )
+        INSERT INTO ledger_entries (txn_ref, user_id, amount, entry_type, created_at)
+        SELECT 'saldo:' || saldo_id, user_id, amount, 'adjustment', opened_at
+        FROM (
+            SELECT saldo_id, NULL::integer AS user_id, -opening AS amount, opened_at, 0 AS side
+            FROM accounts
+            WHERE opening <> 0
+            UNION ALL
+            SELECT saldo_id, user_id, opening, opened_at, 1
+            FROM accounts
+            WHERE opening <> 0
+        ) openings
+        ORDER BY opened_at, saldo_id, side
+        """
+    )
+
+def downgrade():
+    op.drop_index('ix_ledger_checkpoints_user_id_as_of', table_name='ledger_checkpoints')
+    op.drop_table('ledger_checkpoints')
+    op.drop_index('ix_ledger_entries_user_id_created_at', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_txn_ref', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
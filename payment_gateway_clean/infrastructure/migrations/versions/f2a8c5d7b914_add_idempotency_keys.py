@@ -0,0 +1,39 @@
+"""add idempotency keys
+
+Revision ID: f2a8c5d7b914
+Revises: e4b7a9d1c362
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import func
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c5d7b914'
+down_revision: Union[str, None] = 'e4b7a9d1c362'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Stored outcomes of POST requests sent with an Idempotency-Key header
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('status_code', sa.Integer, nullable=True),
+        sa.Column('response_body', sa.Text, nullable=True),
+        sa.Column('locked_until', sa.TIMESTAMP, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, server_default=func.current_timestamp()),
+        sa.Column('expires_at', sa.TIMESTAMP, nullable=False)
+    )
+    # Lets the TTL sweeper delete expired keys without a full scan
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+def downgrade():
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
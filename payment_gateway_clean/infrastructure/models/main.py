@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    create_engine, Column, Integer, String, ForeignKey, Text, Sequence, TIMESTAMP, func
+    create_engine, BigInteger, Column, Integer, String, ForeignKey, Text, Sequence, TIMESTAMP, Index, JSON, func, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, declarative_base
@@ -35,6 +35,9 @@ class User(Base):
 # Topup Model
 class Topup(Base):
     __tablename__ = 'topups'
+    __table_args__ = (
+        Index('ix_topups_user_id_created_at', 'user_id', 'created_at'),
+    )
 
     topup_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
@@ -51,21 +54,46 @@ class Topup(Base):
 # Saldo Model
 class Saldo(Base):
     __tablename__ = 'saldo'
+    __table_args__ = (
+        Index('ix_saldo_user_id', 'user_id', unique=True),
+    )
 
     saldo_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
     total_balance: Mapped[int] = mapped_column(Integer, nullable=False)
     withdraw_amount: Mapped[int] = mapped_column(Integer, default=0)
     withdraw_time: Mapped[str] = mapped_column(TIMESTAMP)
+    # Bumped on every balance change for optimistic concurrency control
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
     # Relationships
     user = relationship('User', back_populates='saldo')
 
+# Saldo Shard Model
+class SaldoShard(Base):
+    """
+    Sub-balance of a hot account; the account's balance is its saldo row plus all of its shards.
+    """
+    __tablename__ = 'saldo_shards'
+    __table_args__ = (
+        Index('ix_saldo_shards_user_id_shard_no', 'user_id', 'shard_no', unique=True),
+    )
+
+    shard_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
+    shard_no: Mapped[int] = mapped_column(Integer, nullable=False)
+    balance: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+
 # Transfer Model
 class Transfer(Base):
     __tablename__ = 'transfers'
+    __table_args__ = (
+        Index('ix_transfers_transfer_from_created_at', 'transfer_from', 'created_at'),
+        Index('ix_transfers_transfer_to_created_at', 'transfer_to', 'created_at'),
+    )
 
     transfer_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     transfer_from: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
@@ -82,6 +110,9 @@ class Transfer(Base):
 # Withdraw Model
 class Withdraw(Base):
     __tablename__ = 'withdraws'
+    __table_args__ = (
+        Index('ix_withdraws_user_id_created_at', 'user_id', 'created_at'),
+    )
 
     withdraw_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
@@ -91,4 +122,131 @@ class Withdraw(Base):
     updated_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
     # Relationships
-    user = relationship('User', back_populates='withdraws')
\ No newline at end of file
+    user = relationship('User', back_populates='withdraws')
+
+# Ledger Entry Model
+class LedgerEntry(Base):
+    """
+    Append-only double-entry posting; the entries of one txn_ref always sum to zero.
+
+    Written in the same transaction as the saldo update it records; saldo remains
+    the current balance and the ledger its history.
+
+    A NULL user_id is the outside world, e.g. the payment channel behind a topup.
+    txid is the transaction that wrote the entry: once every transaction below a
+    bound has ended, every entry below it is committed and visible.
+    """
+    __tablename__ = 'ledger_entries'
+    __table_args__ = (
+        Index('ix_ledger_entries_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_ledger_entries_txid_entry_id', 'txid', 'entry_id'),
+        Index('ix_ledger_entries_user_id_txid', 'user_id', 'txid'),
+    )
+
+    entry_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    txn_ref: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=True)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    entry_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text::bigint)")
+    )
+    created_at: Mapped[str] = mapped_column(TIMESTAMP, nullable=False, server_default=text("timezone('UTC', now())"))
+
+# Ledger Checkpoint Model
+class LedgerCheckpoint(Base):
+    """
+    A user's balance summed over every ledger entry with a txid below through_txid.
+
+    Every transaction below the bound had ended by as_of, so all of those entries
+    were created no later than as_of.
+    """
+    __tablename__ = 'ledger_checkpoints'
+    __table_args__ = (
+        Index('ix_ledger_checkpoints_user_id_as_of', 'user_id', 'as_of', unique=True),
+    )
+
+    checkpoint_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.user_id'), nullable=False)
+    balance: Mapped[int] = mapped_column(Integer, nullable=False)
+    as_of: Mapped[str] = mapped_column(TIMESTAMP, nullable=False)
+    through_txid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
+
+# Idempotency Key Model
+class IdempotencyKey(Base):
+    """
+    Outcome of a request sent with an Idempotency-Key header.
+
+    status_code stays NULL while the first request is in flight; locked_until bounds
+    how long such a claim blocks its duplicates.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[str] = mapped_column(Text, nullable=True)
+    locked_until: Mapped[str] = mapped_column(TIMESTAMP, nullable=False)
+    created_at: Mapped[str] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())
+    expires_at: Mapped[str] = mapped_column(TIMESTAMP, nullable=False)
+
+# Outbox Event Model
+class OutboxEvent(Base):
+    """
+    Event written in the same transaction as the money movement it describes.
+
+    The relay deletes rows as it publishes them, so the table only holds the backlog.
+    """
+    __tablename__ = 'outbox_events'
+
+    event_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    txn_ref: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[str] = mapped_column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
+
+# Report Rollup Models
+class ReportRollupHourly(Base):
+    """
+    Volume and count of one movement type per hour and topup method, rolled up from the ledger.
+
+    method is '' for transfers and withdrawals, which have none.
+    """
+    __tablename__ = 'report_rollups_hourly'
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    bucket: Mapped[str] = mapped_column(TIMESTAMP, primary_key=True)
+    method: Mapped[str] = mapped_column(String(50), primary_key=True)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ReportRollupDailyUser(Base):
+    """
+    Volume and count of one movement type per day and user, rolled up from the ledger.
+
+    The user of a transfer is its sender.
+    """
+    __tablename__ = 'report_rollups_daily_users'
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    day: Mapped[str] = mapped_column(TIMESTAMP, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ReportWatermark(Base):
+    """
+    Last ledger entry folded into the report rollups, in (txid, entry_id) order, and the time they are complete up to.
+    """
+    __tablename__ = 'report_watermarks'
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    last_txid: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    last_entry_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    rolled_up_to: Mapped[str] = mapped_column(TIMESTAMP, nullable=True)
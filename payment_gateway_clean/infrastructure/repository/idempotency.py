@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.dtos.record.idempotency import IdempotencyRecordDTO
+from domain.repository.idempotency import IIdempotencyRepository
+from infrastructure.models.main import IdempotencyKey
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
+
+
+@instrument_repository
+@trace_methods
+class IdempotencyRepository(IIdempotencyRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def claim(self, key: str, fingerprint: str, locked_until: datetime, expires_at: datetime) -> bool:
+        """
+        Claim a key for a new request, returning False if another request holds or has completed it.
+
+        A single INSERT ... ON CONFLICT DO UPDATE takes the key when it is new, expired,
+        or still held by a request whose claim has timed out.
+        """
+        now = datetime.utcnow()
+        claim = pg_insert(IdempotencyKey).values(
+            key=key,
+            fingerprint=fingerprint,
+            locked_until=locked_until,
+            created_at=now,
+            expires_at=expires_at,
+        )
+        result = await self.session.execute(
+            claim.on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={
+                    "fingerprint": claim.excluded.fingerprint,
+                    "status_code": None,
+                    "response_body": None,
+                    "locked_until": claim.excluded.locked_until,
+                    "created_at": claim.excluded.created_at,
+                    "expires_at": claim.excluded.expires_at,
+                },
+                where=or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.locked_until <= now),
+                ),
+            ).returning(IdempotencyKey.key)
+        )
+        return result.first() is not None
+
+    async def find(self, key: str) -> Optional[IdempotencyRecordDTO]:
+        """
+        Find the record stored for a key.
+        """
+        result = await self.session.execute(
+            select(
+                IdempotencyKey.key,
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_body,
+                IdempotencyKey.locked_until,
+                IdempotencyKey.expires_at,
+            ).where(IdempotencyKey.key == key)
+        )
+        row = result.first()
+        return IdempotencyRecordDTO(**row._mapping) if row else None
+
+    async def complete(self, key: str, status_code: int, response_body: str) -> None:
+        """
+        Store the response of the request holding a key.
+        """
+        await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status_code=status_code, response_body=response_body)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def release(self, key: str) -> None:
+        """
+        Drop the claim on a key whose request failed, so a retry can run again.
+        """
+        await self.session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_expired(self, now: datetime) -> int:
+        """
+        Delete every key that expired before now, returning how many were removed.
+        """
+        result = await self.session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import BigInteger, Text, and_, cast, event, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from domain.repository.ledger import ILedgerRepository
+from infrastructure.models.main import LedgerCheckpoint, LedgerEntry
+from core.cache import UserScopedCache
+from core.metrics import PAYMENT_AMOUNT, PAYMENT_TRANSACTIONS, instrument_repository
+from core.tracing import trace_methods
+
+# Every transaction with a lower txid has ended, so all of its ledger entries are visible
+SNAPSHOT_XMIN = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+# The database clock, in the naive UTC the ledger is stamped with
+UTC_CLOCK = func.timezone("UTC", func.clock_timestamp())
+
+
+@instrument_repository
+@trace_methods
+class LedgerRepository(ILedgerRepository):
+    """
+    Append-only ledger of money movements with periodic per-user checkpoints.
+
+    The ledger is a journal written next to saldo, not a replacement for it: every
+    movement still updates saldo.total_balance, which stays the balance debits are
+    checked against (atomic deltas and hot-account shards keep its row contention
+    down), and then appends its entries here in the same transaction. So writes are
+    not insert-only; recording a movement costs one multi-row INSERT more.
+
+    What the ledger adds is a history that is never rewritten. Entries are only ever
+    inserted, and a balance at any point in time is the latest checkpoint at or
+    before it plus the entries created after that checkpoint, so history queries
+    never scan a user's whole ledger. The report rollups are built from it as well.
+    """
+
+    def __init__(self, session: AsyncSession, summary_cache: Optional[UserScopedCache] = None):
+        self.session = session
+        self.summary_cache = summary_cache
+
+    async def record(self, entries: List[CreateLedgerEntryRequest]) -> None:
+        """
+        Append balanced entries to the ledger with one multi-row INSERT.
+        """
+        entries = [entry for entry in entries if entry.amount]
+        if not entries:
+            return
+
+        # txid and created_at come from the database, so readers can trust them as bounds
+        await self.session.execute(
+            insert(LedgerEntry),
+            [
+                {
+                    "txn_ref": entry.txn_ref,
+                    "user_id": entry.user_id,
+                    "amount": entry.amount,
+                    "entry_type": entry.entry_type,
+                }
+                for entry in entries
+            ],
+        )
+        self._count_on_commit(entries)
+        # Every money movement passes through here, so this keeps user summaries fresh
+        if self.summary_cache is not None:
+            self.summary_cache.invalidate(self.session, (entry.user_id for entry in entries))
+
+    async def balance_at(self, user_id: int, at: datetime) -> int:
+        """
+        Compute a user's balance at a point in time from the nearest checkpoint plus later entries.
+
+        The checkpoint holds every entry below its txid bound, all created by its as_of;
+        the entries of later transactions are added by their creation time, however
+        late those transactions committed.
+        """
+        result = await self.session.execute(
+            select(LedgerCheckpoint.balance, LedgerCheckpoint.through_txid)
+            .where(LedgerCheckpoint.user_id == user_id, LedgerCheckpoint.as_of <= at)
+            .order_by(LedgerCheckpoint.as_of.desc())
+            .limit(1)
+        )
+        checkpoint = result.first()
+
+        query = select(func.coalesce(func.sum(LedgerEntry.amount), 0)).where(
+            LedgerEntry.user_id == user_id, LedgerEntry.created_at <= at
+        )
+        if checkpoint is not None:
+            query = query.where(LedgerEntry.txid >= checkpoint.through_txid)
+
+        result = await self.session.execute(query)
+        return (checkpoint.balance if checkpoint is not None else 0) + result.scalar_one()
+
+    async def create_checkpoints(self) -> int:
+        """
+        Roll every user's latest checkpoint forward to now, returning the number of checkpoints written.
+
+        A checkpoint covers the entries of every transaction below the xmin of the
+        database snapshot. Those transactions have all committed or rolled back, so
+        no entry below the bound can appear later, however long its transaction ran.
+        One INSERT ... SELECT adds each user's entries between the previous bound and
+        this one to their balance; users without new entries keep their old one.
+        """
+        result = await self.session.execute(select(SNAPSHOT_XMIN, UTC_CLOCK))
+        through_txid, as_of = result.one()
+
+        latest = (
+            select(
+                LedgerCheckpoint.user_id,
+                func.max(LedgerCheckpoint.as_of).label("as_of"),
+            )
+            .where(LedgerCheckpoint.as_of < as_of)
+            .group_by(LedgerCheckpoint.user_id)
+            .subquery("latest")
+        )
+        previous = (
+            select(LedgerCheckpoint.user_id, LedgerCheckpoint.balance, LedgerCheckpoint.through_txid)
+            .join(
+                latest,
+                and_(
+                    LedgerCheckpoint.user_id == latest.c.user_id,
+                    LedgerCheckpoint.as_of == latest.c.as_of,
+                ),
+            )
+            .subquery("previous")
+        )
+        rollup = (
+            select(
+                LedgerEntry.user_id,
+                (func.coalesce(previous.c.balance, 0) + func.sum(LedgerEntry.amount)).label("balance"),
+                literal(as_of).label("as_of"),
+                literal(through_txid, BigInteger).label("through_txid"),
+                literal(datetime.utcnow()).label("created_at"),
+            )
+            .outerjoin(previous, previous.c.user_id == LedgerEntry.user_id)
+            .where(
+                LedgerEntry.user_id.is_not(None),
+                LedgerEntry.txid < through_txid,
+                or_(
+                    previous.c.through_txid.is_(None),
+                    LedgerEntry.txid >= previous.c.through_txid,
+                ),
+            )
+            .group_by(LedgerEntry.user_id, previous.c.balance)
+        )
+
+        result = await self.session.execute(
+            insert(LedgerCheckpoint)
+            .from_select(["user_id", "balance", "as_of", "through_txid", "created_at"], rollup)
+            .returning(LedgerCheckpoint.checkpoint_id)
+        )
+        return len(result.all())
+
+    def _count_on_commit(self, entries: List[CreateLedgerEntryRequest]) -> None:
+        # Each movement has exactly one credit entry; count those once the transaction commits
+        movements = self.session.info.setdefault("ledger_movements", [])
+        movements.extend((entry.entry_type, entry.amount) for entry in entries if entry.amount > 0)
+
+        sync_session = self.session.sync_session
+        if not event.contains(sync_session, "after_commit", _count_movements):
+            event.listen(sync_session, "after_commit", _count_movements)
+            event.listen(sync_session, "after_rollback", _discard_movements)
+
+
+def _count_movements(session: Session) -> None:
+    for entry_type, amount in session.info.pop("ledger_movements", ()):
+        PAYMENT_TRANSACTIONS.inc(entry_type)
+        PAYMENT_AMOUNT.inc(entry_type, amount=amount)
+
+
+def _discard_movements(session: Session) -> None:
+    session.info.pop("ledger_movements", None)
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+from domain.dtos.request.outbox import CreateOutboxEventRequest
+from domain.repository.outbox import IOutboxRepository
+from infrastructure.models.main import OutboxEvent
+from infrastructure.repository.projection import Projection
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
+
+OUTBOX_EVENT_RECORD = Projection(
+    OutboxEventRecordDTO,
+    event_id=OutboxEvent.event_id,
+    event_type=OutboxEvent.event_type,
+    txn_ref=OutboxEvent.txn_ref,
+    payload=OutboxEvent.payload,
+    created_at=OutboxEvent.created_at,
+)
+
+
+@instrument_repository
+@trace_methods
+class OutboxRepository(IOutboxRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, events: List[CreateOutboxEventRequest]) -> None:
+        """
+        Queue events for the relay with one multi-row INSERT.
+        """
+        if not events:
+            return
+
+        now = datetime.utcnow()
+        await self.session.execute(
+            insert(OutboxEvent),
+            [
+                {
+                    "event_type": event.event_type,
+                    "txn_ref": event.txn_ref,
+                    "payload": event.payload,
+                    "created_at": now,
+                }
+                for event in events
+            ],
+        )
+
+    async def take(self, limit: int) -> List[OutboxEventRecordDTO]:
+        """
+        Remove and return up to limit of the oldest events, skipping rows another relay holds.
+
+        A single DELETE ... RETURNING claims the batch. The rows stay locked until the
+        caller's transaction ends, and come back if it rolls back.
+        """
+        batch = (
+            select(OutboxEvent.event_id)
+            .order_by(OutboxEvent.event_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(OutboxEvent)
+            .where(OutboxEvent.event_id.in_(batch.scalar_subquery()))
+            .returning(*OUTBOX_EVENT_RECORD.columns)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING does not keep the subquery's order
+        return sorted(OUTBOX_EVENT_RECORD.all(result), key=lambda event: event.event_id)
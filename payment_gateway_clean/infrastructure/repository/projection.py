@@ -0,0 +1,33 @@
+from typing import Any, Generic, Iterable, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Row, Select, select
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class Projection(Generic[T]):
+    """
+    The columns a record DTO is built from, selected without loading ORM entities.
+
+    Queries return plain row tuples, which become DTOs through model_construct: the
+    driver has already typed every value, so there is no ORM instance, identity-map
+    entry or pydantic validation per row.
+    """
+
+    def __init__(self, dto: Type[T], **columns: ColumnElement[Any]):
+        self.dto = dto
+        self.columns = [column.label(name) for name, column in columns.items()]
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def from_row(self, row: Row) -> T:
+        return self.dto.model_construct(**row._mapping)
+
+    def one(self, row: Optional[Row]) -> Optional[T]:
+        return self.from_row(row) if row is not None else None
+
+    def all(self, rows: Iterable[Row]) -> List[T]:
+        construct = self.dto.model_construct
+        return [construct(**row._mapping) for row in rows]
@@ -0,0 +1,294 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, cast, column, func, select, table, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.dtos.record.report import ReportRowRecordDTO
+from domain.repository.report import IReportRepository
+from infrastructure.models.main import (
+    LedgerEntry,
+    ReportRollupDailyUser,
+    ReportRollupHourly,
+    ReportWatermark,
+    Topup,
+    Transfer,
+)
+from infrastructure.repository.ledger import SNAPSHOT_XMIN, UTC_CLOCK
+from infrastructure.repository.projection import Projection
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
+
+REPORT_KINDS = ("topup", "transfer", "withdraw")
+
+# Name of the watermark row tracking the ledger
+LEDGER_WATERMARK = "ledger"
+
+# Start of the oldest transaction open on another connection to this database, in UTC.
+# Ledger entries are stamped with their transaction's start, so none it posts can be
+# older. Only sessions of the app's own role show their xact_start here.
+OLDEST_TRANSACTION = (
+    select(func.min(func.timezone("UTC", column("xact_start"))))
+    .select_from(table("pg_stat_activity", column("xact_start"), column("datname"), column("pid")))
+    .where(
+        column("datname") == func.current_database(),
+        column("pid") != func.pg_backend_pid(),
+    )
+    .scalar_subquery()
+)
+
+
+@instrument_repository
+@trace_methods
+class ReportRepository(IReportRepository):
+    """
+    Hourly and daily rollups of topups, transfers and withdrawals, kept up to date from the ledger.
+
+    The ledger is append-only and records amended amounts as adjustment entries, so
+    folding each entry in exactly once, in entry_id order past a watermark, keeps the
+    rollups equal to the money that actually moved. A report then reads a few
+    thousand pre-aggregated rows per year instead of scanning the base tables.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def roll_up(self, limit: int) -> int:
+        """
+        Fold up to limit ledger entries past the watermark into the rollups, returning how many were read.
+
+        Entries are read in (txid, entry_id) order and only from transactions below
+        the xmin of the database snapshot, which have all ended, so an entry whose
+        transaction commits late is picked up by a later run instead of being left
+        behind the watermark. The watermark row stays locked until the transaction
+        ends, so concurrent workers take turns, and it advances in the same commit
+        as the rollups, so no entry is counted twice or skipped.
+        """
+        # The clock is read before anything that could still post an entry is looked at
+        result = await self.session.execute(select(UTC_CLOCK))
+        clock = result.scalar_one()
+        result = await self.session.execute(select(SNAPSHOT_XMIN, OLDEST_TRANSACTION))
+        bound, oldest_transaction = result.one()
+
+        await self.session.execute(
+            pg_insert(ReportWatermark)
+            .values(name=LEDGER_WATERMARK, last_txid=0, last_entry_id=0)
+            .on_conflict_do_nothing(index_elements=[ReportWatermark.name])
+        )
+        result = await self.session.execute(
+            select(ReportWatermark.last_txid, ReportWatermark.last_entry_id)
+            .where(ReportWatermark.name == LEDGER_WATERMARK)
+            .with_for_update()
+        )
+        last = tuple(result.one())
+
+        result = await self.session.execute(
+            select(
+                LedgerEntry.entry_id,
+                LedgerEntry.txid,
+                LedgerEntry.txn_ref,
+                LedgerEntry.user_id,
+                LedgerEntry.amount,
+                LedgerEntry.entry_type,
+                LedgerEntry.created_at,
+            )
+            .where(
+                tuple_(LedgerEntry.txid, LedgerEntry.entry_id) > tuple_(*last),
+                LedgerEntry.txid < bound,
+            )
+            .order_by(LedgerEntry.txid, LedgerEntry.entry_id)
+            .limit(limit)
+        )
+        entries = result.all()
+        if entries:
+            await self._add(entries)
+            last = (entries[-1].txid, entries[-1].entry_id)
+
+        # Complete up to the earliest entry that may still be missing: one already
+        # visible past the watermark, or one a running transaction is yet to commit,
+        # which is stamped with its start time
+        result = await self.session.execute(
+            select(func.min(LedgerEntry.created_at)).where(
+                tuple_(LedgerEntry.txid, LedgerEntry.entry_id) > tuple_(*last)
+            )
+        )
+        pending = result.scalar_one()
+        await self.session.execute(
+            update(ReportWatermark)
+            .where(ReportWatermark.name == LEDGER_WATERMARK)
+            .values(
+                last_txid=last[0],
+                last_entry_id=last[1],
+                rolled_up_to=min(t for t in (clock, oldest_transaction, pending) if t is not None),
+            )
+        )
+        return len(entries)
+
+    async def find_rolled_up_to(self) -> Optional[datetime]:
+        """
+        Find the time the rollups include every movement up to.
+        """
+        result = await self.session.execute(
+            select(ReportWatermark.rolled_up_to).where(ReportWatermark.name == LEDGER_WATERMARK)
+        )
+        return result.scalar_one_or_none()
+
+    async def find_by_hour(self, kind: str, start: datetime, end: datetime) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of one movement type per hour in [start, end), oldest first.
+        """
+        rows = Projection(
+            ReportRowRecordDTO,
+            bucket=ReportRollupHourly.bucket,
+            amount=cast(func.sum(ReportRollupHourly.amount), BigInteger),
+            count=func.sum(ReportRollupHourly.count),
+        )
+        result = await self.session.execute(
+            rows.select()
+            .where(
+                ReportRollupHourly.kind == kind,
+                ReportRollupHourly.bucket >= start,
+                ReportRollupHourly.bucket < end,
+            )
+            .group_by(ReportRollupHourly.bucket)
+            .order_by(ReportRollupHourly.bucket)
+        )
+        return rows.all(result)
+
+    async def find_by_method(self, kind: str, start: datetime, end: datetime) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of one movement type per method in [start, end), largest first.
+        """
+        amount = cast(func.sum(ReportRollupHourly.amount), BigInteger)
+        rows = Projection(
+            ReportRowRecordDTO,
+            method=ReportRollupHourly.method,
+            amount=amount,
+            count=func.sum(ReportRollupHourly.count),
+        )
+        result = await self.session.execute(
+            rows.select()
+            .where(
+                ReportRollupHourly.kind == kind,
+                ReportRollupHourly.bucket >= start,
+                ReportRollupHourly.bucket < end,
+            )
+            .group_by(ReportRollupHourly.method)
+            .order_by(amount.desc(), ReportRollupHourly.method)
+        )
+        return rows.all(result)
+
+    async def find_by_user(
+        self, kind: str, start: datetime, end: datetime, limit: int
+    ) -> List[ReportRowRecordDTO]:
+        """
+        Retrieve the totals of the limit users that moved the most in [start, end), largest first.
+        """
+        amount = cast(func.sum(ReportRollupDailyUser.amount), BigInteger)
+        rows = Projection(
+            ReportRowRecordDTO,
+            user_id=ReportRollupDailyUser.user_id,
+            amount=amount,
+            count=func.sum(ReportRollupDailyUser.count),
+        )
+        result = await self.session.execute(
+            rows.select()
+            .where(
+                ReportRollupDailyUser.kind == kind,
+                ReportRollupDailyUser.day >= start,
+                ReportRollupDailyUser.day < end,
+            )
+            .group_by(ReportRollupDailyUser.user_id)
+            .order_by(amount.desc(), ReportRollupDailyUser.user_id)
+            .limit(limit)
+        )
+        return rows.all(result)
+
+    async def _add(self, entries: list) -> None:
+        # Topup methods and transfer senders are not in the ledger; fetch them for the whole batch at once
+        refs: Dict[str, set] = {kind: set() for kind in REPORT_KINDS}
+        for entry in entries:
+            kind, _, ref = entry.txn_ref.partition(":")
+            if kind in refs:
+                refs[kind].add(int(ref))
+
+        methods: Dict[int, str] = {}
+        if refs["topup"]:
+            result = await self.session.execute(
+                select(Topup.topup_id, Topup.topup_method).where(Topup.topup_id.in_(refs["topup"]))
+            )
+            methods = dict(result.all())
+        senders: Dict[int, int] = {}
+        if refs["transfer"]:
+            result = await self.session.execute(
+                select(Transfer.transfer_id, Transfer.transfer_from)
+                .where(Transfer.transfer_id.in_(refs["transfer"]))
+            )
+            senders = dict(result.all())
+
+        hourly: Dict[Tuple[str, datetime, str], List[int]] = {}
+        daily: Dict[Tuple[str, datetime, int], List[int]] = {}
+        for entry in entries:
+            kind, _, ref = entry.txn_ref.partition(":")
+            if kind not in refs or entry.user_id is None:
+                continue
+
+            # Each movement is counted once, on the side of the user who made it:
+            # the credited user of a topup, the debited one of a withdrawal or transfer
+            if kind == "topup":
+                amount = entry.amount
+            elif kind == "withdraw":
+                amount = -entry.amount
+            else:
+                sender = senders.get(int(ref))
+                if sender is None:
+                    # The transfer is gone; its original entries still say who paid
+                    if entry.amount > 0:
+                        continue
+                elif entry.user_id != sender:
+                    continue
+                amount = -entry.amount
+            # Adjustments change the amount of an earlier movement, not the number of movements
+            count = 1 if entry.entry_type == kind else 0
+
+            bucket = entry.created_at.replace(minute=0, second=0, microsecond=0)
+            method = methods.get(int(ref), "") if kind == "topup" else ""
+            for totals in (
+                hourly.setdefault((kind, bucket, method), [0, 0]),
+                daily.setdefault((kind, bucket.replace(hour=0), entry.user_id), [0, 0]),
+            ):
+                totals[0] += amount
+                totals[1] += count
+
+        if hourly:
+            await self._upsert(
+                ReportRollupHourly,
+                [ReportRollupHourly.kind, ReportRollupHourly.bucket, ReportRollupHourly.method],
+                [
+                    {"kind": kind, "bucket": bucket, "method": method, "amount": amount, "count": count}
+                    for (kind, bucket, method), (amount, count) in hourly.items()
+                ],
+            )
+        if daily:
+            await self._upsert(
+                ReportRollupDailyUser,
+                [ReportRollupDailyUser.kind, ReportRollupDailyUser.day, ReportRollupDailyUser.user_id],
+                [
+                    {"kind": kind, "day": day, "user_id": user_id, "amount": amount, "count": count}
+                    for (kind, day, user_id), (amount, count) in daily.items()
+                ],
+            )
+
+    async def _upsert(self, model, keys: list, rows: List[dict]) -> None:
+        # Add to the existing totals of each bucket, creating the ones seen for the first time
+        insert = pg_insert(model).values(rows)
+        await self.session.execute(
+            insert.on_conflict_do_update(
+                index_elements=keys,
+                set_={
+                    "amount": model.amount + insert.excluded.amount,
+                    "count": model.count + insert.excluded.count,
+                },
+            )
+        )
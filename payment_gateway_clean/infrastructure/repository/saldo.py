@@ -1,69 +1,118 @@
+import asyncio
+import random
+
 from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Update
 
-from typing import List, Optional
+from typing import AsyncIterator, Callable, List, Optional
 
-from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoRequest, UpdateSaldoBalanceRequest
+from domain.dtos.request.saldo import (
+    CreateSaldoRequest,
+    UpdateSaldoBalanceRequest,
+    UpdateSaldoDeltaRequest,
+    UpdateSaldoRequest,
+    UpdateSaldoWithdraw,
+)
 from domain.dtos.record.saldo import SaldoRecordDTO
 from domain.repository.saldo import ISaldoRepository
 from infrastructure.models.main import Saldo
+from infrastructure.repository.saldo_shard import SaldoShards
+from infrastructure.repository.projection import Projection
+from core.errors import ConcurrencyError, NotFoundError, ValidationError
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
 from datetime import datetime
 
+# PostgreSQL SQLSTATE raised by FOR UPDATE NOWAIT when the row is already locked
+LOCK_NOT_AVAILABLE = "55P03"
+
+# The balance includes the user's shards, summed in the same query
+SALDO_RECORD = Projection(
+    SaldoRecordDTO,
+    saldo_id=Saldo.saldo_id,
+    user_id=Saldo.user_id,
+    total_balance=Saldo.total_balance + SaldoShards.total(Saldo.user_id),
+    withdraw_amount=Saldo.withdraw_amount,
+    withdraw_time=Saldo.withdraw_time,
+    version=Saldo.version,
+    created_at=Saldo.created_at,
+    updated_at=Saldo.updated_at,
+)
+
+@instrument_repository
+@trace_methods
 class SaldoRepository(ISaldoRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, shards: Optional[SaldoShards] = None):
         self.session = session
+        self.shards = shards or SaldoShards(session)
 
-    async def find_all(self) -> List[SaldoRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[SaldoRecordDTO]:
         """
-        Retrieve all saldo records.
+        Retrieve a page of saldo records ordered by ID, starting after the given cursor.
         """
-        try:
-           
-            result = await self.session.execute(select(Saldo))
-            saldos = result.scalars().all()
-            return [SaldoRecordDTO.from_orm(saldo) for saldo in saldos]
-        finally:
-            await self.session.close()
+        query = SALDO_RECORD.select().order_by(Saldo.saldo_id).limit(limit)
+        if cursor is not None:
+            query = query.where(Saldo.saldo_id > cursor)
+
+        result = await self.session.execute(query)
+        return SALDO_RECORD.all(result)
+
+    async def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[SaldoRecordDTO]:
+        """
+        Stream saldo records ordered by ID without loading them all into memory.
+        """
+        query = (
+            SALDO_RECORD.select()
+            .order_by(Saldo.saldo_id)
+            .execution_options(yield_per=1000)
+        )
+        if cursor is not None:
+            query = query.where(Saldo.saldo_id > cursor)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield SALDO_RECORD.from_row(row)
 
     async def find_by_id(self, id: int) -> Optional[SaldoRecordDTO]:
         """
         Find a saldo record by its ID.
         """
-        result = await self.session.execute(select(Saldo).filter(Saldo.saldo_id == id))
-        saldo = result.scalars().first()
-        return SaldoRecordDTO.from_orm(saldo) if saldo else None
+        result = await self.session.execute(SALDO_RECORD.select().filter(Saldo.saldo_id == id))
+        return SALDO_RECORD.one(result.first())
 
     async def find_by_users_id(self, id: int) -> List[Optional[SaldoRecordDTO]]:
         """
         Find all saldo records associated with a given user ID.
         """
-        result = await self.session.execute(select(Saldo).filter(Saldo.user_id == id))
-        saldos = result.scalars().all()
-        return [SaldoRecordDTO.from_orm(saldo) for saldo in saldos]
+        result = await self.session.execute(SALDO_RECORD.select().filter(Saldo.user_id == id))
+        return SALDO_RECORD.all(result)
 
     async def find_by_user_id(self, id: int) -> Optional[SaldoRecordDTO]:
         """
         Find a single saldo record associated with a given user ID.
         """
-        result = await self.session.execute(select(Saldo).filter(Saldo.user_id == id))
-        saldo = result.scalars().first()
-        return SaldoRecordDTO.from_orm(saldo) if saldo else None
+        result = await self.session.execute(SALDO_RECORD.select().filter(Saldo.user_id == id))
+        return SALDO_RECORD.one(result.first())
 
     async def create(self, input: CreateSaldoRequest) -> SaldoRecordDTO:
         """
         Create a new saldo record from the given input.
         """
-        new_saldo = Saldo(
-            user_id=input.user_id,
-            total_balance=input.total_balance,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            insert(Saldo)
+            .values(
+                user_id=input.user_id,
+                total_balance=input.total_balance,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(*SALDO_RECORD.columns)
         )
-        self.session.add(new_saldo)
-        await self.session.commit()
-        await self.session.refresh(new_saldo)
-        return SaldoRecordDTO.from_orm(new_saldo)
+        return SALDO_RECORD.one(result.first())
 
     async def update(self, input: UpdateSaldoRequest) -> SaldoRecordDTO:
         """
@@ -75,17 +124,15 @@ class SaldoRepository(ISaldoRepository):
             .values(
                 user_id=input.user_id,
                 total_balance=input.total_balance,
+                version=Saldo.version + 1,
                 updated_at=datetime.utcnow(),
             )
-            .returning(Saldo)
+            .returning(*SALDO_RECORD.columns)
         )
-        updated_saldo = result.scalars().first()
-        if updated_saldo:
-            await self.session.commit()
-            await self.session.refresh(updated_saldo)
-            return SaldoRecordDTO.from_orm(updated_saldo)
-        else:
+        updated_saldo = SALDO_RECORD.one(result.first())
+        if updated_saldo is None:
             raise ValueError("Saldo record not found")
+        return updated_saldo
 
     async def update_balance(self, input: UpdateSaldoBalanceRequest) -> SaldoRecordDTO:
         """
@@ -94,16 +141,165 @@ class SaldoRepository(ISaldoRepository):
         result = await self.session.execute(
             update(Saldo)
             .where(Saldo.user_id == input.user_id)
-            .values(total_balance=input.total_balance, updated_at=datetime.utcnow())
-            .returning(Saldo)
+            .values(
+                total_balance=input.total_balance,
+                version=Saldo.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(*SALDO_RECORD.columns)
         )
-        updated_saldo = result.scalars().first()
-        if updated_saldo:
-            await self.session.commit()
-            await self.session.refresh(updated_saldo)
-            return SaldoRecordDTO.from_orm(updated_saldo)
-        else:
+        updated_saldo = SALDO_RECORD.one(result.first())
+        if updated_saldo is None:
             raise ValueError("Saldo record not found")
+        return updated_saldo
+
+    async def apply_delta(self, input: UpdateSaldoDeltaRequest) -> SaldoRecordDTO:
+        """
+        Atomically add a signed amount to a user's balance, enforcing the minimum balance.
+
+        The arithmetic and the minimum balance check run inside the UPDATE itself, so
+        concurrent deltas on the same row serialize on its lock instead of overwriting
+        each other. Hot accounts are routed through their shards.
+        """
+        if self.shards.is_hot(input.user_id):
+            await self.shards.apply_delta(input.user_id, input.amount, input.min_balance)
+            return await self.find_by_user_id(input.user_id)
+
+        query = (
+            update(Saldo)
+            .where(Saldo.user_id == input.user_id)
+            .values(
+                total_balance=Saldo.total_balance + input.amount,
+                version=Saldo.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        if input.min_balance is not None:
+            query = query.where(Saldo.total_balance + input.amount >= input.min_balance)
+
+        return await self._execute_guarded(query, input.user_id)
+
+    async def update_saldo_withdraw(self, input: UpdateSaldoWithdraw) -> SaldoRecordDTO:
+        """
+        Atomically debit a withdrawal if the balance covers it and record it as the last withdrawal.
+        """
+        if input.withdraw_amount <= 0:
+            raise ValidationError("Withdraw amount must be positive")
+
+        withdraw_time = input.withdraw_time.replace(tzinfo=None)
+
+        if self.shards.is_hot(input.user_id):
+            await self.shards.apply_delta(input.user_id, -input.withdraw_amount)
+            await self.session.execute(
+                update(Saldo)
+                .where(Saldo.user_id == input.user_id)
+                .values(withdraw_amount=input.withdraw_amount, withdraw_time=withdraw_time)
+                .execution_options(synchronize_session=False)
+            )
+            return await self.find_by_user_id(input.user_id)
+
+        query = (
+            update(Saldo)
+            .where(
+                Saldo.user_id == input.user_id,
+                Saldo.total_balance >= input.withdraw_amount,
+            )
+            .values(
+                total_balance=Saldo.total_balance - input.withdraw_amount,
+                withdraw_amount=input.withdraw_amount,
+                withdraw_time=withdraw_time,
+                version=Saldo.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        return await self._execute_guarded(query, input.user_id)
+
+    async def update_balance_optimistic(
+        self, user_id: int, compute: Callable[[int], int], max_retries: int = 3
+    ) -> SaldoRecordDTO:
+        """
+        Set the balance to compute(current balance), retrying if another writer changed it first.
+
+        The balance is read together with its version and written back only if the
+        version is unchanged. Use this when the new balance needs logic that cannot be
+        expressed as a delta.
+
+        :raises ConcurrencyError: If every attempt lost the race.
+        """
+        for attempt in range(max_retries + 1):
+            result = await self.session.execute(
+                select(Saldo.total_balance, Saldo.version).where(Saldo.user_id == user_id)
+            )
+            current = result.first()
+            if current is None:
+                raise NotFoundError(f"Saldo with user_id {user_id} not found")
+
+            result = await self.session.execute(
+                update(Saldo)
+                .where(Saldo.user_id == user_id, Saldo.version == current.version)
+                .values(
+                    total_balance=compute(current.total_balance),
+                    version=Saldo.version + 1,
+                    updated_at=datetime.utcnow(),
+                )
+                .returning(*SALDO_RECORD.columns)
+            )
+            updated_saldo = SALDO_RECORD.one(result.first())
+            if updated_saldo is not None:
+                return updated_saldo
+
+            # Back off a little so competing writers do not retry in lockstep
+            await asyncio.sleep(random.uniform(0, 0.005 * 2**attempt))
+
+        raise ConcurrencyError(
+            f"Saldo with user_id {user_id} changed concurrently {max_retries + 1} times"
+        )
+
+    async def lock_by_user_id(
+        self, id: int, nowait: bool = False, skip_locked: bool = False
+    ) -> Optional[SaldoRecordDTO]:
+        """
+        Lock a user's saldo row until the end of the current transaction.
+
+        With skip_locked a row held by another transaction is returned as None. With
+        nowait a held row raises ConcurrencyError instead of waiting; the transaction
+        is then aborted and must be rolled back.
+        """
+        try:
+            result = await self.session.execute(
+                SALDO_RECORD.select()
+                .where(Saldo.user_id == id)
+                .with_for_update(nowait=nowait, skip_locked=skip_locked)
+            )
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE:
+                raise ConcurrencyError(f"Saldo with user_id {id} is locked")
+            raise
+
+        return SALDO_RECORD.one(result.first())
+
+    async def compact_shards(self) -> int:
+        """
+        Fold every user's shards back into their saldo row, returning the number of users compacted.
+        """
+        user_ids = await self.shards.users_with_balance()
+        for user_id in user_ids:
+            await self.shards.compact(user_id)
+        return len(user_ids)
+
+    async def _execute_guarded(self, query: Update, user_id: int) -> SaldoRecordDTO:
+        result = await self.session.execute(query.returning(*SALDO_RECORD.columns))
+        updated_saldo = SALDO_RECORD.one(result.first())
+        if updated_saldo is not None:
+            return updated_saldo
+
+        # The guard rejected the update; tell a missing row apart from a short balance
+        result = await self.session.execute(
+            select(Saldo.saldo_id).where(Saldo.user_id == user_id)
+        )
+        if result.first() is None:
+            raise NotFoundError(f"Saldo with user_id {user_id} not found")
+        raise ValidationError("Insufficient balance")
 
     async def delete(self, id: int) -> None:
         """
@@ -112,4 +308,4 @@ class SaldoRepository(ISaldoRepository):
         result = await self.session.execute(delete(Saldo).where(Saldo.saldo_id == id))
         if result.rowcount == 0:
             raise ValueError("Saldo record not found")
-        await self.session.commit()
+        await self.session.flush()
@@ -0,0 +1,224 @@
+import random
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.models.main import Saldo, SaldoShard
+from core.errors import NotFoundError, ValidationError
+
+
+class SaldoShards:
+    """
+    Spreads the balance of hot accounts over several sub-balance rows.
+
+    Credits to a hot account land on a random shard, so concurrent writers rarely
+    wait on the same row lock. A user's balance is always their saldo row plus the
+    sum of their shards; compaction folds the shards back into the saldo row.
+
+    Every writer locks the user's saldo row before any of their shards. Credits take
+    it FOR KEY SHARE, which only conflicts with deleting the row, so they still run
+    side by side; debits and compaction take it FOR NO KEY UPDATE, which queues them
+    behind each other, and then only use shards no one else holds (SKIP LOCKED), so
+    nothing waits on a shard while holding the saldo row.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        hot_user_ids: Iterable[int] = (),
+        shard_count: int = 8,
+    ):
+        self.session = session
+        self.hot_user_ids = frozenset(hot_user_ids)
+        self.shard_count = shard_count
+
+    def is_hot(self, user_id: int) -> bool:
+        return self.shard_count > 0 and user_id in self.hot_user_ids
+
+    async def apply_delta(
+        self, user_id: int, amount: int, min_balance: Optional[int] = 0
+    ) -> None:
+        """
+        Apply a signed amount to a hot account.
+
+        Credits go to a shard. Debits come out of a single shard when one covers them,
+        otherwise out of the saldo row; if that runs short the shards are folded into
+        it and the debit is retried once, so the minimum balance is always enforced
+        against the account's full balance.
+
+        :raises NotFoundError: If the user has no saldo.
+        :raises ValidationError: If the balance would drop below min_balance.
+        """
+        if amount >= 0:
+            await self.credit(user_id, amount)
+            return
+
+        if not await self._lock_saldo(user_id):
+            raise NotFoundError(f"Saldo with user_id {user_id} not found")
+
+        if min_balance == 0 and await self.debit(user_id, -amount):
+            return
+
+        for attempt in range(2):
+            query = (
+                update(Saldo)
+                .where(Saldo.user_id == user_id)
+                .values(
+                    total_balance=Saldo.total_balance + amount,
+                    version=Saldo.version + 1,
+                    updated_at=datetime.utcnow(),
+                )
+                .returning(Saldo.saldo_id)
+                .execution_options(synchronize_session=False)
+            )
+            if min_balance is not None:
+                query = query.where(Saldo.total_balance + amount >= min_balance)
+
+            result = await self.session.execute(query)
+            if result.first() is not None:
+                return
+
+            if attempt == 0 and await self.compact(user_id) == 0:
+                break
+
+        raise ValidationError("Insufficient balance")
+
+    async def credit(self, user_id: int, amount: int) -> None:
+        """
+        Add an amount to one of the user's shards, creating the shard on first use.
+
+        A transaction keeps crediting the same shard of a user, so two transactions
+        crediting the same accounts never hold each other's shards.
+
+        :raises NotFoundError: If the user has no saldo.
+        """
+        if not await self._lock_saldo(user_id, key_share=True):
+            raise NotFoundError(f"Saldo with user_id {user_id} not found")
+
+        shard_nos = self.session.info.setdefault("saldo_credit_shards", {})
+        shard_no = shard_nos.setdefault(user_id, random.randrange(self.shard_count))
+        credit = pg_insert(SaldoShard).values(
+            user_id=user_id,
+            shard_no=shard_no,
+            balance=amount,
+            updated_at=datetime.utcnow(),
+        )
+        await self.session.execute(
+            credit.on_conflict_do_update(
+                index_elements=[SaldoShard.user_id, SaldoShard.shard_no],
+                set_={
+                    "balance": SaldoShard.balance + credit.excluded.balance,
+                    "updated_at": credit.excluded.updated_at,
+                },
+            )
+        )
+
+    async def debit(self, user_id: int, amount: int) -> bool:
+        """
+        Take an amount from a single shard that covers it, returning False if none does.
+
+        The caller must hold the user's saldo row (see apply_delta); shards locked by
+        other transactions are skipped rather than waited for.
+        """
+        result = await self.session.execute(
+            select(SaldoShard.shard_no)
+            .where(SaldoShard.user_id == user_id, SaldoShard.balance >= amount)
+            .order_by(func.random())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        shard_no = result.scalar_one_or_none()
+        if shard_no is None:
+            return False
+
+        await self.session.execute(
+            update(SaldoShard)
+            .where(SaldoShard.user_id == user_id, SaldoShard.shard_no == shard_no)
+            .values(balance=SaldoShard.balance - amount, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    @staticmethod
+    def total(user_id: ColumnElement[int]) -> ColumnElement[int]:
+        """
+        Scalar subquery summing a user's shards, for use inside a SELECT.
+        """
+        return (
+            select(func.coalesce(func.sum(SaldoShard.balance), 0))
+            .where(SaldoShard.user_id == user_id)
+            .scalar_subquery()
+        )
+
+    async def compact(self, user_id: int) -> int:
+        """
+        Fold a user's shards into their saldo row, returning the amount moved.
+
+        Like a debit, this locks the saldo row before the shards and skips shards
+        that a running transaction holds; they are folded on a later run.
+        """
+        if not await self._lock_saldo(user_id):
+            return 0
+
+        result = await self.session.execute(
+            select(SaldoShard.shard_no, SaldoShard.balance)
+            .where(SaldoShard.user_id == user_id, SaldoShard.balance != 0)
+            .order_by(SaldoShard.shard_no)
+            .with_for_update(skip_locked=True)
+        )
+        shards = result.all()
+        if not shards:
+            return 0
+        folded = sum(balance for _, balance in shards)
+
+        now = datetime.utcnow()
+        await self.session.execute(
+            update(SaldoShard)
+            .where(
+                SaldoShard.user_id == user_id,
+                SaldoShard.shard_no.in_([shard_no for shard_no, _ in shards]),
+            )
+            .values(balance=0, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(
+            update(Saldo)
+            .where(Saldo.user_id == user_id)
+            .values(
+                total_balance=Saldo.total_balance + folded,
+                version=Saldo.version + 1,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return folded
+
+    async def users_with_balance(self, user_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Users that have anything left in their shards, whether or not they are still hot.
+
+        With user_ids, only those users are considered.
+        """
+        query = (
+            select(SaldoShard.user_id)
+            .where(SaldoShard.balance != 0)
+            .group_by(SaldoShard.user_id)
+            .order_by(SaldoShard.user_id)
+        )
+        if user_ids is not None:
+            query = query.where(SaldoShard.user_id.in_(list(user_ids)))
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def _lock_saldo(self, user_id: int, key_share: bool = False) -> bool:
+        # FOR KEY SHARE when key_share, FOR NO KEY UPDATE otherwise
+        result = await self.session.execute(
+            select(Saldo.saldo_id)
+            .where(Saldo.user_id == user_id)
+            .with_for_update(read=key_share, key_share=True)
+        )
+        return result.first() is not None
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.dtos.record.summary import UserTotalsRecordDTO
+from domain.dtos.record.topup import TopupRecordDTO
+from domain.dtos.record.transfer import TransferRecordDTO
+from domain.dtos.record.withdraw import WithdrawRecordDTO
+from domain.repository.summary import ISummaryRepository
+from infrastructure.models.main import Saldo, Topup, Transfer, User, Withdraw
+from infrastructure.repository.projection import Projection
+from infrastructure.repository.saldo_shard import SaldoShards
+from infrastructure.repository.topup import TOPUP_RECORD
+from infrastructure.repository.transfer import TRANSFER_RECORD
+from infrastructure.repository.withdraw import WITHDRAW_RECORD
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
+
+
+@instrument_repository
+@trace_methods
+class SummaryRepository(ISummaryRepository):
+    def __init__(self, session: AsyncSession, shards: Optional[SaldoShards] = None):
+        self.session = session
+        self.shards = shards or SaldoShards(session)
+
+    async def find_totals(self, user_id: int, since: datetime) -> Optional[UserTotalsRecordDTO]:
+        """
+        Find a user's balance and the totals and counts of each movement type created since the given time.
+
+        Everything comes back in one row of scalar subqueries, each a range scan of
+        a (user, created_at) index; no row means the user does not exist.
+        """
+
+        def total(model, column, *criteria):
+            return (
+                select(func.coalesce(func.sum(column), 0))
+                .where(*criteria, model.created_at >= since)
+                .scalar_subquery()
+            )
+
+        def count(model, *criteria):
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(*criteria, model.created_at >= since)
+                .scalar_subquery()
+            )
+
+        received = (Transfer.transfer_to == User.user_id,)
+        sent = (Transfer.transfer_from == User.user_id,)
+        totals = Projection(
+            UserTotalsRecordDTO,
+            user_id=User.user_id,
+            balance=(
+                select(Saldo.total_balance + self.shards.total(Saldo.user_id))
+                .where(Saldo.user_id == User.user_id)
+                .scalar_subquery()
+            ),
+            topup_amount=total(Topup, Topup.topup_amount, Topup.user_id == User.user_id),
+            topup_count=count(Topup, Topup.user_id == User.user_id),
+            transfer_in_amount=total(Transfer, Transfer.transfer_amount, *received),
+            transfer_in_count=count(Transfer, *received),
+            transfer_out_amount=total(Transfer, Transfer.transfer_amount, *sent),
+            transfer_out_count=count(Transfer, *sent),
+            withdraw_amount=total(Withdraw, Withdraw.withdraw_amount, Withdraw.user_id == User.user_id),
+            withdraw_count=count(Withdraw, Withdraw.user_id == User.user_id),
+        )
+        result = await self.session.execute(totals.select().where(User.user_id == user_id))
+        return totals.one(result.first())
+
+    async def find_recent_topups(self, user_id: int, limit: int) -> List[TopupRecordDTO]:
+        """
+        Retrieve a user's latest topups, newest first.
+        """
+        result = await self.session.execute(
+            TOPUP_RECORD.select()
+            .where(Topup.user_id == user_id)
+            .order_by(Topup.created_at.desc())
+            .limit(limit)
+        )
+        return TOPUP_RECORD.all(result)
+
+    async def find_recent_transfers(self, user_id: int, limit: int) -> List[TransferRecordDTO]:
+        """
+        Retrieve the latest transfers a user sent or received, newest first.
+
+        Each direction takes its own latest rows from its index before the two are
+        merged, so neither side is read past limit rows.
+        """
+        sent = (
+            TRANSFER_RECORD.select()
+            .where(Transfer.transfer_from == user_id)
+            .order_by(Transfer.created_at.desc())
+            .limit(limit)
+            .subquery()
+        )
+        received = (
+            TRANSFER_RECORD.select()
+            .where(Transfer.transfer_to == user_id, Transfer.transfer_from != user_id)
+            .order_by(Transfer.created_at.desc())
+            .limit(limit)
+            .subquery()
+        )
+        involving = union_all(select(sent), select(received)).subquery()
+        result = await self.session.execute(
+            select(involving).order_by(involving.c.created_at.desc()).limit(limit)
+        )
+        return TRANSFER_RECORD.all(result)
+
+    async def find_recent_withdraws(self, user_id: int, limit: int) -> List[WithdrawRecordDTO]:
+        """
+        Retrieve a user's latest withdrawals, newest first.
+        """
+        result = await self.session.execute(
+            WITHDRAW_RECORD.select()
+            .where(Withdraw.user_id == user_id)
+            .order_by(Withdraw.created_at.desc())
+            .limit(limit)
+        )
+        return WITHDRAW_RECORD.all(result)
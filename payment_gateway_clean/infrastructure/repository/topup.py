@@ -1,74 +1,197 @@
 from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
+from collections import defaultdict
 from datetime import datetime
 
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 from domain.dtos.request.topup import CreateTopupRequest, UpdateTopupRequest, UpdateTopupAmount
 from domain.dtos.record.topup import TopupRecordDTO
 from domain.repository.topup import ITopupRepository
-from infrastructure.models.main import Topup
+from infrastructure.models.main import Saldo, Topup, User
+from infrastructure.repository.projection import Projection
+from core.errors import AppError, NotFoundError
+from core.cache import UserScopedCache
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
 
 
+TOPUP_RECORD = Projection(
+    TopupRecordDTO,
+    topup_id=Topup.topup_id,
+    user_id=Topup.user_id,
+    topup_amount=Topup.topup_amount,
+    topup_method=Topup.topup_method,
+    topup_time=Topup.topup_time,
+    created_at=Topup.created_at,
+    updated_at=Topup.updated_at,
+)
+
+
+@instrument_repository
+@trace_methods
 class TopupRepository(ITopupRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, summary_cache: Optional[UserScopedCache] = None):
         self.session = session
+        self.summary_cache = summary_cache
+
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[TopupRecordDTO]:
+        """
+        Retrieve a page of topup records ordered by ID, starting after the given cursor.
+        """
+        query = TOPUP_RECORD.select().order_by(Topup.topup_id).limit(limit)
+        if cursor is not None:
+            query = query.where(Topup.topup_id > cursor)
+
+        result = await self.session.execute(query)
+        return TOPUP_RECORD.all(result)
 
-    async def find_all(self) -> List[TopupRecordDTO]:
+    async def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[TopupRecordDTO]:
         """
-        Retrieve all topup records.
+        Stream topup records ordered by ID without loading them all into memory.
         """
-        result = await self.session.execute(select(Topup))
-        topups = result.scalars().all()
-        return [TopupRecordDTO.from_orm(topup) for topup in topups]
+        query = (
+            TOPUP_RECORD.select()
+            .order_by(Topup.topup_id)
+            .execution_options(yield_per=1000)
+        )
+        if cursor is not None:
+            query = query.where(Topup.topup_id > cursor)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield TOPUP_RECORD.from_row(row)
 
     async def find_by_id(self, id: int) -> Optional[TopupRecordDTO]:
         """
         Find a topup record by its ID.
         """
-        result = await self.session.execute(select(Topup).filter(Topup.topup_id == id))
-        topup = result.scalars().first()
-        return TopupRecordDTO.from_orm(topup) if topup else None
+        result = await self.session.execute(TOPUP_RECORD.select().filter(Topup.topup_id == id))
+        return TOPUP_RECORD.one(result.first())
 
     async def find_by_users(self, user_id: int) -> List[Optional[TopupRecordDTO]]:
         """
         Find all topup records associated with a given user ID.
         """
         result = await self.session.execute(
-            select(Topup).filter(Topup.user_id == user_id)
+            TOPUP_RECORD.select().filter(Topup.user_id == user_id)
         )
-        topups = result.scalars().all()
-        return [TopupRecordDTO.from_orm(topup) for topup in topups]
+        return TOPUP_RECORD.all(result)
 
     async def find_by_user(self, user_id: int) -> Optional[TopupRecordDTO]:
         """
         Find a single topup record associated with a given user ID.
         """
         result = await self.session.execute(
-            select(Topup).filter(Topup.user_id == user_id)
+            TOPUP_RECORD.select().filter(Topup.user_id == user_id)
         )
-        topup = result.scalars().first()
-        return TopupRecordDTO.from_orm(topup) if topup else None
+        return TOPUP_RECORD.one(result.first())
 
     async def create(self, input: CreateTopupRequest) -> TopupRecordDTO:
         """
         Create a new topup record from the given input.
         """
-        new_topup = Topup(
-            topup_no=input.topup_no,
-            user_id=input.user_id,
-            topup_amount=input.topup_amount,
-            topup_method=input.topup_method,
-            topup_time=datetime.utcnow(),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            insert(Topup)
+            .values(
+                topup_no=input.topup_no,
+                user_id=input.user_id,
+                topup_amount=input.topup_amount,
+                topup_method=input.topup_method,
+                topup_time=now,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(*TOPUP_RECORD.columns)
+        )
+        return TOPUP_RECORD.one(result.first())
+
+    async def create_batch(self, inputs: List[CreateTopupRequest]) -> List[Union[int, AppError]]:
+        """
+        Insert a chunk of topups and credit their users' saldo, returning the new topup_id or the error for each input.
+
+        The chunk runs in a SAVEPOINT: one multi-row INSERT into topups, then one
+        INSERT ... ON CONFLICT (user_id) DO UPDATE that adds each user's summed amount
+        to their saldo, creating it when missing. A database failure fails the whole
+        chunk without touching earlier ones.
+        """
+        user_ids = {input.user_id for input in inputs}
+        result = await self.session.execute(
+            select(User.user_id).where(User.user_id.in_(user_ids))
         )
-        self.session.add(new_topup)
-        await self.session.commit()
-        await self.session.refresh(new_topup)
-        return TopupRecordDTO.from_orm(new_topup)
+        existing = set(result.scalars().all())
+
+        results: List[Union[int, AppError, None]] = []
+        accepted: List[int] = []
+        for index, input in enumerate(inputs):
+            if input.user_id in existing:
+                results.append(None)
+                accepted.append(index)
+            else:
+                results.append(NotFoundError(f"User with id {input.user_id} not found"))
+
+        if not accepted:
+            return results
+
+        now = datetime.utcnow()
+        deltas: Dict[int, int] = defaultdict(int)
+        for index in accepted:
+            deltas[inputs[index].user_id] += inputs[index].topup_amount
+
+        try:
+            async with self.session.begin_nested():
+                result = await self.session.scalars(
+                    insert(Topup).returning(Topup.topup_id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "topup_no": input.topup_no,
+                            "user_id": input.user_id,
+                            "topup_amount": input.topup_amount,
+                            "topup_method": input.topup_method,
+                            "topup_time": now,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                        for input in (inputs[index] for index in accepted)
+                    ],
+                )
+                topup_ids = result.all()
+
+                # Rows are sent in user_id order so concurrent chunks lock saldo consistently
+                credit = pg_insert(Saldo).values(
+                    [
+                        {
+                            "user_id": user_id,
+                            "total_balance": delta,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                        for user_id, delta in sorted(deltas.items())
+                    ]
+                )
+                await self.session.execute(
+                    credit.on_conflict_do_update(
+                        index_elements=[Saldo.user_id],
+                        set_={
+                            "total_balance": Saldo.total_balance + credit.excluded.total_balance,
+                            "version": Saldo.version + 1,
+                            "updated_at": now,
+                        },
+                    )
+                )
+        except Exception:
+            return [
+                result if result is not None else AppError("Failed to apply topup")
+                for result in results
+            ]
+
+        for index, topup_id in zip(accepted, topup_ids):
+            results[index] = topup_id
+        return results
 
     async def update(self, input: UpdateTopupRequest) -> TopupRecordDTO:
         """
@@ -78,22 +201,18 @@ class TopupRepository(ITopupRepository):
             update(Topup)
             .where(Topup.topup_id == input.topup_id)
             .values(
-                topup_no=input.topup_no,
                 user_id=input.user_id,
                 topup_amount=input.topup_amount,
                 topup_method=input.topup_method,
                 topup_time=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
             )
-            .returning(Topup)
+            .returning(*TOPUP_RECORD.columns)
         )
-        updated_topup = result.scalars().first()
-        if updated_topup:
-            await self.session.commit()
-            await self.session.refresh(updated_topup)
-            return TopupRecordDTO.from_orm(updated_topup)
-        else:
+        updated_topup = TOPUP_RECORD.one(result.first())
+        if updated_topup is None:
             raise ValueError("Topup record not found")
+        return updated_topup
 
     async def update_amount(self, input: UpdateTopupAmount) -> TopupRecordDTO:
         """
@@ -103,21 +222,23 @@ class TopupRepository(ITopupRepository):
             update(Topup)
             .where(Topup.topup_id == input.topup_id)
             .values(topup_amount=input.topup_amount, updated_at=datetime.utcnow())
-            .returning(Topup)
+            .returning(*TOPUP_RECORD.columns)
         )
-        updated_topup = result.scalars().first()
-        if updated_topup:
-            await self.session.commit()
-            await self.session.refresh(updated_topup)
-            return TopupRecordDTO.from_orm(updated_topup)
-        else:
+        updated_topup = TOPUP_RECORD.one(result.first())
+        if updated_topup is None:
             raise ValueError("Topup record not found")
+        return updated_topup
 
     async def delete(self, id: int) -> None:
         """
         Delete a topup record by its ID.
         """
-        result = await self.session.execute(delete(Topup).where(Topup.topup_id == id))
-        if result.rowcount == 0:
+        result = await self.session.execute(
+            delete(Topup).where(Topup.topup_id == id).returning(Topup.user_id)
+        )
+        deleted = result.first()
+        if deleted is None:
             raise ValueError("Topup record not found")
-        await self.session.commit()
+        if self.summary_cache is not None:
+            self.summary_cache.invalidate(self.session, deleted)
+        await self.session.flush()
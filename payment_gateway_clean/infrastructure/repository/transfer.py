@@ -1,91 +1,320 @@
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import Integer, column, select, insert, update, delete, union_all, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 from domain.dtos.request.transfer import CreateTransferRequest, UpdateTransferRequest, UpdateTransferAmountRequest
 
 
 from domain.dtos.record.transfer import TransferRecordDTO
 from domain.repository.transfer import ITransferRepository
-from infrastructure.models.main import Transfer
+from infrastructure.models.main import Saldo, Transfer
+from infrastructure.repository.saldo_shard import SaldoShards
+from infrastructure.repository.projection import Projection
+from core.errors import AppError, NotFoundError, ValidationError
+from core.cache import UserScopedCache
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
 
 
+TRANSFER_RECORD = Projection(
+    TransferRecordDTO,
+    transfer_id=Transfer.transfer_id,
+    transfer_from=Transfer.transfer_from,
+    transfer_to=Transfer.transfer_to,
+    tranfer_amount=Transfer.transfer_amount,
+    tranfer_time=Transfer.transfer_time,
+    created_at=Transfer.created_at,
+    updated_at=Transfer.updated_at,
+)
+
+
+@instrument_repository
+@trace_methods
 class TransferRepository(ITransferRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        shards: Optional[SaldoShards] = None,
+        summary_cache: Optional[UserScopedCache] = None,
+    ):
         self.session = session
+        self.shards = shards or SaldoShards(session)
+        self.summary_cache = summary_cache
 
-    async def find_all(self) -> List[TransferRecordDTO]:
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[TransferRecordDTO]:
         """
-        Retrieve all transfer records.
+        Retrieve a page of transfer records ordered by ID, starting after the given cursor.
         """
-        result = await self.session.execute(select(Transfer))
-        transfers = result.scalars().all()
-        return [TransferRecordDTO.from_orm(transfer) for transfer in transfers]
+        query = TRANSFER_RECORD.select().order_by(Transfer.transfer_id).limit(limit)
+        if cursor is not None:
+            query = query.where(Transfer.transfer_id > cursor)
+
+        result = await self.session.execute(query)
+        return TRANSFER_RECORD.all(result)
+
+    async def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[TransferRecordDTO]:
+        """
+        Stream transfer records ordered by ID without loading them all into memory.
+        """
+        query = (
+            TRANSFER_RECORD.select()
+            .order_by(Transfer.transfer_id)
+            .execution_options(yield_per=1000)
+        )
+        if cursor is not None:
+            query = query.where(Transfer.transfer_id > cursor)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield TRANSFER_RECORD.from_row(row)
 
     async def find_by_id(self, id: int) -> Optional[TransferRecordDTO]:
         """
         Find a transfer record by its ID.
         """
         result = await self.session.execute(
-            select(Transfer).filter(Transfer.transfer_id == id)
+            TRANSFER_RECORD.select().filter(Transfer.transfer_id == id)
         )
-        transfer = result.scalars().first()
-        return TransferRecordDTO.from_orm(transfer) if transfer else None
+        return TRANSFER_RECORD.one(result.first())
+
+    def _involving_user(self, user_id: int):
+        """
+        Transfers sent or received by the user, as a UNION ALL of two index scans.
+
+        A plain ``transfer_from = ? OR transfer_to = ?`` cannot use the per-column
+        indexes on most planners; self-transfers are only taken from the first branch.
+        """
+        return union_all(
+            TRANSFER_RECORD.select().where(Transfer.transfer_from == user_id),
+            TRANSFER_RECORD.select().where(
+                Transfer.transfer_to == user_id,
+                Transfer.transfer_from != user_id,
+            ),
+        ).subquery()
 
     async def find_by_users(self, user_id: int) -> Optional[List[TransferRecordDTO]]:
         """
         Find all transfer records associated with a given user ID.
         """
+        involving = self._involving_user(user_id)
         result = await self.session.execute(
-            select(Transfer)
-            .filter(
-                or_(
-                    Transfer.transfer_from == user_id,
-                    Transfer.transfer_to == user_id
-                )
-            )
-            .order_by(Transfer.created_at.desc())  
+            select(involving).order_by(involving.c.created_at.desc())
         )
-        transfers = result.scalars().all() 
-        return [TransferRecordDTO.from_orm(t) for t in transfers]
+        return TRANSFER_RECORD.all(result)
 
     async def find_by_user(self, user_id: int) -> Optional[TransferRecordDTO]:
         """
         Find a single transfer record associated with a given user ID.
         """
+        involving = self._involving_user(user_id)
+        result = await self.session.execute(select(involving).limit(1))
+        return TRANSFER_RECORD.one(result.first())
+
+    async def create(self, input: CreateTransferRequest) -> TransferRecordDTO:
+        """
+        Create a new transfer record from the given input.
+        """
+        now = datetime.utcnow()
         result = await self.session.execute(
-            select(Transfer)
-            .filter(
-                or_(
-                    Transfer.transfer_from == user_id,  
-                    Transfer.transfer_to == user_id, 
-                )
+            insert(Transfer)
+            .values(
+                transfer_from=input.transfer_from,
+                transfer_to=input.transfer_to,
+                transfer_amount=input.transfer_amount,
+                transfer_time=now,
+                created_at=now,
+                updated_at=now,
             )
-            .limit(1) 
+            .returning(*TRANSFER_RECORD.columns)
         )
+        return TRANSFER_RECORD.one(result.first())
 
-        transfer = result.scalars().first()  # Get the first (and only) matching transfer
-        return TransferRecordDTO.from_orm(transfer) if transfer else None
+    async def execute_transfer(self, input: CreateTransferRequest) -> TransferRecordDTO:
+        """
+        Debit the sender, credit the receiver and record the transfer in a single transaction.
 
-    async def create(self, input: CreateTransferRequest) -> TransferRecordDTO:
+        Balances are adjusted in place with ``UPDATE ... RETURNING`` so no prior read is
+        needed, and the two saldo rows are always locked in ascending user_id order so
+        that opposing transfers between the same pair of users cannot deadlock.
+        The request's unit of work commits, or rolls the whole transfer back if this raises.
         """
-        Create a new transfer record from the given input.
+        if input.transfer_amount <= 0:
+            raise ValidationError("Transfer amount must be positive")
+
+        now = datetime.utcnow()
+        deltas = {
+            input.transfer_from: -input.transfer_amount,
+            input.transfer_to: input.transfer_amount,
+        }
+
+        for user_id in sorted(deltas):
+            if self.shards.is_hot(user_id):
+                sender = user_id == input.transfer_from
+                try:
+                    await self.shards.apply_delta(
+                        user_id, deltas[user_id], min_balance=0 if sender else None
+                    )
+                except ValidationError:
+                    raise ValidationError("Insufficient balance for sender")
+                continue
+
+            result = await self.session.execute(
+                update(Saldo)
+                .where(Saldo.user_id == user_id)
+                .values(
+                    total_balance=Saldo.total_balance + deltas[user_id],
+                    version=Saldo.version + 1,
+                    updated_at=now,
+                )
+                .returning(Saldo.total_balance)
+            )
+            new_balance = result.scalar_one_or_none()
+
+            if new_balance is None:
+                raise NotFoundError(f"Saldo with User id {user_id} not found")
+
+            if user_id == input.transfer_from and new_balance < 0:
+                raise ValidationError("Insufficient balance for sender")
+
+        result = await self.session.execute(
+            insert(Transfer)
+            .values(
+                transfer_from=input.transfer_from,
+                transfer_to=input.transfer_to,
+                transfer_amount=input.transfer_amount,
+                transfer_time=now,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(*TRANSFER_RECORD.columns)
+        )
+        return TRANSFER_RECORD.one(result.first())
+
+    async def execute_transfer_batch(
+        self, inputs: List[CreateTransferRequest], chunk_size: int
+    ) -> List[Union[TransferRecordDTO, AppError]]:
         """
-        new_transfer = Transfer(
-            transfer_from=input.transfer_from,
-            transfer_to=input.transfer_to,
-            transfer_amount=input.transfer_amount,
-            transfer_time=datetime.utcnow(),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+        Apply many transfers with set-based statements, returning one result per input.
+
+        Every saldo row the batch touches is locked up front in user_id order, so
+        concurrent batches cannot deadlock, and any shards those users hold are then
+        folded into their rows. Items are checked in order against the running balances; a rejected item is returned as its error and does not stop
+        the rest. Each chunk runs in a SAVEPOINT with one UPDATE ... FROM (VALUES ...)
+        and one multi-row INSERT, so a database failure only fails its own chunk.
+        """
+        user_ids = sorted(
+            {user_id for input in inputs for user_id in (input.transfer_from, input.transfer_to)}
+        )
+
+        result = await self.session.execute(
+            select(Saldo.user_id, Saldo.total_balance)
+            .where(Saldo.user_id.in_(user_ids))
+            .order_by(Saldo.user_id)
+            .with_for_update(key_share=True)
+        )
+        balances: Dict[int, int] = dict(result.all())
+        for user_id in await self.shards.users_with_balance(user_ids):
+            balances[user_id] += await self.shards.compact(user_id)
+
+        results: List[Union[TransferRecordDTO, AppError, None]] = [None] * len(inputs)
+        chunk_size = chunk_size or len(inputs)
+
+        for start in range(0, len(inputs), chunk_size):
+            chunk = list(enumerate(inputs[start:start + chunk_size], start))
+            chunk_balances = dict(balances)
+            deltas: Dict[int, int] = defaultdict(int)
+            accepted = []
+
+            for index, input in chunk:
+                error = self._check_transfer(input, chunk_balances)
+                if error is not None:
+                    results[index] = error
+                    continue
+
+                chunk_balances[input.transfer_from] -= input.transfer_amount
+                chunk_balances[input.transfer_to] += input.transfer_amount
+                deltas[input.transfer_from] -= input.transfer_amount
+                deltas[input.transfer_to] += input.transfer_amount
+                accepted.append((index, input))
+
+            if not accepted:
+                continue
+
+            try:
+                async with self.session.begin_nested():
+                    transfers = await self._apply_transfer_chunk(
+                        [input for _, input in accepted], deltas
+                    )
+            except Exception:
+                for index, _ in accepted:
+                    results[index] = AppError("Failed to apply transfer")
+                continue
+
+            balances = chunk_balances
+            for (index, _), transfer in zip(accepted, transfers):
+                results[index] = transfer
+
+        return results
+
+    def _check_transfer(
+        self, input: CreateTransferRequest, balances: Dict[int, int]
+    ) -> Optional[AppError]:
+        if input.transfer_amount <= 0:
+            return ValidationError("Transfer amount must be positive")
+
+        if input.transfer_from == input.transfer_to:
+            return ValidationError("Sender and receiver must be different users")
+
+        for user_id in (input.transfer_from, input.transfer_to):
+            if user_id not in balances:
+                return NotFoundError(f"Saldo with User id {user_id} not found")
+
+        if balances[input.transfer_from] < input.transfer_amount:
+            return ValidationError("Insufficient balance for sender")
+
+        return None
+
+    async def _apply_transfer_chunk(
+        self, inputs: List[CreateTransferRequest], deltas: Dict[int, int]
+    ) -> List[TransferRecordDTO]:
+        now = datetime.utcnow()
+        changed = sorted((user_id, delta) for user_id, delta in deltas.items() if delta)
+
+        # Transfers in a chunk can cancel out, leaving no balance to change
+        if changed:
+            balance_deltas = values(
+                column("user_id", Integer), column("delta", Integer), name="balance_deltas"
+            ).data(changed)
+
+            await self.session.execute(
+                update(Saldo)
+                .where(Saldo.user_id == balance_deltas.c.user_id)
+                .values(
+                    total_balance=Saldo.total_balance + balance_deltas.c.delta,
+                    version=Saldo.version + 1,
+                    updated_at=now,
+                )
+            )
+
+        result = await self.session.execute(
+            insert(Transfer).returning(*TRANSFER_RECORD.columns, sort_by_parameter_order=True),
+            [
+                {
+                    "transfer_from": input.transfer_from,
+                    "transfer_to": input.transfer_to,
+                    "transfer_amount": input.transfer_amount,
+                    "transfer_time": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for input in inputs
+            ],
         )
-        self.session.add(new_transfer)
-        await self.session.commit()
-        await self.session.refresh(new_transfer)
-        return TransferRecordDTO.from_orm(new_transfer)
+        return TRANSFER_RECORD.all(result)
 
     async def update(self, input: UpdateTransferRequest) -> TransferRecordDTO:
         """
@@ -102,15 +331,12 @@ class TransferRepository(ITransferRepository):
                 transfer_time=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
             )
-            .returning(Transfer)
+            .returning(*TRANSFER_RECORD.columns)
         )
-        updated_transfer = result.scalars().first()
-        if updated_transfer:
-            await self.session.commit()
-            await self.session.refresh(updated_transfer)
-            return TransferRecordDTO.from_orm(updated_transfer)
-        else:
+        updated_transfer = TRANSFER_RECORD.one(result.first())
+        if updated_transfer is None:
             raise ValueError("Transfer record not found")
+        return updated_transfer
 
     async def update_amount(
         self, input: UpdateTransferAmountRequest
@@ -126,23 +352,25 @@ class TransferRepository(ITransferRepository):
                 transfer_amount=input.transfer_amount,
                 updated_at=datetime.utcnow(),
             )
-            .returning(Transfer)
+            .returning(*TRANSFER_RECORD.columns)
         )
-        updated_transfer = result.scalars().first()
-        if updated_transfer:
-            await self.session.commit()
-            await self.session.refresh(updated_transfer)
-            return TransferRecordDTO.from_orm(updated_transfer)
-        else:
+        updated_transfer = TRANSFER_RECORD.one(result.first())
+        if updated_transfer is None:
             raise ValueError("Transfer record not found")
+        return updated_transfer
 
     async def delete(self, id: int) -> None:
         """
         Delete a transfer record by its ID.
         """
         result = await self.session.execute(
-            delete(Transfer).where(Transfer.transfer_id == id)
+            delete(Transfer)
+            .where(Transfer.transfer_id == id)
+            .returning(Transfer.transfer_from, Transfer.transfer_to)
         )
-        if result.rowcount == 0:
+        deleted = result.first()
+        if deleted is None:
             raise ValueError("Transfer record not found")
-        await self.session.commit()
+        if self.summary_cache is not None:
+            self.summary_cache.invalidate(self.session, deleted)
+        await self.session.flush()
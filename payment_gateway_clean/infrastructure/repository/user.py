@@ -1,15 +1,32 @@
 from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from domain.dtos.request.user import CreateUserRequest, UpdateUserRequest
 from domain.dtos.record.user import UserRecordDTO
 from domain.repository.user import IUserRepository
 from infrastructure.models.main import User
+from infrastructure.repository.projection import Projection
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
 
 
+USER_RECORD = Projection(
+    UserRecordDTO,
+    user_id=User.user_id,
+    firstname=User.firstname,
+    lastname=User.lastname,
+    email=User.email,
+    password=User.password,
+    noc_transfer=User.noc_transfer,
+    created_at=User.created_at,
+    updated_at=User.updated_at,
+)
 
+
+@instrument_repository
+@trace_methods
 class UserRepository(IUserRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -25,34 +42,46 @@ class UserRepository(IUserRepository):
             updated_at=datetime.utcnow()
         )
         self.session.add(new_user)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(new_user)
         return UserRecordDTO.from_orm(new_user)
     
-    async def find_all(self) -> List[UserRecordDTO]:
-        result = await self.session.execute(select(User))
-        users = result.scalars().all()
-        return [UserRecordDTO.from_orm(user) for user in users]
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[UserRecordDTO]:
+        query = USER_RECORD.select().order_by(User.user_id).limit(limit)
+        if cursor is not None:
+            query = query.where(User.user_id > cursor)
 
-    async def find_by_email_exists(self, email: str) -> bool:
-        result = await self.session.execute(select(User).filter(User.email == email))
-        user = result.scalars().first()
-        return user is not None
+        result = await self.session.execute(query)
+        return USER_RECORD.all(result)
 
-    async def find_by_email(self, email: str) -> Optional[UserRecordDTO]:
-        result = await self.session.execute(select(User).filter(User.email == email))
-        user = result.scalars().first()
-        return UserRecordDTO.from_orm(user) if user else None
+    async def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[UserRecordDTO]:
+        query = (
+            USER_RECORD.select()
+            .order_by(User.user_id)
+            .execution_options(yield_per=1000)
+        )
+        if cursor is not None:
+            query = query.where(User.user_id > cursor)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield USER_RECORD.from_row(row)
+
+    async def find_by_email_exists(self, email: str) -> bool:
+        result = await self.session.execute(select(User.user_id).filter(User.email == email))
+        return result.first() is not None
 
     async def find_by_email(self, email: str) -> Optional[UserRecordDTO]:
-        result = await self.session.execute(select(User).filter(User.email == email))
-        user = result.scalars().first()
-        return UserRecordDTO.from_orm(user) if user else None
+        result = await self.session.execute(USER_RECORD.select().filter(User.email == email))
+        return USER_RECORD.one(result.first())
 
     async def find_by_id(self, user_id: int) -> Optional[UserRecordDTO]:
-        result = await self.session.execute(select(User).filter(User.user_id == user_id))
-        user = result.scalars().first()
-        return UserRecordDTO.from_orm(user) if user else None
+        result = await self.session.execute(USER_RECORD.select().filter(User.user_id == user_id))
+        return USER_RECORD.one(result.first())
+
+    async def exists(self, user_id: int) -> bool:
+        result = await self.session.execute(select(User.user_id).where(User.user_id == user_id))
+        return result.first() is not None
 
     async def update_user(self, user: UpdateUserRequest) -> UserRecordDTO:
         result = await self.session.execute(
@@ -69,7 +98,7 @@ class UserRepository(IUserRepository):
         )
         updated_user = result.scalars().first()
         if updated_user:
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(updated_user)
             return UserRecordDTO.from_orm(updated_user)
         else:
@@ -79,4 +108,4 @@ class UserRepository(IUserRepository):
         result = await self.session.execute(delete(User).where(User.user_id == user_id))
         if result.rowcount == 0:
             raise ValueError("User not found")
-        await self.session.commit()
\ No newline at end of file
+        await self.session.flush()
\ No newline at end of file
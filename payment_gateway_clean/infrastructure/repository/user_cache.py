@@ -0,0 +1,90 @@
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LRUCache
+from domain.dtos.request.user import CreateUserRequest, UpdateUserRequest
+from domain.dtos.record.user import UserRecordDTO
+from domain.repository.user import IUserRepository
+
+
+class CachedUserRepository(IUserRepository):
+    """
+    Read-through cache in front of a user repository.
+
+    exists and find_by_id are served from a process-wide LRU holding an existence
+    flag and the profile of each user under separate keys, so an existence check
+    never loads the full row. Only users that exist are cached, so a newly created user is never hidden by
+    a stale miss. Updates and deletes invalidate their entry right away and again
+    once the transaction commits. Reads take a cache token before querying, and
+    the row is not cached if the user was invalidated meanwhile, so a read that
+    started before the commit cannot put the old row back. Other workers see the
+    change once the entry's TTL runs out.
+    """
+
+    def __init__(
+        self,
+        repository: IUserRepository,
+        cache: LRUCache[Tuple[str, int], Union[UserRecordDTO, bool]],
+        session: AsyncSession,
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.session = session
+
+    async def create_user(self, user: CreateUserRequest) -> UserRecordDTO:
+        return await self.repository.create_user(user)
+
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[UserRecordDTO]:
+        return await self.repository.find_all(limit, cursor)
+
+    def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[UserRecordDTO]:
+        return self.repository.stream_all(cursor)
+
+    async def find_by_email_exists(self, email: str) -> bool:
+        return await self.repository.find_by_email_exists(email)
+
+    async def find_by_email(self, email: str) -> Optional[UserRecordDTO]:
+        return await self.repository.find_by_email(email)
+
+    async def exists(self, user_id: int) -> bool:
+        if self.cache.get(("exists", user_id)) is not None:
+            return True
+
+        token = self.cache.token()
+        exists = await self.repository.exists(user_id)
+        if exists:
+            self.cache.set(("exists", user_id), True, token)
+        return exists
+
+    async def find_by_id(self, user_id: int) -> Optional[UserRecordDTO]:
+        cached = self.cache.get(("profile", user_id))
+        if cached is not None:
+            return cached
+
+        token = self.cache.token()
+        user = await self.repository.find_by_id(user_id)
+        if user is not None:
+            self.cache.set(("profile", user_id), user, token)
+            self.cache.set(("exists", user_id), True, token)
+        return user
+
+    async def update_user(self, user: UpdateUserRequest) -> UserRecordDTO:
+        self._invalidate(user.id)
+        return await self.repository.update_user(user)
+
+    async def delete_user(self, user_id: int) -> None:
+        self._invalidate(user_id)
+        await self.repository.delete_user(user_id)
+
+    def _invalidate(self, user_id: int) -> None:
+        self._evict(user_id)
+        event.listen(
+            self.session.sync_session, "after_commit",
+            lambda _: self._evict(user_id), once=True,
+        )
+
+    def _evict(self, user_id: int) -> None:
+        self.cache.invalidate(("exists", user_id))
+        self.cache.invalidate(("profile", user_id))
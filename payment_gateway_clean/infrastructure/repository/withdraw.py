@@ -1,56 +1,100 @@
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import Integer, column, select, insert, update, delete, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 from domain.dtos.request.withdraw import CreateWithdrawRequest, UpdateWithdrawRequest
 from domain.dtos.record.withdraw import WithdrawRecordDTO
 from domain.repository.withdraw import IWithdrawRepository
-from infrastructure.models.main import Withdraw
+from infrastructure.models.main import Saldo, Withdraw
+from infrastructure.repository.saldo_shard import SaldoShards
+from infrastructure.repository.projection import Projection
+from core.errors import AppError, NotFoundError, ValidationError
+from core.cache import UserScopedCache
+from core.metrics import instrument_repository
+from core.tracing import trace_methods
 
+
+WITHDRAW_RECORD = Projection(
+    WithdrawRecordDTO,
+    withdraw_id=Withdraw.withdraw_id,
+    user_id=Withdraw.user_id,
+    withdraw_amount=Withdraw.withdraw_amount,
+    withdtaw_time=Withdraw.withdraw_time,
+    created_at=Withdraw.created_at,
+    updated_at=Withdraw.updated_at,
+)
+
+
+@instrument_repository
+@trace_methods
 class WithdrawRepository(IWithdrawRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        shards: Optional[SaldoShards] = None,
+        summary_cache: Optional[UserScopedCache] = None,
+    ):
         self.session = session
+        self.shards = shards or SaldoShards(session)
+        self.summary_cache = summary_cache
+
+    async def find_all(self, limit: int, cursor: Optional[int] = None) -> List[WithdrawRecordDTO]:
+        """
+        Retrieve a page of withdrawal records ordered by ID, starting after the given cursor.
+        """
+        query = WITHDRAW_RECORD.select().order_by(Withdraw.withdraw_id).limit(limit)
+        if cursor is not None:
+            query = query.where(Withdraw.withdraw_id > cursor)
 
-    async def find_all(self) -> List[WithdrawRecordDTO]:
+        result = await self.session.execute(query)
+        return WITHDRAW_RECORD.all(result)
+
+    async def stream_all(self, cursor: Optional[int] = None) -> AsyncIterator[WithdrawRecordDTO]:
         """
-        Retrieve all withdrawal records.
+        Stream withdrawal records ordered by ID without loading them all into memory.
         """
-        result = await self.session.execute(select(Withdraw))
-        withdrawals = result.scalars().all()
-        return [WithdrawRecordDTO.from_orm(withdrawal) for withdrawal in withdrawals]
+        query = (
+            WITHDRAW_RECORD.select()
+            .order_by(Withdraw.withdraw_id)
+            .execution_options(yield_per=1000)
+        )
+        if cursor is not None:
+            query = query.where(Withdraw.withdraw_id > cursor)
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield WITHDRAW_RECORD.from_row(row)
 
     async def find_by_id(self, id: int) -> Optional[WithdrawRecordDTO]:
         """
         Find a withdrawal record by its ID.
         """
         result = await self.session.execute(
-            select(Withdraw).filter(Withdraw.withdraw_id == id)
+            WITHDRAW_RECORD.select().filter(Withdraw.withdraw_id == id)
         )
-        withdrawal = result.scalars().first()
-        return WithdrawRecordDTO.from_orm(withdrawal) if withdrawal else None
+        return WITHDRAW_RECORD.one(result.first())
 
     async def find_by_users(self, user_id: int) -> Optional[List[WithdrawRecordDTO]]:
         """
         Find all withdrawal records associated with a given user ID.
         """
         result = await self.session.execute(
-            select(Withdraw).filter(Withdraw.user_id == user_id)
+            WITHDRAW_RECORD.select().filter(Withdraw.user_id == user_id)
         )
-        withdraws = result.scalars().all()
-        return [WithdrawRecordDTO.from_orm(withdraw) for withdraw in withdraws]
+        return WITHDRAW_RECORD.all(result)
 
     async def find_by_user(self, user_id: int) -> Optional[WithdrawRecordDTO]:
         """
         Find a single withdrawal record associated with a given user ID.
         """
         result = await self.session.execute(
-            select(Withdraw).filter(Withdraw.user_id == user_id).limit(1)
+            WITHDRAW_RECORD.select().filter(Withdraw.user_id == user_id).limit(1)
         )
-        withdraw = result.scalars().first()
-        return WithdrawRecordDTO.from_orm(withdraw) if withdraw else None
+        return WITHDRAW_RECORD.one(result.first())
 
     async def create(self, input: CreateWithdrawRequest) -> WithdrawRecordDTO:
         """
@@ -62,17 +106,113 @@ class WithdrawRepository(IWithdrawRepository):
         created_at = datetime.now().replace(tzinfo=None)
         updated_at = datetime.now().replace(tzinfo=None)
 
-        new_withdrawal = Withdraw(
-            user_id=input.user_id,
-            withdraw_amount=input.withdraw_amount,
-            withdraw_time=withdraw_time,
-            created_at=created_at,
-            updated_at=updated_at,
+        result = await self.session.execute(
+            insert(Withdraw)
+            .values(
+                user_id=input.user_id,
+                withdraw_amount=input.withdraw_amount,
+                withdraw_time=withdraw_time,
+                created_at=created_at,
+                updated_at=updated_at,
+            )
+            .returning(*WITHDRAW_RECORD.columns)
         )
-        self.session.add(new_withdrawal)
-        await self.session.commit()
-        await self.session.refresh(new_withdrawal)
-        return WithdrawRecordDTO.from_orm(new_withdrawal)
+        return WITHDRAW_RECORD.one(result.first())
+
+    async def execute_withdraw_batch(
+        self, inputs: List[CreateWithdrawRequest]
+    ) -> List[Union[WithdrawRecordDTO, AppError]]:
+        """
+        Debit and record many withdrawals at once, returning one result per input.
+
+        Amounts are summed per user and debited with a single conditional
+        UPDATE ... FROM (VALUES ...) WHERE total_balance >= sum RETURNING, so the
+        balance check and the debit are one atomic step; shards are folded into the
+        saldo rows first, so they count towards the balance. A user whose saldo cannot
+        cover the sum has all of their withdrawals in the batch rejected; items with
+        an amount that is not positive are rejected on their own. The accepted
+        withdrawals are then inserted with one multi-row INSERT, and each saldo keeps
+        its user's last withdrawal as withdraw_amount.
+        """
+        now = datetime.utcnow()
+        totals: Dict[int, int] = defaultdict(int)
+        last_amounts: Dict[int, int] = {}
+        for input in inputs:
+            if input.withdraw_amount > 0:
+                totals[input.user_id] += input.withdraw_amount
+                last_amounts[input.user_id] = input.withdraw_amount
+
+        debited = set()
+        insufficient = set()
+        withdrawals = iter(())
+        if totals:
+            for user_id in await self.shards.users_with_balance(totals):
+                await self.shards.compact(user_id)
+
+            withdraw_totals = values(
+                column("user_id", Integer),
+                column("amount", Integer),
+                column("last_amount", Integer),
+                name="withdraw_totals",
+            ).data(sorted((user_id, total, last_amounts[user_id]) for user_id, total in totals.items()))
+
+            result = await self.session.execute(
+                update(Saldo)
+                .where(
+                    Saldo.user_id == withdraw_totals.c.user_id,
+                    Saldo.total_balance >= withdraw_totals.c.amount,
+                )
+                .values(
+                    total_balance=Saldo.total_balance - withdraw_totals.c.amount,
+                    withdraw_amount=withdraw_totals.c.last_amount,
+                    withdraw_time=now,
+                    version=Saldo.version + 1,
+                    updated_at=now,
+                )
+                .returning(Saldo.user_id)
+                .execution_options(synchronize_session=False)
+            )
+            debited = set(result.scalars().all())
+
+            rejected = set(totals) - debited
+            if rejected:
+                result = await self.session.execute(
+                    select(Saldo.user_id).where(Saldo.user_id.in_(rejected))
+                )
+                insufficient = set(result.scalars().all())
+
+            accepted = [
+                input for input in inputs
+                if input.user_id in debited and input.withdraw_amount > 0
+            ]
+            if accepted:
+                result = await self.session.execute(
+                    insert(Withdraw).returning(*WITHDRAW_RECORD.columns, sort_by_parameter_order=True),
+                    [
+                        {
+                            "user_id": input.user_id,
+                            "withdraw_amount": input.withdraw_amount,
+                            "withdraw_time": input.withdraw_time.replace(tzinfo=None),
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                        for input in accepted
+                    ],
+                )
+                withdrawals = iter(result.all())
+
+        results: List[Union[WithdrawRecordDTO, AppError]] = []
+        for input in inputs:
+            if input.withdraw_amount <= 0:
+                results.append(ValidationError("Withdraw amount must be positive"))
+            elif input.user_id in debited:
+                results.append(WITHDRAW_RECORD.from_row(next(withdrawals)))
+            elif input.user_id in insufficient:
+                results.append(ValidationError("Insufficient balance"))
+            else:
+                results.append(NotFoundError(f"Saldo with user_id {input.user_id} not found"))
+
+        return results
 
     async def update(self, input: UpdateWithdrawRequest) -> WithdrawRecordDTO:
         """
@@ -89,21 +229,23 @@ class WithdrawRepository(IWithdrawRepository):
                 withdraw_time=withdraw_time,
                 updated_at=datetime.utcnow(),
             )
-            .returning(Withdraw)
+            .returning(*WITHDRAW_RECORD.columns)
         )
-        updated_withdrawal = result.scalars().first()
-        if updated_withdrawal:
-            await self.session.commit()
-            await self.session.refresh(updated_withdrawal)
-            return WithdrawRecordDTO.from_orm(updated_withdrawal)
-        else:
+        updated_withdrawal = WITHDRAW_RECORD.one(result.first())
+        if updated_withdrawal is None:
             raise ValueError("Withdrawal record not found")
+        return updated_withdrawal
 
     async def delete(self, id: int) -> None:
         """
         Delete a withdrawal record by its ID.
         """
-        result = await self.session.execute(delete(Withdraw).where(Withdraw.withdraw_id == id))
-        if result.rowcount == 0:
+        result = await self.session.execute(
+            delete(Withdraw).where(Withdraw.withdraw_id == id).returning(Withdraw.user_id)
+        )
+        deleted = result.first()
+        if deleted is None:
             raise ValueError("Withdrawal record not found")
-        await self.session.commit()
+        if self.summary_cache is not None:
+            self.summary_cache.invalidate(self.session, deleted)
+        await self.session.flush()
@@ -12,11 +12,14 @@ from domain.dtos.response.user import UserResponse
 
 from core.utils.random_vcc import random_vcc
 from core.errors import InvalidCredentialsError
+from core.exceptions.hashing_pool_exception import HashingPoolSaturatedException
+from core.tracing import trace_methods
 
 
 logger = get_logger()
 
 
+@trace_methods
 class AuthService(IAuthService):
     def __init__(
         self, repository: IUserRepository, hashing: Hashing, jwt_config: JwtConfig
@@ -63,6 +66,9 @@ class AuthService(IAuthService):
                 message="User registered successfully.",
                 data=UserResponse.from_dto(create_user),
             )
+        except HashingPoolSaturatedException:
+            logger.warning("Hashing pool saturated during registration", email=input.email)
+            raise
         except Exception as e:
             logger.error("Unexpected error during registration", error=str(e))
             return ErrorResponse(
@@ -96,6 +102,9 @@ class AuthService(IAuthService):
                 message="Login successful.",
                 data=token,
             )
+        except HashingPoolSaturatedException:
+            logger.warning("Hashing pool saturated during login", email=input.email)
+            raise
         except InvalidCredentialsError:
             logger.error("Invalid credentials", email=input.email)
             return ErrorResponse(
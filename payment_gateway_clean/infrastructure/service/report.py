@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Union
+
+from structlog import get_logger
+
+from core.tracing import trace_methods
+from domain.dtos.record.report import ReportRowRecordDTO
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.report import ReportResponse, ReportRow
+from domain.repository.report import IReportRepository
+from domain.service.report import IReportService
+
+logger = get_logger()
+
+
+@trace_methods
+class ReportService(IReportService):
+    """
+    Totals of topups, transfers and withdrawals served from the report rollups.
+
+    Hour, day and method reports read the hourly rollup, user reports the daily one;
+    periods are widened to whole hours, or whole days for user reports, in UTC.
+    """
+
+    def __init__(self, report_repository: IReportRepository, default_days: int = 30):
+        self.report_repository = report_repository
+        self.default_days = default_days
+
+    async def get_report(
+        self,
+        kind: str,
+        group_by: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        limit: int,
+    ) -> Union[ApiResponse[ReportResponse], ErrorResponse]:
+        if group_by == "method" and kind != "topup":
+            return ErrorResponse(status="error", message="Only topups can be grouped by method")
+
+        end = _utc(end) if end is not None else datetime.utcnow()
+        start = _utc(start) if start is not None else end - timedelta(days=self.default_days)
+        resolution = timedelta(days=1) if group_by == "user" else timedelta(hours=1)
+        start, end = _floor(start, resolution), _ceil(end, resolution)
+        if start >= end:
+            return ErrorResponse(status="error", message="start must be before end")
+
+        try:
+            if group_by == "user":
+                rows = await self.report_repository.find_by_user(kind, start, end, limit)
+            elif group_by == "method":
+                rows = await self.report_repository.find_by_method(kind, start, end)
+            else:
+                rows = await self.report_repository.find_by_hour(kind, start, end)
+                if group_by == "day":
+                    rows = _by_day(rows)
+            as_of = await self.report_repository.find_rolled_up_to()
+
+            return ApiResponse(
+                status="success",
+                message="Report retrieved successfully",
+                data=ReportResponse(
+                    kind=kind,
+                    group_by=group_by,
+                    start=start,
+                    end=end,
+                    as_of=as_of,
+                    total_amount=sum(row.amount for row in rows),
+                    total_count=sum(row.count for row in rows),
+                    rows=ReportRow.from_dtos(rows),
+                ),
+            )
+        except Exception as e:
+            logger.error("Failed to build report", kind=kind, group_by=group_by, error=str(e))
+            return ErrorResponse(
+                status="error",
+                message="An unexpected error occurred. Please try again later.",
+            )
+
+
+def _utc(value: datetime) -> datetime:
+    # Rollup buckets are naive UTC, like every timestamp the app writes
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _floor(value: datetime, resolution: timedelta) -> datetime:
+    return datetime.min + (value - datetime.min) // resolution * resolution
+
+
+def _ceil(value: datetime, resolution: timedelta) -> datetime:
+    floor = _floor(value, resolution)
+    return floor if floor == value else floor + resolution
+
+
+def _by_day(rows: List[ReportRowRecordDTO]) -> List[ReportRowRecordDTO]:
+    # Hourly rows come oldest first, so each day's hours are adjacent
+    days: List[ReportRowRecordDTO] = []
+    for row in rows:
+        day = row.bucket.replace(hour=0)
+        if days and days[-1].bucket == day:
+            days[-1].amount += row.amount
+            days[-1].count += row.count
+        else:
+            days.append(ReportRowRecordDTO.model_construct(bucket=day, amount=row.amount, count=row.count))
+    return days
@@ -1,36 +1,50 @@
-from typing import List, Optional, Union
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 from domain.repository.user import IUserRepository
 from domain.repository.saldo import ISaldoRepository
+from domain.repository.ledger import ILedgerRepository
 from domain.service.saldo import ISaldoService
 from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from core.errors import AppError, NotFoundError
-from domain.dtos.response.saldo import SaldoResponse
+from core.tracing import trace_methods
+from domain.dtos.response.saldo import SaldoBalanceAtResponse, SaldoResponse
 
 logger = get_logger()
 
 
+@trace_methods
 class SaldoService(ISaldoService):
     def __init__(
         self,
         user_repository: IUserRepository,
         saldo_repository: ISaldoRepository,
+        ledger_repository: ILedgerRepository,
     ):
         self.user_repository = user_repository
         self.saldo_repository = saldo_repository
+        self.ledger_repository = ledger_repository
 
     async def get_saldos(
-        self,
-    ) -> Union[ApiResponse[List[SaldoResponse]], ErrorResponse]:
+        self, pagination: PaginationRequest
+    ) -> Union[PaginatedApiResponse[List[SaldoResponse]], ErrorResponse]:
         try:
-            saldo = await self.saldo_repository.find_all()
+            saldo = await self.saldo_repository.find_all(
+                limit=pagination.fetch_limit, cursor=pagination.cursor
+            )
+            saldo, next_cursor = pagination.split_page(
+                saldo, lambda record: record.saldo_id
+            )
             saldo_response = SaldoResponse.from_dtos(saldo)
-            return ApiResponse(
+            return PaginatedApiResponse(
                 status="success",
                 message="Saldos retrieved successfully",
                 data=saldo_response,
+                next_cursor=next_cursor,
             )
         except Exception as e:
 
@@ -40,6 +54,12 @@ class SaldoService(ISaldoService):
                 message="An unexpected error occurred. Please try again later.",
             )
 
+    async def stream_saldos(
+        self, cursor: Optional[int] = None
+    ) -> AsyncIterator[SaldoResponse]:
+        async for saldo in self.saldo_repository.stream_all(cursor):
+            yield SaldoResponse.from_dto(saldo)
+
     async def get_saldo(
         self, id: int
     ) -> Union[ApiResponse[Optional[SaldoResponse]], ErrorResponse]:
@@ -69,8 +89,7 @@ class SaldoService(ISaldoService):
         self, id: int
     ) -> Union[ApiResponse[Optional[List[SaldoResponse]]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(id)
-            if not user:
+            if not await self.user_repository.exists(id):
                 raise NotFoundError(f"User with id {id} not found")
 
             saldo = await self.saldo_repository.find_by_users_id(id)
@@ -100,12 +119,11 @@ class SaldoService(ISaldoService):
     ) -> Union[ApiResponse[Optional[SaldoResponse]], ErrorResponse]:
 
         try:
-            user = await self.user_repository.find_by_id(id)
-            if not user:
-                logger.error(f"User with id {id} not found")
+            if not await self.user_repository.exists(id):
+                logger.error("User not found", user_id=id)
                 raise NotFoundError(f"User with id {id} not found")
         except Exception as e:
-            logger.error(f"Error finding user with id {id}: {e}")
+            logger.error("Error finding user", user_id=id, error=str(e))
             return ErrorResponse(
                 status="error", message=f"Error finding user with id {id}: {e}"
             )
@@ -116,7 +134,7 @@ class SaldoService(ISaldoService):
                 SaldoResponse.from_dto(saldo_data) if saldo_data is not None else None
             )
         except Exception as e:
-            logger.error(f"Error retrieving saldo for user with id {id}: {e}")
+            logger.error("Error retrieving saldo for user", user_id=id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message=f"Error retrieving saldo for user with id {id}: {e}",
@@ -124,30 +142,70 @@ class SaldoService(ISaldoService):
 
         # Prepare and return the response
         if saldo is None:
-            logger.info(f"No saldo found for user with id {id}")
+            logger.info("No saldo found for user", user_id=id)
             return ApiResponse(
                 status="success",
                 message=f"No saldo found for user with id {id}",
                 data=None,
             )
 
-        logger.info(f"Saldo retrieved successfully for user with id {id}")
+        logger.info("Saldo retrieved successfully for user", user_id=id)
         return ApiResponse(
             status="success",
             message="Saldo retrieved successfully",
             data=saldo,
         )
 
+    async def get_saldo_user_at(
+        self, user_id: int, at: datetime
+    ) -> Union[ApiResponse[SaldoBalanceAtResponse], ErrorResponse]:
+        try:
+            if not await self.user_repository.exists(user_id):
+                raise NotFoundError(f"User with id {user_id} not found")
+
+            # Ledger timestamps are naive UTC
+            if at.tzinfo is not None:
+                at = at.astimezone(timezone.utc).replace(tzinfo=None)
+
+            balance = await self.ledger_repository.balance_at(user_id, at)
+            logger.info("Balance at time computed", user_id=user_id, at=at, balance=balance)
+
+            return ApiResponse(
+                status="success",
+                message="Balance retrieved successfully",
+                data=SaldoBalanceAtResponse(user_id=user_id, balance=balance, at=at),
+            )
+        except NotFoundError as e:
+            logger.error("Error finding user", user_id=user_id, error=str(e))
+            return ErrorResponse(status="error", message=str(e))
+        except Exception as e:
+            logger.error("Error computing balance for user", user_id=user_id, error=str(e))
+            return ErrorResponse(
+                status="error",
+                message="An unexpected error occurred. Please try again later.",
+            )
+
     async def create_saldo(
         self, input: CreateSaldoRequest
     ) -> Union[ApiResponse[SaldoResponse], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(input.user_id)
-            if not user:
+            if not await self.user_repository.exists(input.user_id):
                 raise AppError.not_found(f"User with id {input.user_id} not found")
 
             saldo = await self.saldo_repository.create(input)
+            # An opening balance is an adjustment against the outside world, like setting one
+            await self.ledger_repository.record(
+                CreateLedgerEntryRequest.between(
+                    f"saldo:{saldo.saldo_id}", "adjustment", None, input.user_id, input.total_balance
+                )
+            )
 
+            logger.info("Saldo created successfully", user_id=input.user_id)
+            return ApiResponse(
+                status="success",
+                message="Saldo created successfully",
+                data=SaldoResponse.from_dto(saldo),
+            )
         except AppError as e:
             logger.error("Error creating saldo", error=str(e))
             return ErrorResponse(
@@ -160,16 +218,12 @@ class SaldoService(ISaldoService):
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
             )
-        finally:
-            if producer:
-                await producer.stop()
 
     async def update_saldo(
         self, input: UpdateSaldoRequest
     ) -> Union[ApiResponse[Optional[SaldoResponse]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(input.user_id)
-            if not user:
+            if not await self.user_repository.exists(input.user_id):
                 raise NotFoundError(f"User with id {input.user_id} not found")
 
             existing_saldo = await self.saldo_repository.find_by_id(input.saldo_id)
@@ -177,6 +231,22 @@ class SaldoService(ISaldoService):
                 raise NotFoundError(f"Saldo with id {input.saldo_id} not found")
 
             updated_saldo = await self.saldo_repository.update(input)
+
+            # Setting a balance directly is recorded as an adjustment against the outside world
+            txn_ref = f"saldo:{input.saldo_id}"
+            if existing_saldo.user_id == input.user_id:
+                entries = CreateLedgerEntryRequest.between(
+                    txn_ref, "adjustment", None, input.user_id,
+                    input.total_balance - existing_saldo.total_balance,
+                )
+            else:
+                entries = CreateLedgerEntryRequest.between(
+                    txn_ref, "adjustment", existing_saldo.user_id, None, existing_saldo.total_balance
+                ) + CreateLedgerEntryRequest.between(
+                    txn_ref, "adjustment", None, input.user_id, input.total_balance
+                )
+            await self.ledger_repository.record(entries)
+
             logger.info("Saldo updated successfully", saldo_id=input.saldo_id)
             return ApiResponse(
                 status="success",
@@ -198,17 +268,25 @@ class SaldoService(ISaldoService):
 
     async def delete_saldo(self, id: int) -> Union[ApiResponse[None], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(id)
-            if not user:
+            if not await self.user_repository.exists(id):
                 raise NotFoundError(f"User with id {id} not found")
 
             # Check if the saldo exists for the user
-            existing_saldo = await self.saldo_repository.find_by_user_id(user.user_id)
+            existing_saldo = await self.saldo_repository.find_by_user_id(id)
 
             if not existing_saldo:
                 raise NotFoundError(f"Saldo with id {id} not found")
 
             await self.saldo_repository.delete(existing_saldo.saldo_id)
+            await self.ledger_repository.record(
+                CreateLedgerEntryRequest.between(
+                    f"saldo:{existing_saldo.saldo_id}",
+                    "adjustment",
+                    id,
+                    None,
+                    existing_saldo.total_balance,
+                )
+            )
 
             return ApiResponse(
                 status="success",
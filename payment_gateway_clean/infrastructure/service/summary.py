@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncContextManager, Awaitable, Callable, Optional, Tuple, TypeVar, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from core.cache import UserScopedCache
+from core.tracing import trace_methods
+from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.summary import PeriodTotals, UserSummaryResponse
+from domain.dtos.response.topup import TopupResponse
+from domain.dtos.response.transfer import TransferResponse
+from domain.dtos.response.withdraw import WithdrawResponse
+from domain.repository.summary import ISummaryRepository
+from domain.service.summary import ISummaryService
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+
+@trace_methods
+class SummaryService(ISummaryService):
+    """
+    A user's dashboard summary, built from four queries run side by side and cached until the user's rows change.
+
+    Each query runs in its own unit of work, on its own pooled connection, so the
+    summary takes as long as the slowest query rather than the sum of all four.
+    """
+
+    def __init__(
+        self,
+        unit_of_work: Callable[[], AsyncContextManager[AsyncSession]],
+        repository: Callable[[AsyncSession], ISummaryRepository],
+        cache: UserScopedCache[Tuple[int, int], UserSummaryResponse],
+    ):
+        self.unit_of_work = unit_of_work
+        self.repository = repository
+        self.cache = cache
+
+    async def get_user_summary(
+        self, user_id: int, days: int, limit: int
+    ) -> Union[ApiResponse[UserSummaryResponse], ErrorResponse]:
+        try:
+            summary = self.cache.get(user_id, (days, limit))
+            if summary is None:
+                token = self.cache.token()
+                summary = await self._build(user_id, days, limit)
+                if summary is None:
+                    logger.error("User not found", user_id=user_id)
+                    return ErrorResponse(status="error", message=f"User with id {user_id} not found")
+                self.cache.set(user_id, (days, limit), summary, token)
+
+            return ApiResponse(
+                status="success",
+                message="User summary retrieved successfully",
+                data=summary,
+            )
+        except Exception as e:
+            logger.error("Failed to build user summary", user_id=user_id, error=str(e))
+            return ErrorResponse(
+                status="error",
+                message="An unexpected error occurred. Please try again later.",
+            )
+
+    async def _build(self, user_id: int, days: int, limit: int) -> Optional[UserSummaryResponse]:
+        since = datetime.utcnow() - timedelta(days=days)
+        totals, topups, transfers, withdraws = await asyncio.gather(
+            self._query(lambda repository: repository.find_totals(user_id, since)),
+            self._query(lambda repository: repository.find_recent_topups(user_id, limit)),
+            self._query(lambda repository: repository.find_recent_transfers(user_id, limit)),
+            self._query(lambda repository: repository.find_recent_withdraws(user_id, limit)),
+        )
+        if totals is None:
+            return None
+
+        return UserSummaryResponse(
+            user_id=user_id,
+            balance=totals.balance,
+            since=since,
+            topups=PeriodTotals(amount=totals.topup_amount, count=totals.topup_count),
+            transfers_in=PeriodTotals(amount=totals.transfer_in_amount, count=totals.transfer_in_count),
+            transfers_out=PeriodTotals(amount=totals.transfer_out_amount, count=totals.transfer_out_count),
+            withdraws=PeriodTotals(amount=totals.withdraw_amount, count=totals.withdraw_count),
+            recent_topups=TopupResponse.from_dtos(topups),
+            recent_transfers=TransferResponse.from_dtos(transfers),
+            recent_withdraws=WithdrawResponse.from_dtos(withdraws),
+        )
+
+    async def _query(self, query: Callable[[ISummaryRepository], Awaitable[T]]) -> T:
+        async with self.unit_of_work() as session:
+            return await query(self.repository(session))
@@ -1,4 +1,5 @@
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 from domain.repository.user import IUserRepository
@@ -9,43 +10,63 @@ from domain.service.topup import ITopupService
 from domain.repository.saldo import ISaldoRepository
 from domain.service.saldo import ISaldoService
 
+from domain.repository.ledger import ILedgerRepository
+from domain.repository.outbox import IOutboxRepository
+
 from domain.dtos.request.topup import CreateTopupRequest, UpdateTopupRequest
-from domain.dtos.request.saldo import UpdateSaldoBalanceRequest
+from domain.dtos.request.saldo import CreateSaldoRequest, UpdateSaldoDeltaRequest
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from domain.dtos.request.outbox import CreateOutboxEventRequest
+from domain.dtos.request.pagination import PaginationRequest
 
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from core.errors import AppError, NotFoundError
-from domain.dtos.response.topup import TopupResponse
+from core.tracing import trace_methods
+from domain.dtos.response.topup import TopupBatchFailure, TopupBatchResponse, TopupResponse
 
 
 logger = get_logger()
 
 
+@trace_methods
 class TopupService(ITopupService):
     def __init__(
         self,
         topup_repository: ITopupRepository,
         user_repository: IUserRepository,
         saldo_repository: ISaldoRepository,
+        ledger_repository: ILedgerRepository,
+        outbox_repository: IOutboxRepository,
+        batch_chunk_size: int = 1000,
     ):
         self.user_repository = user_repository
         self.saldo_repository = saldo_repository
         self.topup_repository = topup_repository
+        self.ledger_repository = ledger_repository
+        self.outbox_repository = outbox_repository
+        self.batch_chunk_size = batch_chunk_size
 
     async def get_topups(
-        self,
-    ) -> Union[ApiResponse[List[TopupResponse]], ErrorResponse]:
+        self, pagination: PaginationRequest
+    ) -> Union[PaginatedApiResponse[List[TopupResponse]], ErrorResponse]:
 
         try:
-            # Fetch all topups
-            topups = await self.topup_repository.find_all()
+            # Fetch one page of topups
+            topups = await self.topup_repository.find_all(
+                limit=pagination.fetch_limit, cursor=pagination.cursor
+            )
+            topups, next_cursor = pagination.split_page(
+                topups, lambda topup: topup.topup_id
+            )
             topup_responses = TopupResponse.from_dtos(topups)
 
             logger.info("Successfully retrieved topups", count=len(topup_responses))
 
-            return ApiResponse(
+            return PaginatedApiResponse(
                 status="success",
                 message="Topups retrieved successfully",
                 data=topup_responses,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             logger.error("Failed to fetch topups", error=str(e))
@@ -54,6 +75,13 @@ class TopupService(ITopupService):
                 message="An unexpected error occurred. Please try again later.",
             )
 
+    async def stream_topups(
+        self, cursor: Optional[int] = None
+    ) -> AsyncIterator[TopupResponse]:
+        logger.info("Streaming topups", cursor=cursor)
+        async for topup in self.topup_repository.stream_all(cursor):
+            yield TopupResponse.from_dto(topup)
+
     async def get_topup(
         self, id: int
     ) -> Union[ApiResponse[Optional[TopupResponse]], ErrorResponse]:
@@ -86,15 +114,14 @@ class TopupService(ITopupService):
         self, user_id: int
     ) -> Union[ApiResponse[Optional[List[TopupResponse]]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(user_id)
-            if not user:
-                logger.error(f"User with id {user_id} not found")
+            if not await self.user_repository.exists(user_id):
+                logger.error("User not found", user_id=user_id)
                 raise NotFoundError(f"User with id {user_id} not found")
 
             topups = await self.topup_repository.find_by_users(user_id)
 
             if not topups:
-                logger.info(f"No topups found for user with id {user_id}")
+                logger.info("No topups found for user", user_id=user_id)
                 return ApiResponse(
                     status="success",
                     message=f"No topups found for user with id {user_id}",
@@ -102,7 +129,7 @@ class TopupService(ITopupService):
                 )
 
             topup_response = TopupResponse.from_dtos(topups)
-            logger.info(f"Successfully retrieved topups for user with id {user_id}")
+            logger.info("Successfully retrieved topups for user", user_id=user_id)
 
             return ApiResponse(
                 status="success",
@@ -114,7 +141,7 @@ class TopupService(ITopupService):
             return ErrorResponse(status="error", message="Topup or user not found")
 
         except Exception as e:
-            logger.error(f"Failed to fetch topups for user with id {user_id}: {e}")
+            logger.error("Failed to fetch topups for user", user_id=user_id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
@@ -124,19 +151,18 @@ class TopupService(ITopupService):
         self, user_id: int
     ) -> Union[ApiResponse[Optional[TopupResponse]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(user_id)
-            if not user:
-                logger.error(f"User with id {user_id} not found")
+            if not await self.user_repository.exists(user_id):
+                logger.error("User not found", user_id=user_id)
                 raise NotFoundError(f"User with id {user_id} not found")
 
             topup = await self.topup_repository.find_by_user(user_id)
 
             if not topup:
-                logger.info(f"No topup found for user with id {user_id}")
+                logger.info("No topup found for user", user_id=user_id)
                 raise NotFoundError(f"Topup with user id {user_id} not found")
 
             topup_response = TopupResponse.from_dto(topup)
-            logger.info(f"Successfully retrieved topup for user with id {user_id}")
+            logger.info("Successfully retrieved topup for user", user_id=user_id)
 
             return ApiResponse(
                 status="success",
@@ -148,7 +174,7 @@ class TopupService(ITopupService):
             return ErrorResponse(status="error", message="Topup or user not found")
 
         except Exception as e:
-            logger.error(f"Failed to fetch topup for user with id {user_id}: {e}")
+            logger.error("Failed to fetch topup for user", user_id=user_id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
@@ -159,49 +185,49 @@ class TopupService(ITopupService):
     ) -> Union[ApiResponse[TopupResponse], ErrorResponse]:
         try:
             # Check if the user exists
-            user = await self.user_repository.find_by_id(input.user_id)
-            if not user:
-                logger.error(f"User with id {input.user_id} not found")
+            if not await self.user_repository.exists(input.user_id):
+                logger.error("User not found", user_id=input.user_id)
                 raise NotFoundError(f"User with id {input.user_id} not found")
 
             logger.info(
-                f"User with id {input.user_id} found, proceeding with topup creation"
+                "User found, proceeding with topup creation", user_id=input.user_id
             )
 
             # Create topup entry
             try:
                 topup = await self.topup_repository.create(input)
                 logger.info(
-                    f"Topup created for user {input.user_id}: topup amount {topup.topup_amount}"
+                    "Topup created for user", user_id=input.user_id, amount=topup.topup_amount
                 )
             except Exception as e:
-                logger.error(f"Error creating topup for user {input.user_id}: {e}")
+                logger.error("Error creating topup for user", user_id=input.user_id, error=str(e))
                 return ErrorResponse(status="error", message="Failed to create topup")
 
-            # Update or create saldo
-            saldo = await self.saldo_repository.find_by_user_id(input.user_id)
+            # Credit the saldo atomically, or create it on the first topup
             try:
-                if saldo:
-                    new_balance = saldo.total_balance + topup.topup_amount
-                    update_request = UpdateSaldoBalanceRequest(
-                        user_id=input.user_id, total_balance=new_balance
+                try:
+                    saldo = await self.saldo_repository.apply_delta(
+                        UpdateSaldoDeltaRequest(
+                            user_id=input.user_id,
+                            amount=topup.topup_amount,
+                            min_balance=None,
+                        )
                     )
-                    await self.saldo_repository.update_balance(update_request)
                     logger.info(
-                        f"Saldo updated successfully for user {input.user_id}. New balance: {new_balance}"
+                        "Saldo updated successfully for user", user_id=input.user_id, new_balance=saldo.total_balance
                     )
-                else:
+                except NotFoundError:
                     create_saldo_request = CreateSaldoRequest(
                         user_id=input.user_id, total_balance=topup.topup_amount
                     )
                     await self.saldo_repository.create(create_saldo_request)
                     logger.info(
-                        f"Initial saldo created for user {input.user_id} with balance {topup.topup_amount}"
+                        "Initial saldo created for user", user_id=input.user_id, balance=topup.topup_amount
                     )
 
             except Exception as db_err:
                 logger.error(
-                    f"Failed to update/create saldo for user {input.user_id}: {db_err}"
+                    "Failed to update/create saldo for user", user_id=input.user_id, error=str(db_err)
                 )
                 await self.topup_repository.delete(topup.topup_id)
                 return ErrorResponse(
@@ -209,8 +235,16 @@ class TopupService(ITopupService):
                     message=f"Failed to update/create saldo for user {input.user_id}",
                 )
 
+            entries = CreateLedgerEntryRequest.topup(
+                topup.topup_id, input.user_id, topup.topup_amount
+            )
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("topup.created", entries)
+            )
+
             logger.info(
-                f"Topup successfully created for user {input.user_id}. Total balance updated."
+                "Topup successfully created for user", user_id=input.user_id
             )
             return ApiResponse(
                 status="success",
@@ -225,12 +259,81 @@ class TopupService(ITopupService):
             )
 
         except Exception as e:
-            logger.error(f"Error processing topup for user {input.user_id}: {e}")
+            logger.error("Error processing topup for user", user_id=input.user_id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred while creating topup",
             )
 
+    async def create_topup_batch(
+        self, rows: AsyncIterator[Union[dict, ValueError]]
+    ) -> Union[ApiResponse[TopupBatchResponse], ErrorResponse]:
+        total = 0
+        failures: List[TopupBatchFailure] = []
+        chunk: List[Tuple[int, CreateTopupRequest]] = []
+
+        async def flush() -> None:
+            results = await self.topup_repository.create_batch(
+                [input for _, input in chunk]
+            )
+            entries: List[CreateLedgerEntryRequest] = []
+            for (row, input), result in zip(chunk, results):
+                if isinstance(result, AppError):
+                    failures.append(TopupBatchFailure(row=row, message=result.message))
+                else:
+                    entries.extend(
+                        CreateLedgerEntryRequest.topup(result, input.user_id, input.topup_amount)
+                    )
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("topup.created", entries)
+            )
+            chunk.clear()
+
+        try:
+            async for row in rows:
+                total += 1
+
+                if isinstance(row, ValueError):
+                    failures.append(TopupBatchFailure(row=total, message=str(row)))
+                    continue
+
+                try:
+                    chunk.append((total, CreateTopupRequest(**row)))
+                except PydanticValidationError as e:
+                    message = "; ".join(error["msg"] for error in e.errors())
+                    failures.append(TopupBatchFailure(row=total, message=message))
+                    continue
+
+                if len(chunk) >= self.batch_chunk_size:
+                    await flush()
+
+            if chunk:
+                await flush()
+
+        except ValueError as e:
+            logger.error("Topup batch rejected", error=str(e))
+            return ErrorResponse(status="error", message=str(e))
+
+        except Exception as e:
+            logger.error("Failed to ingest topup batch", error=str(e), total=total)
+            return ErrorResponse(status="error", message="Failed to ingest topup batch")
+
+        failures.sort(key=lambda failure: failure.row)
+        succeeded = total - len(failures)
+        logger.info("Topup batch ingested", succeeded=succeeded, total=total)
+
+        return ApiResponse(
+            status="success",
+            message=f"{succeeded} of {total} topups created",
+            data=TopupBatchResponse(
+                total=total,
+                succeeded=succeeded,
+                failed=len(failures),
+                failures=failures,
+            ),
+        )
+
     async def update_topup(
         self, input: UpdateTopupRequest
     ) -> Union[ApiResponse[Optional[TopupResponse]], ErrorResponse]:
@@ -242,8 +345,7 @@ class TopupService(ITopupService):
             )
 
             # Verify user existence
-            user = await self.user_repository.find_by_id(input.user_id)
-            if not user:
+            if not await self.user_repository.exists(input.user_id):
                 logger.error("User not found", user_id=input.user_id)
                 raise NotFoundError(f"User with id {input.user_id} not found")
 
@@ -274,19 +376,21 @@ class TopupService(ITopupService):
             )
 
             # Update saldo
-            saldo = await self.saldo_repository.find_by_user_id(input.user_id)
-            if not saldo:
-                logger.error("Saldo not found", user_id=input.user_id)
-                raise NotFoundError(f"Saldo for user {input.user_id} not found")
-
-            new_balance = saldo.total_balance + topup_difference
-            saldo_input = UpdateSaldoBalanceRequest(
-                user_id=input.user_id, total_balance=new_balance
+            saldo = await self.saldo_repository.apply_delta(
+                UpdateSaldoDeltaRequest(
+                    user_id=input.user_id, amount=topup_difference, min_balance=None
+                )
             )
 
-            await self.saldo_repository.update_balance(saldo_input)
+            logger.info("Saldo updated", user_id=input.user_id, new_balance=saldo.total_balance)
 
-            logger.info("Saldo updated", user_id=input.user_id, new_balance=new_balance)
+            entries = CreateLedgerEntryRequest.between(
+                f"topup:{input.topup_id}", "adjustment", None, input.user_id, topup_difference
+            )
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("topup.updated", entries)
+            )
 
             # Retrieve updated topup
             updated_topup = await self.topup_repository.find_by_id(input.topup_id)
@@ -312,25 +416,24 @@ class TopupService(ITopupService):
 
     async def delete_topup(self, id: int) -> Union[ApiResponse[None], ErrorResponse]:
         try:
-            # Find user by ID
-            user = await self.user_repository.find_by_id(id)
-            if not user:
-                logger.error(f"User with id {id} not found")
+            # Check the user exists
+            if not await self.user_repository.exists(id):
+                logger.error("User not found", user_id=id)
                 return ErrorResponse(
                     status="error", message=f"User with id {id} not found"
                 )
 
             # Find topup by user ID
-            existing_topup = await self.topup_repository.find_by_user(user.user_id)
+            existing_topup = await self.topup_repository.find_by_user(id)
             if not existing_topup:
-                logger.error(f"Topup with id {id} not found")
+                logger.error("Topup not found", id=id)
                 return ErrorResponse(
                     status="error", message=f"Topup with id {id} not found"
                 )
 
             # Delete topup
             await self.topup_repository.delete(existing_topup.topup_id)
-            logger.info(f"Topup deleted successfully for id: {id}")
+            logger.info("Topup deleted successfully", id=id)
 
             return ApiResponse[None](
                 status="success",
@@ -339,7 +442,7 @@ class TopupService(ITopupService):
             )
 
         except Exception as e:
-            logger.error(f"Failed to delete topup for id {id}: {str(e)}")
+            logger.error("Failed to delete topup", id=id, error=str(e))
             return ErrorResponse(
                 status="error", message=f"Failed to delete topup for id {id}"
             )
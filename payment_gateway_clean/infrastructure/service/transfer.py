@@ -1,4 +1,4 @@
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 from domain.repository.user import IUserRepository
@@ -9,65 +9,94 @@ from domain.service.transfer import ITransferService
 from domain.repository.saldo import ISaldoRepository
 from domain.service.saldo import ISaldoService
 
+from domain.repository.ledger import ILedgerRepository
+from domain.repository.outbox import IOutboxRepository
+
 from domain.dtos.request.transfer import (
     CreateTransferRequest,
     UpdateTransferRequest,
     UpdateTransferAmountRequest,
 )
-from domain.dtos.request.saldo import UpdateSaldoBalanceRequest
+from domain.dtos.request.saldo import UpdateSaldoDeltaRequest
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from domain.dtos.request.outbox import CreateOutboxEventRequest
+from domain.dtos.request.pagination import PaginationRequest
 
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from core.errors import AppError, NotFoundError, ValidationError
-from domain.dtos.response.transfer import TransferResponse
+from core.tracing import trace_methods
+from domain.dtos.response.transfer import TransferBatchItemResponse, TransferResponse
 
 
 logger = get_logger()
 
 
+@trace_methods
 class TransferService(ITransferService):
     def __init__(
         self,
         transfer_repository: ITransferRepository,
         user_repository: IUserRepository,
         saldo_repository: ISaldoRepository,
+        ledger_repository: ILedgerRepository,
+        outbox_repository: IOutboxRepository,
+        batch_max_items: int = 1000,
+        batch_chunk_size: int = 0,
     ):
         self.user_repository = user_repository
         self.saldo_repository = saldo_repository
         self.transfer_repository = transfer_repository
+        self.ledger_repository = ledger_repository
+        self.outbox_repository = outbox_repository
+        self.batch_max_items = batch_max_items
+        self.batch_chunk_size = batch_chunk_size
 
     async def get_transfers(
-        self,
-    ) -> Union[ApiResponse[List[TransferResponse]], ErrorResponse]:
+        self, pagination: PaginationRequest
+    ) -> Union[PaginatedApiResponse[List[TransferResponse]], ErrorResponse]:
         try:
-            logger.info("Retrieving all transfers")
-            transfers = await self.transfer_repository.find_all()
+            logger.info("Retrieving transfers", cursor=pagination.cursor)
+            transfers = await self.transfer_repository.find_all(
+                limit=pagination.fetch_limit, cursor=pagination.cursor
+            )
+            transfers, next_cursor = pagination.split_page(
+                transfers, lambda transfer: transfer.transfer_id
+            )
             transfer_responses = TransferResponse.from_dtos(transfers)
 
-            logger.info(f"Successfully retrieved {len(transfers)} transfers")
+            logger.info("Successfully retrieved transfers", count=len(transfers))
 
-            return ApiResponse(
+            return PaginatedApiResponse(
                 status="success",
                 message="Transfers retrieved successfully",
                 data=transfer_responses,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             logger.error("Failed to retrieve transfers", error=str(e))
             return ErrorResponse(status="error", message="Failed to retrieve transfers")
 
+    async def stream_transfers(
+        self, cursor: Optional[int] = None
+    ) -> AsyncIterator[TransferResponse]:
+        logger.info("Streaming transfers", cursor=cursor)
+        async for transfer in self.transfer_repository.stream_all(cursor):
+            yield TransferResponse.from_dto(transfer)
+
     async def get_transfer(
         self, id: int
     ) -> Union[ApiResponse[Optional[TransferResponse]], ErrorResponse]:
 
         try:
-            logger.info(f"Retrieving transfer with id {id}")
+            logger.info("Retrieving transfer", id=id)
             transfer = await self.transfer_repository.find_by_id(id)
 
             if transfer is None:
-                logger.error(f"Transfer with id {id} not found")
+                logger.error("Transfer not found", id=id)
                 raise NotFoundError(f"Transfer with id {id} not found")
 
             transfer_response = TransferResponse.from_dto(transfer)
-            logger.info(f"Successfully retrieved transfer with id {id}")
+            logger.info("Successfully retrieved transfer", id=id)
 
             return ApiResponse(
                 status="success",
@@ -75,7 +104,7 @@ class TransferService(ITransferService):
                 data=transfer_response,
             )
         except Exception as e:
-            logger.error(f"Failed to retrieve transfer with id {id}", error=str(e))
+            logger.error("Failed to retrieve transfer", id=id, error=str(e))
             return ErrorResponse(
                 status="error", message=f"Failed to retrieve transfer with id {id}"
             )
@@ -84,17 +113,18 @@ class TransferService(ITransferService):
         self, id: int
     ) -> Union[ApiResponse[Optional[List[TransferResponse]]], ErrorResponse]:
         try:
-            logger.info(f"Retrieving transfers for user with id {id}")
-            user = await self.user_repository.find_by_id(id)
-            if user is None:
-                logger.error(f"User with id {id} not found")
+            logger.info("Retrieving transfers for user", user_id=id)
+            if not await self.user_repository.exists(id):
+                logger.error("User not found", user_id=id)
                 raise NotFoundError(f"User with id {id} not found")
 
             transfers = await self.transfer_repository.find_by_users(id)
             transfer_responses = TransferResponse.from_dtos(transfers)
 
             logger.info(
-                f"Successfully retrieved {len(transfer_responses) if transfer_responses else 0} transfers for user {id}"
+                "Successfully retrieved transfers for user",
+                user_id=id,
+                count=len(transfer_responses) if transfer_responses else 0,
             )
 
             return ApiResponse(
@@ -103,7 +133,7 @@ class TransferService(ITransferService):
                 data=transfer_responses,
             )
         except Exception as e:
-            logger.error(f"Failed to retrieve transfers for user {id}", error=str(e))
+            logger.error("Failed to retrieve transfers for user", user_id=id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message=f"Failed to retrieve transfers for user {id}",
@@ -113,10 +143,9 @@ class TransferService(ITransferService):
         self, id: int
     ) -> Union[ApiResponse[Optional[TransferResponse]], ErrorResponse]:
         try:
-            logger.info(f"Retrieving transfer for user with id {id}")
-            user = await self.user_repository.find_by_id(id)
-            if user is None:
-                logger.error(f"User with id {id} not found")
+            logger.info("Retrieving transfer for user", user_id=id)
+            if not await self.user_repository.exists(id):
+                logger.error("User not found", user_id=id)
                 raise NotFoundError(f"User with id {id} not found")
 
             transfer = await self.transfer_repository.find_by_user(id)
@@ -125,9 +154,9 @@ class TransferService(ITransferService):
             )
 
             if transfer_response is not None:
-                logger.info(f"Successfully retrieved transfer for user with id {id}")
+                logger.info("Successfully retrieved transfer for user", user_id=id)
             else:
-                logger.info(f"No transfer found for user with id {id}")
+                logger.info("No transfer found for user", user_id=id)
 
             return ApiResponse(
                 status="success",
@@ -135,7 +164,7 @@ class TransferService(ITransferService):
                 data=transfer_response,
             )
         except Exception as e:
-            logger.error(f"Failed to retrieve transfer for user {id}", error=str(e))
+            logger.error("Failed to retrieve transfer for user", user_id=id, error=str(e))
             return ErrorResponse(
                 status="error", message=f"Failed to retrieve transfer for user {id}"
             )
@@ -144,74 +173,31 @@ class TransferService(ITransferService):
         self, input: CreateTransferRequest
     ) -> Union[ApiResponse[TransferResponse], ErrorResponse]:
         try:
-            # Check sender user
-            sender = await self.user_repository.find_by_id(input.transfer_from)
-            if sender is None:
-                logger.error(f"User with id {input.transfer_from} not found")
-                span.set_attribute("error", "Sender not found")
-                raise NotFoundError(f"User with id {input.transfer_from} not found")
-
-            # Check receiver user
-            receiver = await self.user_repository.find_by_id(input.transfer_to)
-            if receiver is None:
-                logger.error(f"User with id {input.transfer_to} not found")
-                raise NotFoundError(f"User with id {input.transfer_to} not found")
-
-            # Create transfer record
-            transfer = await self.transfer_repository.create(input)
-
-            # Update sender balance
-            sender_saldo = await self.saldo_repository.find_by_user_id(
-                input.transfer_from
+            if input.transfer_from == input.transfer_to:
+                logger.error("User attempted to transfer to themselves", user_id=input.transfer_from)
+                raise ValidationError("Sender and receiver must be different users")
+
+            # Debit, credit and insert the transfer record in one transaction
+            transfer = await self.transfer_repository.execute_transfer(input)
+            entries = CreateLedgerEntryRequest.transfer(
+                transfer.transfer_id,
+                input.transfer_from,
+                input.transfer_to,
+                input.transfer_amount,
             )
-            if sender_saldo is None:
-                logger.error(f"Saldo with User id {input.transfer_from} not found")
-                raise NotFoundError(
-                    f"Saldo with User id {input.transfer_from} not found"
-                )
-
-            sender_balance = sender_saldo.total_balance - input.transfer_amount
-            request_sender_balance = UpdateSaldoBalanceRequest(
-                user_id=input.transfer_from,
-                total_balance=sender_balance,
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("transfer.created", entries)
             )
 
-            # Rollback transfer if updating sender's balance fails
-            try:
-                await self.saldo_repository.update_balance(request_sender_balance)
-            except Exception as db_err:
-                logger.error(f"Failed to update saldo balance for sender: {db_err}")
-                await self.transfer_repository.delete(transfer.transfer_id)
-                return ErrorResponse(
-                    status="error",
-                    message="Failed to update saldo balance for sender",
-                )
-
-            # Update receiver balance
-            receiver_saldo = await self.saldo_repository.find_by_user_id(
-                input.transfer_to
-            )
-            if receiver_saldo is None:
-                logger.error(f"Saldo with User id {input.transfer_to} not found")
-                raise NotFoundError(f"Saldo with User id {input.transfer_to} not found")
-
-            receiver_balance = receiver_saldo.total_balance + input.transfer_amount
-            request_receiver_balance = UpdateSaldoBalanceRequest(
-                user_id=input.transfer_to,
-                total_balance=receiver_balance,
+            logger.info(
+                "Transfer completed",
+                transfer_id=transfer.transfer_id,
+                amount=input.transfer_amount,
+                transfer_from=input.transfer_from,
+                transfer_to=input.transfer_to,
             )
 
-            # Rollback transfer if updating receiver's balance fails
-            try:
-                await self.saldo_repository.update_balance(request_receiver_balance)
-            except Exception as db_err:
-                logger.error(f"Failed to update saldo balance for receiver: {db_err}")
-                await self.transfer_repository.delete(transfer.transfer_id)
-                return ErrorResponse(
-                    status="error",
-                    message="Failed to update saldo balance for receiver",
-                )
-
             return ApiResponse(
                 status="success",
                 message="Transfer created successfully",
@@ -219,94 +205,123 @@ class TransferService(ITransferService):
             )
 
         except NotFoundError as e:
-            logger.error(f"Not found: {e}")
+            logger.error("Transfer rejected, record not found", error=str(e))
+            return ErrorResponse(status="error", message=str(e))
+
+        except ValidationError as e:
+            logger.error("Transfer rejected", error=str(e))
             return ErrorResponse(status="error", message=str(e))
 
         except Exception as e:
-            logger.error(f"Failed to create transfer: {e}")
+            logger.error("Failed to create transfer", error=str(e))
             return ErrorResponse(status="error", message="Failed to create transfer")
 
-    async def update_transfer(
-        self, input: UpdateTransferRequest
-    ) -> Union[ApiResponse[TransferResponse], ErrorResponse]:
-
+    async def create_transfer_batch(
+        self, inputs: List[CreateTransferRequest]
+    ) -> Union[ApiResponse[List[TransferBatchItemResponse]], ErrorResponse]:
         try:
-            # Retrieve the existing transfer
-            transfer = await self.transfer_repository.find_by_id(input.transfer_id)
-            if not transfer:
-                logger.error(f"Transfer with id {input.transfer_id} not found")
-                raise NotFoundError(f"Transfer with id {input.transfer_id} not found")
-
-            # Calculate the difference in transfer amount
-            amount_difference = input.transfer_amount - transfer.transfer_amount
+            if not inputs:
+                raise ValidationError("Transfer batch must not be empty")
 
-            # Update sender's saldo
-            sender_saldo = await self.saldo_repository.find_by_user_id(
-                transfer.transfer_from
-            )
-            if not sender_saldo:
-                logger.error(f"Saldo with User id {transfer.transfer_from} not found")
-                raise NotFoundError(
-                    f"Saldo with User id {transfer.transfer_from} not found"
+            if len(inputs) > self.batch_max_items:
+                raise ValidationError(
+                    f"Transfer batch must not exceed {self.batch_max_items} items"
                 )
 
-            new_sender_balance = sender_saldo.total_balance - amount_difference
-
-            if new_sender_balance < 0:
-                logger.error("Insufficient balance for sender")
-                raise ValidationError("Insufficient balance for sender")
-
-            update_sender_balance = UpdateSaldoBalanceRequest(
-                user_id=transfer.transfer_from,
-                total_balance=new_sender_balance,
+            results = await self.transfer_repository.execute_transfer_batch(
+                inputs, self.batch_chunk_size
             )
 
-            # Update the sender's balance in the repository
-            try:
-                await self.saldo_repository.update_balance(update_sender_balance)
-            except Exception as db_err:
-                logger.error(f"Failed to update sender's saldo: {db_err}")
-                return ErrorResponse(
-                    status="error", message=f"Failed to update sender's saldo"
+            entries = [
+                entry
+                for input, result in zip(inputs, results)
+                if not isinstance(result, AppError)
+                for entry in CreateLedgerEntryRequest.transfer(
+                    result.transfer_id,
+                    input.transfer_from,
+                    input.transfer_to,
+                    input.transfer_amount,
                 )
-
-            # Update receiver's saldo
-            receiver_saldo = await self.saldo_repository.find_by_user_id(
-                transfer.transfer_to
+            ]
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("transfer.created", entries)
             )
-            if not receiver_saldo:
-                logger.error(f"Saldo with User id {transfer.transfer_to} not found")
-                raise NotFoundError(
-                    f"Saldo with User id {transfer.transfer_to} not found"
-                )
 
-            new_receiver_balance = receiver_saldo.total_balance + amount_difference
+            items = []
+            for index, result in enumerate(results):
+                if isinstance(result, AppError):
+                    items.append(
+                        TransferBatchItemResponse(
+                            index=index, status="error", message=result.message
+                        )
+                    )
+                else:
+                    items.append(
+                        TransferBatchItemResponse(
+                            index=index,
+                            status="success",
+                            data=TransferResponse.from_dto(result),
+                        )
+                    )
 
-            update_receiver_balance = UpdateSaldoBalanceRequest(
-                user_id=transfer.transfer_to,
-                total_balance=new_receiver_balance,
+            succeeded = sum(1 for item in items if item.status == "success")
+            logger.info(
+                "Transfer batch applied", succeeded=succeeded, total=len(items)
             )
 
-            # Update the receiver's balance in the repository
-            try:
-                await self.saldo_repository.update_balance(update_receiver_balance)
-            except Exception as db_err:
-                logger.error(f"Failed to update receiver's saldo: {db_err}")
+            return ApiResponse(
+                status="success",
+                message=f"{succeeded} of {len(items)} transfers created",
+                data=items,
+            )
 
-                # Rollback sender's saldo update if receiver's update fails
-                rollback_sender_balance = UpdateSaldoBalanceRequest(
-                    user_id=transfer.transfer_from,
-                    total_balance=sender_saldo.total_balance,
-                )
+        except ValidationError as e:
+            logger.error("Transfer batch rejected", error=str(e))
+            return ErrorResponse(status="error", message=str(e))
 
-                try:
-                    await self.saldo_repository.update_balance(rollback_sender_balance)
-                except Exception as rollback_err:
-                    logger.error(
-                        f"Failed to rollback sender's saldo update: {rollback_err}"
-                    )
+        except Exception as e:
+            logger.error("Failed to create transfer batch", error=str(e))
+            return ErrorResponse(status="error", message="Failed to create transfer batch")
 
-                return ErrorResponse(f"Failed to rollback sender's saldo update")
+    async def update_transfer(
+        self, input: UpdateTransferRequest
+    ) -> Union[ApiResponse[TransferResponse], ErrorResponse]:
+
+        try:
+            # Retrieve the existing transfer
+            transfer = await self.transfer_repository.find_by_id(input.transfer_id)
+            if not transfer:
+                logger.error("Transfer not found", transfer_id=input.transfer_id)
+                raise NotFoundError(f"Transfer with id {input.transfer_id} not found")
+
+            # Calculate the difference in transfer amount
+            amount_difference = input.transfer_amount - transfer.tranfer_amount
+
+            # Move the difference with atomic deltas, in user_id order so concurrent
+            # updates of the same pair of users cannot deadlock
+            deltas = {
+                transfer.transfer_from: UpdateSaldoDeltaRequest(
+                    user_id=transfer.transfer_from, amount=-amount_difference
+                ),
+                transfer.transfer_to: UpdateSaldoDeltaRequest(
+                    user_id=transfer.transfer_to, amount=amount_difference, min_balance=None
+                ),
+            }
+            for user_id in sorted(deltas):
+                await self.saldo_repository.apply_delta(deltas[user_id])
+
+            entries = CreateLedgerEntryRequest.between(
+                f"transfer:{transfer.transfer_id}",
+                "adjustment",
+                transfer.transfer_from,
+                transfer.transfer_to,
+                amount_difference,
+            )
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("transfer.updated", entries)
+            )
 
             # Update the transfer record
             updated_transfer = await self.transfer_repository.update(input)
@@ -317,26 +332,23 @@ class TransferService(ITransferService):
             )
 
         except Exception as e:
-            logger.error(f"Failed to update transfer: {e}")
+            logger.error("Failed to update transfer", error=str(e))
             return ErrorResponse(status="error", message="Failed to update transfer")
 
     async def delete_transfer(self, id: int) -> Union[ApiResponse[None], ErrorResponse]:
         try:
-            # Retrieve the user
-            user = await self.user_repository.find_by_id(id)
-            if not user:
-                logger.error(f"User with id {id} not found")
+            # Check the user exists
+            if not await self.user_repository.exists(id):
+                logger.error("User not found", user_id=id)
                 raise NotFoundError(f"User with id {id} not found")
 
             # Retrieve the transfer associated with the user
-            existing_transfer = await self.transfer_repository.find_by_user(
-                user.user_id
-            )
+            existing_transfer = await self.transfer_repository.find_by_user(id)
             if existing_transfer:
                 try:
                     # Delete the transfer
                     await self.transfer_repository.delete(existing_transfer.transfer_id)
-                    logger.info(f"Transfer deleted successfully for id: {id}")
+                    logger.info("Transfer deleted successfully", id=id)
 
                     return ApiResponse(
                         status="success",
@@ -345,16 +357,16 @@ class TransferService(ITransferService):
                     )
                 except Exception as db_err:
                     logger.error(
-                        f"Failed to delete transfer for user id {id}: {db_err}"
+                        "Failed to delete transfer for user", user_id=id, error=str(db_err)
                     )
                     return ErrorResponse(
                         status="error",
                         message=f"Failed to delete transfer for user id {id}",
                     )
             else:
-                logger.error(f"Transfer with user id {id} not found")
+                logger.error("Transfer for user not found", user_id=id)
                 raise NotFoundError(f"Transfer with user id {id} not found")
 
         except Exception as e:
-            logger.error(f"Failed to delete transfer: {e}")
+            logger.error("Failed to delete transfer", error=str(e))
             return ErrorResponse(status="error", message="Failed to delete transfer")
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
-from typing import Union, List
+from typing import AsyncIterator, Optional, Union, List
 
 from domain.repository.user import IUserRepository
 from domain.service.user import IUserService
@@ -11,14 +11,18 @@ from domain.dtos.request.user import (
     CreateUserRequest,
     UpdateUserRequest,
 )
-from domain.dtos.response.api import ApiResponse, ErrorResponse
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
 from core.errors import AppError
+from core.exceptions.hashing_pool_exception import HashingPoolSaturatedException
+from core.tracing import trace_methods
 from domain.dtos.response.user import UserResponse
 
 
 logger = get_logger()
 
 
+@trace_methods
 class UserService(IUserService):
     def __init__(
         self,
@@ -28,14 +32,20 @@ class UserService(IUserService):
         self.repository = repository
         self.hashing = hashing
 
-    async def get_users(self) -> Union[ApiResponse[List[UserResponse]], ErrorResponse]:
+    async def get_users(
+        self, pagination: PaginationRequest
+    ) -> Union[PaginatedApiResponse[List[UserResponse]], ErrorResponse]:
         try:
-            users = await self.repository.find_all()
+            users = await self.repository.find_all(
+                limit=pagination.fetch_limit, cursor=pagination.cursor
+            )
+            users, next_cursor = pagination.split_page(users, lambda user: user.user_id)
             user_responses = UserResponse.from_dtos(users)
-            return ApiResponse(
+            return PaginatedApiResponse(
                 status="success",
                 message="Successfully retrieved users.",
                 data=user_responses,
+                next_cursor=next_cursor,
             )
         except Exception as e:
             logger.error("Error retrieving users", error=str(e))
@@ -44,6 +54,10 @@ class UserService(IUserService):
                 message="Internal Server Error.",
             )
 
+    async def stream_users(self, cursor: Optional[int] = None) -> AsyncIterator[UserResponse]:
+        async for user in self.repository.stream_all(cursor):
+            yield UserResponse.from_dto(user)
+
     async def find_by_id(
         self, id: int
     ) -> Union[ApiResponse[UserResponse], ErrorResponse]:
@@ -94,6 +108,8 @@ class UserService(IUserService):
                 message="User created successfully.",
                 data=UserResponse.from_dto(user),
             )
+        except HashingPoolSaturatedException:
+            raise
         except Exception as e:
             logger.error("Error creating user", error=str(e))
             return ErrorResponse(
@@ -122,6 +138,8 @@ class UserService(IUserService):
                 message="User updated successfully.",
                 data=UserResponse.from_dto(updated_user),
             )
+        except HashingPoolSaturatedException:
+            raise
         except Exception as e:
             logger.error("Error updating user", user_id=input.id, error=str(e))
             return ErrorResponse(
@@ -1,4 +1,5 @@
-from typing import List, Optional, Union
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
@@ -6,49 +7,75 @@ from domain.repository.user import IUserRepository
 from domain.repository.withdraw import IWithdrawRepository
 from domain.service.withdraw import IWithdrawService
 from domain.repository.saldo import ISaldoRepository
+from domain.repository.ledger import ILedgerRepository
+from domain.repository.outbox import IOutboxRepository
 from domain.service.saldo import ISaldoService
 from domain.dtos.request.withdraw import CreateWithdrawRequest, UpdateWithdrawRequest
-from domain.dtos.request.saldo import UpdateSaldoBalanceRequest
-from domain.dtos.response.api import ApiResponse, ErrorResponse
-from domain.dtos.response.withdraw import WithdrawResponse
+from domain.dtos.request.saldo import UpdateSaldoWithdraw
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from domain.dtos.request.outbox import CreateOutboxEventRequest
+from domain.dtos.request.pagination import PaginationRequest
+from domain.dtos.response.api import ApiResponse, ErrorResponse, PaginatedApiResponse
+from domain.dtos.response.withdraw import WithdrawBatchItemResponse, WithdrawResponse
 
 from core.errors import AppError, NotFoundError, ValidationError
+from core.tracing import trace_methods
 
 
 logger = get_logger()
 
 
+@trace_methods
 class WithdrawService(IWithdrawService):
     def __init__(
         self,
         withdraw_repository: IWithdrawRepository,
         user_repository: IUserRepository,
         saldo_repository: ISaldoRepository,
+        ledger_repository: ILedgerRepository,
+        outbox_repository: IOutboxRepository,
+        batch_max_items: int = 1000,
     ):
         self.user_repository = user_repository
         self.saldo_repository = saldo_repository
         self.withdraw_repository = withdraw_repository
+        self.ledger_repository = ledger_repository
+        self.outbox_repository = outbox_repository
+        self.batch_max_items = batch_max_items
 
     async def get_withdraws(
-        self,
-    ) -> Union[ApiResponse[List[WithdrawResponse]], ErrorResponse]:
+        self, pagination: PaginationRequest
+    ) -> Union[PaginatedApiResponse[List[WithdrawResponse]], ErrorResponse]:
         try:
-            withdraws = await self.withdraw_repository.find_all()
+            withdraws = await self.withdraw_repository.find_all(
+                limit=pagination.fetch_limit, cursor=pagination.cursor
+            )
+            withdraws, next_cursor = pagination.split_page(
+                withdraws, lambda withdraw: withdraw.withdraw_id
+            )
             withdraw_responses = WithdrawResponse.from_dtos(withdraws)
 
-            logger.info(f"Successfully fetched {len(withdraw_responses)} withdrawals.")
-            return ApiResponse(
+            logger.info("Successfully fetched withdrawals", count=len(withdraw_responses))
+            return PaginatedApiResponse(
                 status="success",
                 message="Withdrawals retrieved successfully.",
                 data=withdraw_responses,
+                next_cursor=next_cursor,
             )
         except Exception as e:
-            logger.error(f"Failed to fetch withdrawals: {str(e)}")
+            logger.error("Failed to fetch withdrawals", error=str(e))
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
             )
 
+    async def stream_withdraws(
+        self, cursor: Optional[int] = None
+    ) -> AsyncIterator[WithdrawResponse]:
+        logger.info("Streaming withdrawals", cursor=cursor)
+        async for withdraw in self.withdraw_repository.stream_all(cursor):
+            yield WithdrawResponse.from_dto(withdraw)
+
     async def get_withdraw(
         self, id: int
     ) -> Union[ApiResponse[Optional[WithdrawResponse]], ErrorResponse]:
@@ -56,17 +83,17 @@ class WithdrawService(IWithdrawService):
             withdraw = await self.withdraw_repository.find_by_id(id)
 
             if withdraw:
-                logger.info(f"Successfully retrieved withdrawal with ID: {id}.")
+                logger.info("Successfully retrieved withdrawal", id=id)
                 return ApiResponse(
                     status="success",
                     message="Withdrawal retrieved successfully.",
                     data=WithdrawResponse.from_dto(withdraw),
                 )
             else:
-                logger.error(f"Withdrawal with ID {id} not found.")
+                logger.error("Withdrawal not found", id=id)
                 raise NotFoundError(f"Withdrawal with ID {id} not found.")
         except Exception as e:
-            logger.error(f"Failed to retrieve withdrawal with ID {id}: {str(e)}")
+            logger.error("Failed to retrieve withdrawal", id=id, error=str(e))
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
@@ -76,15 +103,14 @@ class WithdrawService(IWithdrawService):
         self, user_id: int
     ) -> Union[ApiResponse[Optional[List[WithdrawResponse]]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(user_id)
-            if not user:
-                logger.error(f"User with ID {user_id} not found.")
+            if not await self.user_repository.exists(user_id):
+                logger.error("User not found", user_id=user_id)
                 return NotFoundError(f"User with ID {user_id} not found.")
 
             withdrawals = await self.withdraw_repository.find_by_users(user_id)
 
             if not withdrawals:
-                logger.info(f"No withdrawals found for user with ID {user_id}.")
+                logger.info("No withdrawals found for user", user_id=user_id)
                 return ApiResponse(
                     status="success",
                     message=f"No withdrawals found for user with ID {user_id}.",
@@ -94,7 +120,7 @@ class WithdrawService(IWithdrawService):
             withdrawal_responses = WithdrawResponse.from_dtos(withdrawals)
 
             logger.info(
-                f"Successfully retrieved withdrawals for user with ID {user_id}."
+                "Successfully retrieved withdrawals for user", user_id=user_id
             )
             return ApiResponse(
                 status="success",
@@ -103,7 +129,7 @@ class WithdrawService(IWithdrawService):
             )
         except Exception as e:
             logger.error(
-                f"Failed to retrieve withdrawals for user with ID {user_id}: {str(e)}"
+                "Failed to retrieve withdrawals for user", user_id=user_id, error=str(e)
             )
             return ErrorResponse(
                 status="error",
@@ -114,19 +140,18 @@ class WithdrawService(IWithdrawService):
         self, user_id: int
     ) -> Union[ApiResponse[Optional[WithdrawResponse]], ErrorResponse]:
         try:
-            user = await self.user_repository.find_by_id(user_id)
-            if not user:
-                logger.error(f"User with ID {user_id} not found.")
+            if not await self.user_repository.exists(user_id):
+                logger.error("User not found", user_id=user_id)
                 raise NotFoundError(f"User with ID {user_id} not found.")
 
             withdrawal = await self.withdraw_repository.find_by_user(user_id)
             if not withdrawal:
-                logger.info(f"No withdrawal found for user with ID {user_id}.")
+                logger.info("No withdrawal found for user", user_id=user_id)
                 raise NotFoundError(f"Withdrawal for user with ID {user_id} not found.")
 
             withdrawal_response = WithdrawResponse.from_dto(withdrawal)
             logger.info(
-                f"Successfully retrieved withdrawal for user with ID {user_id}."
+                "Successfully retrieved withdrawal for user", user_id=user_id
             )
 
             return ApiResponse(
@@ -136,7 +161,7 @@ class WithdrawService(IWithdrawService):
             )
         except Exception as e:
             logger.error(
-                f"Failed to retrieve withdrawal for user with ID {user_id}: {str(e)}"
+                "Failed to retrieve withdrawal for user", user_id=user_id, error=str(e)
             )
             return ErrorResponse(
                 status="error",
@@ -147,48 +172,48 @@ class WithdrawService(IWithdrawService):
         self, input: CreateWithdrawRequest
     ) -> Union[ApiResponse[WithdrawResponse], ErrorResponse]:
         try:
-            logger.info(f"Creating withdraw for user_id: {input.user_id}")
-
-            saldo = await self.saldo_repository.find_by_user_id(input.user_id)
-            if not saldo:
-                logger.error(f"Saldo with user_id {input.user_id} not found")
-                raise NotFoundError(f"Saldo with user_id {input.user_id} not found")
-
-            if saldo.total_balance < input.withdraw_amount:
-                logger.error(
-                    f"Insufficient balance for user_id {input.user_id}. "
-                    f"Attempted withdrawal: {input.withdraw_amount}"
-                )
-                raise ValidationError("Insufficient balance")
-
-            logger.info("User has sufficient balance for withdrawal")
-
-            new_total_balance = saldo.total_balance - input.withdraw_amount
+            logger.info("Creating withdraw for user", user_id=input.user_id)
 
+            # The balance check and the debit are a single conditional UPDATE
             try:
-                await self.saldo_repository.update_saldo_withdraw(
+                saldo = await self.saldo_repository.update_saldo_withdraw(
                     input=UpdateSaldoWithdraw(
                         user_id=input.user_id,
                         withdraw_amount=input.withdraw_amount,
                         withdraw_time=datetime.utcnow(),
-                        total_balance=new_total_balance,
                     )
                 )
                 logger.info(
-                    f"Saldo balance updated for user_id {input.user_id}. "
-                    f"New balance: {new_total_balance}"
+                    "Saldo balance updated for user",
+                    user_id=input.user_id,
+                    new_balance=saldo.total_balance,
                 )
+            except (NotFoundError, ValidationError) as e:
+                logger.error(
+                    "Withdrawal rejected for user",
+                    user_id=input.user_id,
+                    amount=input.withdraw_amount,
+                    error=str(e),
+                )
+                return ErrorResponse(status="error", message=str(e))
             except Exception as e:
-                logger.error(f"Failed to update saldo balance: {e}")
+                logger.error("Failed to update saldo balance", error=str(e))
                 return ErrorResponse(
                     status="error", message=f"Failed to update saldo balance: {e}"
                 )
 
             try:
                 withdraw_record = await self.withdraw_repository.create(input)
+                entries = CreateLedgerEntryRequest.withdraw(
+                    withdraw_record.withdraw_id, input.user_id, input.withdraw_amount
+                )
+                await self.ledger_repository.record(entries)
+                await self.outbox_repository.add(
+                    CreateOutboxEventRequest.movements("withdraw.created", entries)
+                )
 
                 logger.info(
-                    f"Withdraw created successfully for user_id {input.user_id}"
+                    "Withdraw created successfully for user", user_id=input.user_id
                 )
 
                 return ApiResponse(
@@ -197,19 +222,81 @@ class WithdrawService(IWithdrawService):
                     data=WithdrawResponse.from_dto(withdraw_record),
                 )
             except Exception as e:
-                logger.error(f"Failed to create withdraw: {e}")
+                logger.error("Failed to create withdraw", error=str(e))
                 return ErrorResponse(
                     status="error", message=f"Failed to create withdraw: {e}"
                 )
         except Exception as e:
             logger.error(
-                f"Unexpected error while creating withdraw for user_id {input.user_id}: {str(e)}"
+                "Unexpected error while creating withdraw for user", user_id=input.user_id, error=str(e)
             )
             return ErrorResponse(
                 status="error",
                 message="An unexpected error occurred. Please try again later.",
             )
 
+    async def create_withdraw_batch(
+        self, inputs: List[CreateWithdrawRequest]
+    ) -> Union[ApiResponse[List[WithdrawBatchItemResponse]], ErrorResponse]:
+        try:
+            if not inputs:
+                raise ValidationError("Withdraw batch must not be empty")
+
+            if len(inputs) > self.batch_max_items:
+                raise ValidationError(
+                    f"Withdraw batch must not exceed {self.batch_max_items} items"
+                )
+
+            results = await self.withdraw_repository.execute_withdraw_batch(inputs)
+            entries = [
+                entry
+                for input, result in zip(inputs, results)
+                if not isinstance(result, AppError)
+                for entry in CreateLedgerEntryRequest.withdraw(
+                    result.withdraw_id, input.user_id, input.withdraw_amount
+                )
+            ]
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("withdraw.created", entries)
+            )
+
+            items = []
+            for index, result in enumerate(results):
+                if isinstance(result, AppError):
+                    items.append(
+                        WithdrawBatchItemResponse(
+                            index=index, status="error", message=result.message
+                        )
+                    )
+                else:
+                    items.append(
+                        WithdrawBatchItemResponse(
+                            index=index,
+                            status="success",
+                            data=WithdrawResponse.from_dto(result),
+                        )
+                    )
+
+            succeeded = sum(1 for item in items if item.status == "success")
+            logger.info(
+                "Withdraw batch applied", succeeded=succeeded, total=len(items)
+            )
+
+            return ApiResponse(
+                status="success",
+                message=f"{succeeded} of {len(items)} withdrawals created",
+                data=items,
+            )
+
+        except ValidationError as e:
+            logger.error("Withdraw batch rejected", error=str(e))
+            return ErrorResponse(status="error", message=str(e))
+
+        except Exception as e:
+            logger.error("Failed to create withdraw batch", error=str(e))
+            return ErrorResponse(status="error", message="Failed to create withdraw batch")
+
     async def update_withdraw(
         self, input: UpdateWithdrawRequest
     ) -> Union[ApiResponse[Optional[WithdrawResponse]], ErrorResponse]:
@@ -219,61 +306,51 @@ class WithdrawService(IWithdrawService):
                 input.withdraw_id
             )
             if not withdraw_record:
-                logger.error(f"Withdraw with id {input.withdraw_id} not found")
+                logger.error("Withdraw not found", withdraw_id=input.withdraw_id)
                 raise NotFoundError(f"Withdraw with id {input.withdraw_id} not found")
 
-            saldo = await self.saldo_repository.find_by_user_id(input.user_id)
-
-            if not saldo:
-                logger.error(f"Saldo with user_id {input.user_id} not found")
-                raise NotFoundError(f"Saldo with user_id {input.user_id} not found")
-
-            new_total_balance = saldo.total_balance - input.withdraw_amount
-
-            if new_total_balance < 0:
-                logger.error(
-                    f"Insufficient balance for user_id {input.user_id}. "
-                    f"Attempted withdrawal: {input.withdraw_amount}"
-                )
-                raise ValidationError("Insufficient balance")
-
             try:
                 updated_withdraw = await self.withdraw_repository.update(input)
             except Exception as e:
-                await self.saldo_repository.update_balance(
-                    input=UpdateSaldoBalanceRequest(
-                        user_id=input.user_id,
-                        total_balance=saldo.total_balance,
-                    )
-                )
-                logger.error(
-                    f"Rollback: Saldo reverted due to withdraw update failure: {e}"
-                )
+                # Nothing has touched the saldo yet; the unit of work rolls the rest back
+                logger.error("Failed to update withdraw", error=str(e))
                 return ErrorResponse(
                     status="error",
-                    message=f"Rollback: Saldo reverted due to withdraw update failure",
+                    message=f"Failed to update withdraw",
                 )
 
             try:
+                # The balance check and the debit are a single conditional UPDATE
                 await self.saldo_repository.update_saldo_withdraw(
                     input=UpdateSaldoWithdraw(
                         user_id=input.user_id,
                         withdraw_amount=input.withdraw_amount,
                         withdraw_time=datetime.utcnow(),
-                        total_balance=new_total_balance,
                     )
                 )
             except Exception as e:
                 logger.error(
-                    f"Failed to update saldo balance after withdrawal update: {e}"
+                    "Failed to update saldo balance after withdrawal update", error=str(e)
                 )
                 return ErrorResponse(
                     status="error",
                     message=f"Failed to update saldo balance after withdrawal update",
                 )
 
+            entries = CreateLedgerEntryRequest.between(
+                f"withdraw:{input.withdraw_id}",
+                "adjustment",
+                input.user_id,
+                None,
+                input.withdraw_amount,
+            )
+            await self.ledger_repository.record(entries)
+            await self.outbox_repository.add(
+                CreateOutboxEventRequest.movements("withdraw.updated", entries)
+            )
+
             logger.info(
-                f"Withdraw updated successfully for withdraw_id {input.withdraw_id}"
+                "Withdraw updated successfully", withdraw_id=input.withdraw_id
             )
 
             return ApiResponse(
@@ -283,7 +360,7 @@ class WithdrawService(IWithdrawService):
             )
         except Exception as e:
             logger.error(
-                f"Unexpected error while updating withdraw for withdraw_id {input.withdraw_id}: {str(e)}"
+                "Unexpected error while updating withdraw", withdraw_id=input.withdraw_id, error=str(e)
             )
             return ErrorResponse(
                 status="error",
@@ -295,14 +372,14 @@ class WithdrawService(IWithdrawService):
             existing_withdraw = await self.withdraw_repository.find_by_id(id)
 
             if not existing_withdraw:
-                logger.error(f"Withdraw with id {id} not found")
+                logger.error("Withdraw not found", id=id)
                 raise NotFoundError(f"Withdraw with id {id} not found")
 
             try:
                 await self.withdraw_repository.delete(id)
-                logger.info(f"Withdraw deleted successfully for id: {id}")
+                logger.info("Withdraw deleted successfully", id=id)
             except Exception as e:
-                logger.error(f"Error deleting withdraw with id {id}: {e}")
+                logger.error("Error deleting withdraw", id=id, error=str(e))
                 return ErrorResponse(
                     status="error", message=f"Error deleting withdraw with id {id}"
                 )
@@ -0,0 +1,62 @@
+import os
+import time
+from typing import List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message
+
+REQUESTS = int(os.environ.get("BENCHMARK_REQUESTS", 20_000))
+
+
+async def latencies(
+    app: ASGIApp,
+    path: str = "/noop",
+    requests: int = REQUESTS,
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> List[float]:
+    """
+    Send requests GETs to app one after the other, straight through ASGI, returning each one's latency in seconds.
+
+    No client or server sits in between, so the numbers are the app's own cost.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"user-agent", b"benchmark"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            assert message["status"] < 400, f"GET {path} answered {message['status']}"
+
+    timings = []
+    for _ in range(requests):
+        sent = time.perf_counter()
+        await app(dict(scope, state={}), receive, send)
+        timings.append(time.perf_counter() - sent)
+    return timings
+
+
+async def drive(
+    app: ASGIApp,
+    path: str = "/noop",
+    requests: int = REQUESTS,
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> Tuple[float, float]:
+    """
+    Like latencies, but summed up as requests/sec and p99 latency in ms.
+    """
+    timings = await latencies(app, path, requests, headers)
+    p99 = sorted(timings)[int(len(timings) * 0.99)]
+    return len(timings) / sum(timings), p99 * 1000
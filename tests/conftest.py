@@ -0,0 +1,142 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, List
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, text
+
+# The app reads its settings from the environment on import; the database comes
+# from POSTGRES_* (or .env), and tests are skipped when it cannot be reached
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "1000000")
+os.environ.setdefault("RATE_LIMIT_USER_REQUESTS", "1000000")
+
+from core.container import Container, container  # noqa: E402
+from core.settings.app import AppSettings  # noqa: E402
+from infrastructure.models.main import Base, Saldo, User  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_schema_created = False
+
+
+def migrate(connection, revision: str = "head", downgrade: bool = False) -> None:
+    """
+    Run the alembic migrations on the given sync connection.
+    """
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "payment_gateway_clean/infrastructure/migrations"))
+    config.attributes["connection"] = connection
+    (command.downgrade if downgrade else command.upgrade)(config, revision)
+
+
+def _reset_schema(connection) -> None:
+    # The schema comes from the migrations, so tests see what production runs on
+    global _schema_created
+    if not _schema_created:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+        migrate(connection)
+        _schema_created = True
+        return
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+@pytest.fixture
+async def app_container(request) -> AsyncIterator[Container]:
+    """
+    The app's container, rebuilt for the test on an emptied database.
+
+    Settings can be overridden with @pytest.mark.settings(name=value, ...).
+    """
+    marker = request.node.get_closest_marker("settings")
+    settings = AppSettings(**(marker.kwargs if marker else {}))
+    container.__init__(settings)
+    try:
+        async with container._engine.begin() as connection:
+            await connection.run_sync(_reset_schema)
+    except (OSError, ConnectionError) as e:
+        await container.close()
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+
+    yield container
+    await container.close()
+
+
+@pytest.fixture
+async def client(app_container: Container) -> AsyncIterator[httpx.AsyncClient]:
+    from app import app
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def auth_headers(app_container: Container) -> Callable[[int], dict]:
+    def headers(user_id: int) -> dict:
+        return {"Authorization": f"Bearer {app_container.get_jwt().generate_token(user_id)}"}
+
+    return headers
+
+
+@pytest.fixture
+def create_users(app_container: Container) -> Callable:
+    """
+    Insert users 1..count, each with a saldo of balance.
+    """
+
+    async def create(count: int, balance: int = 0) -> List[int]:
+        now = datetime.utcnow()
+        user_ids = list(range(1, count + 1))
+        async with app_container.unit_of_work() as session:
+            await session.execute(
+                insert(User),
+                [
+                    {
+                        "user_id": user_id,
+                        "firstname": "Test",
+                        "lastname": f"User {user_id}",
+                        "email": f"user{user_id}@example.com",
+                        "password": "not-a-hash",
+                        "noc_transfer": str(user_id),
+                    }
+                    for user_id in user_ids
+                ],
+            )
+            await session.execute(
+                insert(Saldo),
+                [
+                    {
+                        "user_id": user_id,
+                        "total_balance": balance,
+                        "withdraw_time": now,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for user_id in user_ids
+                ],
+            )
+            await session.execute(text(f"SELECT setval('users_user_id_seq', {count})"))
+        return user_ids
+
+    return create
+
+
+@pytest.fixture
+def balance_of(app_container: Container) -> Callable:
+    async def balance(user_id: int) -> int:
+        async with app_container.unit_of_work() as session:
+            result = await session.execute(
+                text("SELECT total_balance FROM saldo WHERE user_id = :user_id"),
+                {"user_id": user_id},
+            )
+            return result.scalar_one()
+
+    return balance
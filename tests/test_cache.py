@@ -0,0 +1,198 @@
+import pytest
+
+from core import cache as cache_module
+from core.cache import LRUCache, UserScopedCache
+from infrastructure.repository.user_cache import CachedUserRepository
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache(max_size=10, ttl=30)
+    cache.set("a", 1)
+
+    clock.now += 29
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.peek("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_peek_does_not_refresh_an_entry():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 0
+
+
+def test_zero_max_size_disables_the_cache():
+    cache = LRUCache(max_size=0, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 0,
+        "max_size": 0,
+        "ttl_seconds": 60,
+        "hits": 0,
+        "misses": 1,
+        "evictions": 0,
+        "hit_ratio": 0.0,
+    }
+
+
+def test_hit_ratio_counts_every_lookup():
+    cache = LRUCache(max_size=10, ttl=60)
+    assert cache.stats()["hit_ratio"] is None
+
+    cache.set("a", 1)
+    for key in ("a", "a", "a", "b"):
+        cache.get(key)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (3, 1, 0.75)
+
+
+def test_invalidated_key_refuses_values_loaded_before():
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+
+    token = cache.token()
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    # Loaded before the invalidation: may be the old value
+    cache.set("a", 1, token)
+    assert cache.get("a") is None
+    # Other keys are not affected
+    cache.set("b", 2, token)
+    assert cache.get("b") == 2
+    # Loaded after it
+    cache.set("a", 3, cache.token())
+    assert cache.get("a") == 3
+
+
+def test_forgotten_invalidations_refuse_older_tokens():
+    cache = LRUCache(max_size=2, ttl=60)
+    token = cache.token()
+    for key in ("a", "b", "c"):
+        cache.invalidate(key)
+
+    # The stamp for "a" is gone, so any value loaded before it is refused
+    cache.set("a", 1, token)
+    cache.set("z", 1, token)
+    assert (cache.get("a"), cache.get("z")) == (None, None)
+    cache.set("a", 1, cache.token())
+    assert cache.get("a") == 1
+
+
+class FakeSession:
+    """
+    Stands in for an AsyncSession: UserScopedCache only hooks its after_commit event.
+    """
+
+    def __init__(self, listeners):
+        self.sync_session = object()
+        self.listeners = listeners
+
+    def commit(self):
+        for listener in self.listeners.pop(self.sync_session, []):
+            listener(None)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    listeners = {}
+
+    def listen(target, name, fn, once=False):
+        assert (name, once) == ("after_commit", True)
+        listeners.setdefault(target, []).append(fn)
+
+    monkeypatch.setattr(cache_module.event, "listen", listen)
+    return FakeSession(listeners)
+
+
+def test_user_scoped_invalidation_drops_every_variant(session):
+    cache = UserScopedCache(max_size=10, ttl=60)
+    cache.set(1, (30, 5), "summary-30")
+    cache.set(1, (7, 5), "summary-7")
+    cache.set(2, (30, 5), "other")
+
+    cache.invalidate(session, [1, None])
+
+    assert cache.get(1, (30, 5)) is None
+    assert cache.get(1, (7, 5)) is None
+    assert cache.get(2, (30, 5)) == "other"
+
+
+def test_read_racing_a_commit_cannot_restore_the_old_value(session):
+    cache = UserScopedCache(max_size=10, ttl=60)
+
+    # A reader misses and starts loading the old row
+    token = cache.token()
+    # A writer changes the user and commits before the reader is done
+    cache.invalidate(session, [1])
+    session.commit()
+    cache.set(1, "key", "old", token)
+
+    assert cache.get(1, "key") is None
+
+
+def test_read_that_lands_before_the_commit_is_dropped_on_commit(session):
+    cache = UserScopedCache(max_size=10, ttl=60)
+
+    cache.invalidate(session, [1])
+    # Started after the writer's own invalidation, but still sees the old row
+    cache.set(1, "key", "old", cache.token())
+    assert cache.get(1, "key") == "old"
+    session.commit()
+
+    assert cache.get(1, "key") is None
+
+
+async def test_cached_user_repository_does_not_cache_a_row_read_across_an_update(session):
+    class Users:
+        async def find_by_id(self, user_id):
+            # The update commits while this read is in flight
+            repository._invalidate(user_id)
+            session.commit()
+            return "old"
+
+    cache = LRUCache(max_size=10, ttl=60)
+    repository = CachedUserRepository(Users(), cache, session)
+
+    assert await repository.find_by_id(1) == "old"
+    assert cache.get(("profile", 1)) is None
+    assert cache.get(("exists", 1)) is None
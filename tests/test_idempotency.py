@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+
+async def _topup(client, auth_headers, key: str):
+    return await client.post(
+        "/api/topup/",
+        json={"user_id": 1, "topup_no": "T-1", "topup_amount": 100, "topup_method": "bca"},
+        headers={**auth_headers(1), "Idempotency-Key": key},
+    )
+
+
+async def test_repeated_key_replays_the_first_response(client, auth_headers, create_users, balance_of):
+    await create_users(1, balance=0)
+
+    first = await _topup(client, auth_headers, "K-1")
+    second = await _topup(client, auth_headers, "K-1")
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    assert await balance_of(1) == 100
+
+
+async def test_waiters_wake_after_the_response_commits(app_container):
+    store = app_container.idempotency
+    assert await store.begin("key", "body") is None
+
+    async with app_container.unit_of_work() as session:
+        await session.execute(text("SELECT 1"))
+        await store.complete(session, "key", "body", 200, '{"data": 1}')
+        await store.finish(session, "key", completed=True)
+        waiter = asyncio.create_task(store.begin("key", "body"))
+        await asyncio.sleep(0.1)
+
+        # The request's teardown is over but its transaction is not committed yet
+        assert not waiter.done()
+
+    stored = await asyncio.wait_for(waiter, 1)
+    assert (stored.status_code, stored.body) == (200, '{"data": 1}')
+
+
+async def test_rolled_back_request_releases_its_key(app_container):
+    store = app_container.idempotency
+    assert await store.begin("key", "body") is None
+    waiter = asyncio.create_task(store.begin("key", "body"))
+
+    with pytest.raises(RuntimeError):
+        async with app_container.unit_of_work() as session:
+            await store.complete(session, "key", "body", 200, '{"data": 1}')
+            await store.finish(session, "key", completed=True)
+            raise RuntimeError("transfer failed")
+
+    # The retry claims the released key instead of replaying a response that never committed
+    assert await asyncio.wait_for(waiter, 1) is None
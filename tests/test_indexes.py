@@ -0,0 +1,103 @@
+from typing import Awaitable, Callable, List, Tuple
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _plan(app_container, table: str, call: Callable[[AsyncSession], Awaitable]) -> str:
+    """
+    EXPLAIN the last query on table that call sends, with its actual parameters.
+
+    Sequential scans are disabled so that, on a test-sized table, the planner
+    picks an index whenever the query can use one.
+    """
+    statements: List[Tuple[str, tuple]] = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = app_container._engine.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        async with app_container.unit_of_work() as session:
+            await call(session)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = [query for query in statements if f"FROM {table}" in query[0]][-1]
+    async with app_container._engine.connect() as connection:
+        await connection.execute(text("SET enable_seqscan = off"))
+        result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in result)
+
+
+@pytest.fixture
+async def history(app_container, create_users) -> None:
+    await create_users(3, balance=1000)
+    async with app_container.unit_of_work() as session:
+        for statement in (
+            """
+            INSERT INTO topups (user_id, topup_no, topup_amount, topup_method, topup_time)
+            SELECT i % 3 + 1, 'T-' || i, 100, 'bca', now() FROM generate_series(1, 300) AS i
+            """,
+            """
+            INSERT INTO transfers (transfer_from, transfer_to, transfer_amount, transfer_time)
+            SELECT i % 3 + 1, (i + 1) % 3 + 1, 100, now() FROM generate_series(1, 300) AS i
+            """,
+            """
+            INSERT INTO withdraws (user_id, withdraw_amount, withdraw_time)
+            SELECT i % 3 + 1, 100, now() FROM generate_series(1, 300) AS i
+            """,
+        ):
+            await session.execute(text(statement))
+    async with app_container.unit_of_work() as session:
+        await session.execute(text("ANALYZE"))
+
+
+async def test_transfers_by_user_scan_both_side_indexes(app_container, history):
+    async def call(session):
+        await (await app_container.transfer_repository(session)).find_by_users(1)
+
+    plan = await _plan(app_container, "transfers", call)
+
+    assert "Seq Scan" not in plan
+    assert "ix_transfers_transfer_from_created_at" in plan
+    assert "ix_transfers_transfer_to_created_at" in plan
+
+
+@pytest.mark.parametrize(
+    "repository, table, index",
+    [
+        ("topup_repository", "topups", "ix_topups_user_id_created_at"),
+        ("withdraw_repository", "withdraws", "ix_withdraws_user_id_created_at"),
+    ],
+)
+async def test_movements_by_user_use_user_index(app_container, history, repository, table, index):
+    async def call(session):
+        await (await getattr(app_container, repository)(session)).find_by_users(1)
+
+    plan = await _plan(app_container, table, call)
+
+    assert f"Seq Scan on {table}" not in plan
+    assert index in plan
+
+
+async def test_saldo_by_user_uses_unique_index(app_container, history):
+    async def call(session):
+        await (await app_container.saldo_repository(session)).find_by_user_id(1)
+
+    plan = await _plan(app_container, "saldo", call)
+
+    assert "Seq Scan on saldo" not in plan
+    assert "ix_saldo_user_id" in plan
+
+
+async def test_user_by_email_uses_unique_index(app_container, history):
+    async def call(session):
+        await (await app_container.user_repository(session)).find_by_email("user1@example.com")
+
+    plan = await _plan(app_container, "users", call)
+
+    assert "Seq Scan on users" not in plan
+    assert "Index Scan using users_email_key" in plan
@@ -0,0 +1,160 @@
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+import jwt as pyjwt
+import pytest
+from jose import jwt as jose_jwt
+
+from core.errors import TokenExpiredError, TokenValidationError
+from core.security import jwt as jwt_module
+from core.security.jwt import JwtConfig
+
+SECRET = "test-secret"
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache's view of time moves; the JWT libraries keep the real clock
+    monkeypatch.setattr(jwt_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+def _token(user_id: int = 1, expires_in: float = 3600, secret: str = SECRET, **headers) -> str:
+    now = time.time()
+    return pyjwt.encode(
+        {"user_id": user_id, "exp": now + expires_in, "iat": now}, secret, algorithm="HS256", headers=headers or None
+    )
+
+
+def _counting(config: JwtConfig) -> list:
+    """
+    Count the signature checks behind the cache.
+    """
+    calls = []
+    decode = config._decode
+
+    def counted(token):
+        calls.append(token)
+        return decode(token)
+
+    config._decode = counted
+    return calls
+
+
+def test_cached_token_still_expires_at_exp(clock):
+    config = JwtConfig(SECRET, 60, cache_ttl=300)
+    token = _token(expires_in=30)
+    clock.now = time.time()
+
+    assert config.verify_token(token) == 1
+    clock.now += 29
+    assert config.verify_token(token) == 1
+
+    clock.now += 2
+    with pytest.raises(TokenExpiredError):
+        config.verify_token(token)
+
+
+@pytest.mark.parametrize("expires_in, ttl, lifetime", [(3600, 10, 10), (5, 300, 5)])
+def test_cache_entry_never_outlives_exp_or_ttl(clock, expires_in, ttl, lifetime):
+    config = JwtConfig(SECRET, 60, cache_ttl=ttl)
+    calls = _counting(config)
+    token = _token(expires_in=expires_in)
+    clock.now = time.time()
+
+    config.verify_token(token)
+    (entry,) = config._cache.values()
+    assert entry[1] <= clock.now + lifetime
+    clock.now += lifetime - 1
+    config.verify_token(token)
+    assert len(calls) == 1
+
+    clock.now += 2
+    try:
+        config.verify_token(token)
+    except TokenExpiredError:
+        pass
+    # Past min(exp, ttl) the token is decoded again
+    assert len(calls) == 2
+
+
+def _tamper_payload(token: str) -> str:
+    header, payload, signature = token.split(".")
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    claims["user_id"] = 2
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return ".".join([header, payload, signature])
+
+
+def _tamper_signature(token: str) -> str:
+    head, _, signature = token.rpartition(".")
+    middle = len(signature) // 2
+    flipped = "A" if signature[middle] != "A" else "B"
+    return f"{head}.{signature[:middle]}{flipped}{signature[middle + 1:]}"
+
+
+@pytest.mark.parametrize("tamper", [_tamper_payload, _tamper_signature])
+def test_tampered_token_is_not_served_from_the_cache(tamper):
+    config = JwtConfig(SECRET, 60)
+    token = _token()
+    assert config.verify_token(token) == 1
+
+    with pytest.raises(TokenValidationError):
+        config.verify_token(tamper(token))
+    assert config.verify_token(token) == 1
+
+
+def _none_token() -> str:
+    header = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').rstrip(b"=").decode()
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"user_id": 1, "exp": time.time() + 3600, "iat": time.time()}).encode()
+    ).rstrip(b"=").decode()
+    return f"{header}.{payload}."
+
+
+TOKENS = {
+    "pyjwt": lambda: JwtConfig(SECRET, 60, backend="pyjwt").generate_token(1),
+    "jose": lambda: JwtConfig(SECRET, 60, backend="jose").generate_token(1),
+    "with-kid": lambda: _token(kid="k1"),
+    "expired": lambda: _token(expires_in=-10),
+    "wrong-secret": lambda: _token(secret="other-secret"),
+    "payload-tampered": lambda: _tamper_payload(_token()),
+    "signature-tampered": lambda: _tamper_signature(_token()),
+    "alg-none": _none_token,
+    "hs512": lambda: pyjwt.encode({"user_id": 1, "exp": time.time() + 3600, "iat": time.time()}, SECRET, "HS512"),
+    "missing-claims": lambda: jose_jwt.encode({"exp": time.time() + 3600}, SECRET, algorithm="HS256"),
+    "garbage": lambda: "not.a.token",
+}
+
+
+def _outcome(config: JwtConfig, token: str):
+    try:
+        return config.verify_token(token)
+    except (TokenExpiredError, TokenValidationError) as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("name", TOKENS)
+def test_backends_accept_and_reject_the_same_tokens(name):
+    token = TOKENS[name]()
+    outcomes = {
+        backend: _outcome(JwtConfig(SECRET, 60, backend=backend, cache_size=0), token)
+        for backend in ("pyjwt", "jose")
+    }
+
+    assert outcomes["pyjwt"] == outcomes["jose"]
+    expected = 1 if name in ("pyjwt", "jose", "with-kid") else (
+        TokenExpiredError if name == "expired" else TokenValidationError
+    )
+    assert outcomes["pyjwt"] == expected
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from infrastructure.repository.ledger import UTC_CLOCK, LedgerRepository
+from infrastructure.repository.report import ReportRepository
+
+
+def _movement(kind: str, ref: int, user_id: int, amount: int):
+    """
+    The balanced entries of a topup (amount credited to the user) or a withdrawal (debited).
+    """
+    if kind == "withdraw":
+        amount = -amount
+    return [
+        CreateLedgerEntryRequest(txn_ref=f"{kind}:{ref}", user_id=user_id, amount=amount, entry_type=kind),
+        CreateLedgerEntryRequest(txn_ref=f"{kind}:{ref}", user_id=None, amount=-amount, entry_type=kind),
+    ]
+
+
+async def _record(app_container, entries) -> None:
+    async with app_container.unit_of_work() as session:
+        await LedgerRepository(session).record(entries)
+
+
+async def _clock(app_container) -> datetime:
+    async with app_container.unit_of_work() as session:
+        return (await session.execute(select(UTC_CLOCK))).scalar_one()
+
+
+async def _balance_at(app_container, user_id: int, at: datetime) -> int:
+    async with app_container.unit_of_work() as session:
+        return await LedgerRepository(session).balance_at(user_id, at)
+
+
+async def test_balance_at_reads_checkpoints_and_later_entries(app_container, create_users):
+    await create_users(2)
+    await _record(app_container, _movement("topup", 1, 1, 1000))
+    await _record(app_container, _movement("topup", 2, 2, 500))
+    first = await _clock(app_container)
+
+    assert await app_container.create_ledger_checkpoints() == 2
+    # Nothing new since, so nobody needs a new checkpoint
+    assert await app_container.create_ledger_checkpoints() == 0
+
+    await _record(app_container, _movement("withdraw", 1, 1, 300))
+    second = await _clock(app_container)
+    assert await app_container.create_ledger_checkpoints() == 1
+    await _record(app_container, _movement("withdraw", 2, 1, 200))
+    now = await _clock(app_container)
+
+    assert await _balance_at(app_container, 1, first) == 1000
+    assert await _balance_at(app_container, 1, second) == 700
+    assert await _balance_at(app_container, 1, now) == 500
+    assert await _balance_at(app_container, 2, now) == 500
+
+
+async def test_late_committing_entries_are_not_skipped(client, auth_headers, app_container, create_users):
+    """
+    A transaction posts entries, then stays open while checkpoints and rollups run.
+
+    Its entries are stamped before those runs, but commit after them, so a watermark
+    based on time or entry_id would pass them by for good.
+    """
+    await create_users(2)
+    await _record(app_container, _movement("topup", 1, 1, 1000))
+
+    async with app_container.unit_of_work() as late:
+        await LedgerRepository(late).record(_movement("withdraw", 1, 1, 400))
+        started = (await late.execute(select(func.timezone("UTC", func.now())))).scalar_one()
+        await _record(app_container, _movement("withdraw", 2, 2, 100))
+
+        # Only the first withdrawal is behind every open transaction; user 2's came
+        # after the open one started writing, so it waits for it too
+        assert await app_container.create_ledger_checkpoints() == 1
+        assert await app_container.roll_up_reports() == 2
+        async with app_container.unit_of_work() as session:
+            rolled_up_to = await ReportRepository(session).find_rolled_up_to()
+        # The open transaction may still post entries stamped with its start time
+        assert rolled_up_to <= started
+
+    now = await _clock(app_container)
+    assert await _balance_at(app_container, 1, now) == 600
+
+    assert await app_container.create_ledger_checkpoints() == 2
+    assert await app_container.roll_up_reports() == 4
+    assert await _balance_at(app_container, 1, now) == 600
+
+    response = await client.get(
+        "/api/reports/withdraw",
+        params={"group_by": "user", "start": "2020-01-01T00:00:00", "end": "2100-01-01T00:00:00"},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200, response.text
+    rows = response.json()["data"]["rows"]
+    assert [(row["user_id"], row["amount"], row["count"]) for row in rows] == [(1, 400, 1), (2, 100, 1)]
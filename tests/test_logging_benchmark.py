@@ -0,0 +1,77 @@
+import logging
+import os
+import sys
+import time
+
+import pytest
+import structlog
+
+from core.config import get_app_settings
+from core.logging import configure_logger
+from core.settings.app import AppSettings
+from domain.dtos.request.transfer import CreateTransferRequest
+from tests.benchmarks import REQUESTS
+
+pytestmark = pytest.mark.benchmark
+
+TRANSFER = CreateTransferRequest(transfer_from=1, transfer_to=2, transfer_amount=300)
+
+
+def eager_request(logger) -> None:
+    # How requests logged before: f-strings and model dumps, built whether or not the level lets them through
+    logger.info(f"📤 Creating transfer: {TRANSFER.model_dump()}")
+    logger.info(f"Creating transfer from {TRANSFER.transfer_from} to {TRANSFER.transfer_to}")
+    logger.debug(f"Checking balance of user {TRANSFER.transfer_from}: {TRANSFER.model_dump()}")
+    logger.info(f"Transfer completed with id {1}")
+    logger.info(
+        "📝 HTTP Request", method="POST", path="/api/transfer/", status=200,
+        duration=f"{1.234:.2f}ms", ip="127.0.0.1", user_agent="benchmark", user_id=1, username=None,
+    )
+
+
+def lazy_request(logger) -> None:
+    # How requests log now: constant events with key/values, the model dumped only if the event is kept
+    logger.info("📤 Creating transfer", input=TRANSFER)
+    logger.info("Creating transfer", transfer_from=TRANSFER.transfer_from, transfer_to=TRANSFER.transfer_to)
+    logger.debug("Checking balance", user_id=TRANSFER.transfer_from, input=TRANSFER)
+    logger.info("Transfer completed", transfer_id=1)
+    logger.info(
+        "📝 HTTP Request", method="POST", path="/api/transfer/", status=200,
+        duration_ms=1.23, ip="127.0.0.1", user_agent="benchmark", user_id=1, username=None,
+    )
+
+
+def _per_request(request, **config) -> float:
+    """
+    Microseconds the request's logging costs the calling thread under the given configure_logger options.
+    """
+    configure_logger(**config)
+    logger = structlog.get_logger()
+    for _ in range(REQUESTS // 10):
+        request(logger)
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        request(logger)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def test_high_throughput_logging_is_cheapest(monkeypatch):
+    # Measure the logging at production's level, not the terminal
+    monkeypatch.setattr("core.logging.get_app_settings", lambda: AppSettings(logging_level=logging.INFO))
+    with open(os.devnull, "w") as devnull:
+        monkeypatch.setattr(sys, "stdout", devnull)
+        monkeypatch.setattr(sys, "stderr", devnull)
+        costs = {
+            "eager, stdlib console": _per_request(eager_request),
+            "lazy, stdlib console": _per_request(lazy_request),
+            "lazy, stdlib JSON": _per_request(lazy_request, json_logs=True),
+            "lazy, high throughput": _per_request(lazy_request, high_throughput=True),
+        }
+    monkeypatch.undo()
+    settings = get_app_settings()
+    configure_logger(json_logs=settings.logging_json, high_throughput=settings.logging_high_throughput)
+
+    print("\nlogging per request: " + "; ".join(f"{name} {cost:.1f} µs" for name, cost in costs.items()))
+    high_throughput = costs.pop("lazy, high throughput")
+    assert high_throughput * 2 < min(costs.values())
@@ -0,0 +1,39 @@
+import re
+
+from core.metrics import REGISTRY
+
+
+def _sample(body: str, name: str, **labels: str) -> float:
+    selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{name}{{{re.escape(selector)}}} (\S+)$", body, re.MULTILINE)
+    return float(match.group(1)) if match else 0
+
+
+async def test_metrics_count_requests_and_statements(client, auth_headers, create_users):
+    await create_users(1, balance=1000)
+    before = (await client.get("/metrics")).text
+
+    response = await client.get("/api/saldo/user/1", headers=auth_headers(1))
+    assert response.status_code == 200, response.text
+    body = (await client.get("/metrics")).text
+
+    for name, labels in (
+        (
+            "http_request_duration_seconds_count",
+            {"method": "GET", "route": "/api/saldo/user/{user_id}", "status": "200"},
+        ),
+        ("db_query_duration_seconds_count", {"operation": "SaldoRepository.find_by_user_id"}),
+    ):
+        assert _sample(body, name, **labels) == _sample(before, name, **labels) + 1
+
+
+async def test_metrics_count_failed_statements(app_container):
+    before = _sample(REGISTRY.render(), "db_query_errors_total", operation="other")
+
+    async with app_container._engine.connect() as connection:
+        try:
+            await connection.exec_driver_sql("SELECT * FROM no_such_table")
+        except Exception:
+            pass
+
+    assert _sample(REGISTRY.render(), "db_query_errors_total", operation="other") == before + 1
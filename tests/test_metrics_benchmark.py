@@ -0,0 +1,59 @@
+import statistics
+
+import pytest
+
+from core.container import Container, container
+from core.settings.app import AppSettings
+from tests.benchmarks import REQUESTS, latencies
+
+pytestmark = pytest.mark.benchmark
+
+BLOCK = 50
+EPOCHS = 10
+MAX_OVERHEAD = 0.02
+
+
+async def test_metrics_overhead_is_below_two_percent(app_container, create_users, monkeypatch):
+    """
+    Time a balance lookup, which runs through the middleware, a repository and the database, with metrics on and off.
+
+    Each side gets its own app and container, and they take turns in short blocks
+    of requests, so drift in the database or the machine hits both alike. The
+    medians of the two sides' latencies are compared.
+    """
+    import app as app_module
+
+    await create_users(1, balance=1000)
+    headers = [(b"authorization", f"Bearer {container.get_jwt().generate_token(1)}".encode())]
+
+    # Routes reach the container through the module-level instance, so point it at each side in turn
+    fixture_state = container.__dict__
+    timings = {True: [], False: []}
+    blocks = max(REQUESTS // BLOCK // EPOCHS, 2)
+    for _ in range(EPOCHS):
+        # Fresh containers per epoch, so no side keeps a faster connection throughout
+        sides = []
+        for enabled in (True, False):
+            settings = AppSettings(metrics_enabled=enabled)
+            monkeypatch.setattr(app_module, "get_app_settings", lambda: settings)
+            sides.append((enabled, Container(settings), app_module.create_app()))
+        try:
+            for block in range(blocks + 1):
+                for enabled, side, app in sides if block % 2 else sides[::-1]:
+                    container.__dict__ = side.__dict__
+                    block_timings = await latencies(app, "/api/saldo/user/1", BLOCK, headers)
+                    # The first block opens connections and warms caches
+                    if block:
+                        timings[enabled].extend(block_timings)
+        finally:
+            container.__dict__ = fixture_state
+            for _, side, _ in sides:
+                await side.close()
+
+    on, off = statistics.median(timings[True]), statistics.median(timings[False])
+    overhead = on / off - 1
+    print(
+        f"\nbalance lookup: metrics off {off * 1000:.3f} ms, "
+        f"on {on * 1000:.3f} ms median, overhead {overhead:.2%}"
+    )
+    assert overhead < MAX_OVERHEAD
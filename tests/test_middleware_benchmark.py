@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from structlog import get_logger
+
+from api.middleware.logger import LoggerMiddleware
+from api.middleware.ratelimiter import RateLimitMiddleware
+from core.container import container
+from core.ratelimit.memory import InMemoryRateLimitBackend
+from core.settings.app import AppSettings
+from tests.benchmarks import drive
+
+pytestmark = pytest.mark.benchmark
+
+logger = get_logger()
+
+
+async def noop(request):
+    return PlainTextResponse("ok")
+
+
+class DispatchRateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    The same rate limit check behind BaseHTTPMiddleware, as the middleware was written before.
+    """
+
+    def __init__(self, app, backend, settings):
+        super().__init__(app)
+        self.limiter = RateLimitMiddleware(app, backend, settings, container.get_jwt())
+
+    async def dispatch(self, request, call_next):
+        identity, authenticated = self.limiter._identify(request.scope)
+        policy, limit = self.limiter._policy(request.url.path, authenticated)
+        result = await self.limiter.backend.hit(f"{policy}:{identity}", limit, self.limiter.window)
+        response = await call_next(request)
+        response.headers.update(self.limiter._headers(result))
+        return response
+
+
+class DispatchLoggerMiddleware(BaseHTTPMiddleware):
+    """
+    LoggerMiddleware behind BaseHTTPMiddleware, as it was written before.
+    """
+
+    async def dispatch(self, request, call_next):
+        start_time = time.perf_counter()
+        ip_address = (
+            request.headers.get("x-forwarded-for")
+            or request.headers.get("x-real-ip")
+            or (request.client.host if request.client else "127.0.0.1")
+        )
+        current_user = getattr(request.state, "current_user", None)
+
+        response = await call_next(request)
+
+        logger.info(
+            "📝 HTTP Request",
+            method=request.method,
+            path=request.url.path,
+            status=response.status_code,
+            duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+            ip=ip_address,
+            user_agent=request.headers.get("user-agent", "Unknown"),
+            user_id=getattr(current_user, "user_id", None),
+            username=getattr(current_user, "username", None),
+        )
+        return response
+
+
+async def test_asgi_middleware_beats_base_http_middleware():
+    settings = AppSettings()
+    routes = [Route("/noop", noop)]
+    before = Starlette(
+        routes=routes,
+        middleware=[
+            Middleware(DispatchRateLimitMiddleware, backend=InMemoryRateLimitBackend(), settings=settings),
+            Middleware(DispatchLoggerMiddleware),
+        ],
+    )
+    after = Starlette(
+        routes=routes,
+        middleware=[
+            Middleware(
+                RateLimitMiddleware,
+                backend=InMemoryRateLimitBackend(),
+                settings=settings,
+                jwt_config=container.get_jwt(),
+            ),
+            Middleware(LoggerMiddleware),
+        ],
+    )
+
+    before_rate, before_p99 = await drive(before)
+    after_rate, after_p99 = await drive(after)
+
+    print(
+        f"\nno-op route: BaseHTTPMiddleware {before_rate:,.0f} req/s, p99 {before_p99:.3f} ms; "
+        f"pure ASGI {after_rate:,.0f} req/s, p99 {after_p99:.3f} ms"
+    )
+    assert after_rate > before_rate
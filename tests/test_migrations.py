@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from tests.conftest import migrate
+
+# The last revision before the ledger existed
+BEFORE_LEDGER = "c7e3b1d94a25"
+
+# User 1 opened with 10500, sent 300 to user 2 and withdrew 200; user 2 opened
+# with 500, topped up 1000 and received the 300, and holds 500 of it in a shard
+SEED = [
+    """
+    INSERT INTO users (user_id, firstname, lastname, email, password, noc_transfer)
+    VALUES (1, 'Test', 'User 1', 'user1@example.com', 'not-a-hash', '1'),
+           (2, 'Test', 'User 2', 'user2@example.com', 'not-a-hash', '2')
+    """,
+    """
+    INSERT INTO saldo (user_id, total_balance, withdraw_amount, withdraw_time, created_at)
+    VALUES (1, 10000, 200, '2026-04-01', '2026-01-01'),
+           (2, 1300, 0, NULL, '2026-01-01')
+    """,
+    "INSERT INTO saldo_shards (user_id, shard_no, balance) VALUES (2, 0, 500)",
+    """
+    INSERT INTO topups (user_id, topup_no, topup_amount, topup_method, topup_time, created_at)
+    VALUES (2, 'T-1', 1000, 'bank', '2026-02-01', '2026-02-01')
+    """,
+    """
+    INSERT INTO transfers (transfer_from, transfer_to, transfer_amount, transfer_time, created_at)
+    VALUES (1, 2, 300, '2026-03-01', '2026-03-01')
+    """,
+    """
+    INSERT INTO withdraws (user_id, withdraw_amount, withdraw_time, created_at)
+    VALUES (1, 200, '2026-04-01', '2026-04-01')
+    """,
+]
+
+
+@pytest.fixture
+async def pre_ledger_history(app_container):
+    """
+    The SEED history written before the ledger existed, migrated to head.
+    """
+    async with app_container._engine.begin() as connection:
+        await connection.run_sync(migrate, BEFORE_LEDGER, True)
+    try:
+        async with app_container._engine.begin() as connection:
+            for statement in SEED:
+                await connection.execute(text(statement))
+    finally:
+        async with app_container._engine.begin() as connection:
+            await connection.run_sync(migrate)
+
+
+@pytest.mark.parametrize(
+    "at, balances",
+    [
+        ("2026-01-15T00:00:00", {1: 10500, 2: 500}),
+        ("2026-03-15T00:00:00", {1: 10200, 2: 1800}),
+        (datetime.utcnow().isoformat(), {1: 10000, 2: 1800}),
+    ],
+)
+async def test_ledger_migration_backfills_balances(client, auth_headers, pre_ledger_history, at, balances):
+    for user_id, balance in balances.items():
+        response = await client.get(
+            f"/api/saldo/user/{user_id}/at", params={"at": at}, headers=auth_headers(user_id)
+        )
+
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["balance"] == balance
+
+
+async def test_ledger_migration_backfills_balanced_entries(app_container, pre_ledger_history):
+    async with app_container._engine.connect() as connection:
+        result = await connection.execute(
+            text("SELECT txn_ref, SUM(amount) FROM ledger_entries GROUP BY txn_ref ORDER BY txn_ref")
+        )
+        totals = dict(result.all())
+
+    assert totals == {"saldo:1": 0, "saldo:2": 0, "topup:1": 0, "transfer:1": 0, "withdraw:1": 0}
+
+
+@pytest.mark.parametrize(
+    "kind, group_by, rows",
+    [
+        ("topup", "method", [{"method": "bank", "amount": 1000, "count": 1}]),
+        ("transfer", "user", [{"user_id": 1, "amount": 300, "count": 1}]),
+        ("withdraw", "day", [{"bucket": "2026-04-01T00:00:00", "amount": 200, "count": 1}]),
+    ],
+)
+async def test_report_migration_backfills_rollups(
+    client, auth_headers, app_container, pre_ledger_history, kind, group_by, rows
+):
+    response = await client.get(
+        f"/api/reports/{kind}",
+        params={"group_by": group_by, "start": "2026-01-01T00:00:00", "end": "2026-05-01T00:00:00"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert [{key: row[key] for key in expected} for row, expected in zip(data["rows"], rows)] == rows
+    assert len(data["rows"]) == len(rows)
+    assert data["as_of"] is not None
+
+    # The background job starts past the backfilled entries instead of counting them again
+    assert await app_container.roll_up_reports() == 0
@@ -0,0 +1,105 @@
+from typing import List
+
+import pytest
+from sqlalchemy import func, select
+
+from core.outbox.base import OutboxSink
+from core.outbox.relay import OutboxRelay
+from domain.dtos.record.outbox import OutboxEventRecordDTO
+from infrastructure.models.main import OutboxEvent
+from infrastructure.repository.outbox import OutboxRepository
+
+
+class FlakySink(OutboxSink):
+    """
+    Fails the first `failures` publishes, then records every batch it is given.
+    """
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.batches: List[List[OutboxEventRecordDTO]] = []
+
+    async def publish(self, events: List[OutboxEventRecordDTO]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("broker unavailable")
+        self.batches.append(events)
+
+
+async def _pending(app_container) -> int:
+    async with app_container.unit_of_work() as session:
+        result = await session.execute(select(func.count()).select_from(OutboxEvent))
+        return result.scalar_one()
+
+
+async def _topup(client, auth_headers, topup_no: str, amount: int) -> None:
+    response = await client.post(
+        "/api/topup/",
+        json={"user_id": 1, "topup_no": topup_no, "topup_amount": amount, "topup_method": "bca"},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.settings(outbox_sink="memory", outbox_batch_size=2)
+async def test_drain_publishes_committed_movements_in_order(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    for index, amount in enumerate((100, 200, 300), start=1):
+        await _topup(client, auth_headers, f"T-{index}", amount)
+    response = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 400},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200, response.text
+
+    relay = app_container.outbox_relay
+    queue = relay.sink.subscribe()
+    assert await relay.drain() == 4
+    assert await relay.drain() == 0
+
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert [(event.event_type, event.txn_ref) for event in events] == [
+        ("topup.created", "topup:1"),
+        ("topup.created", "topup:2"),
+        ("topup.created", "topup:3"),
+        ("transfer.created", "transfer:1"),
+    ]
+    assert events[-1].payload == {"from_user_id": 1, "to_user_id": 2, "amount": 400}
+    assert await _pending(app_container) == 0
+
+
+@pytest.mark.settings(outbox_sink="memory")
+async def test_rolled_back_movement_writes_no_event(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=100)
+
+    response = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code >= 400
+    assert await _pending(app_container) == 0
+    assert await app_container.outbox_relay.drain() == 0
+
+
+async def test_failed_publish_is_redelivered(client, auth_headers, create_users, app_container):
+    await create_users(1, balance=0)
+    for index, amount in enumerate((100, 200, 300), start=1):
+        await _topup(client, auth_headers, f"T-{index}", amount)
+    sink = FlakySink(failures=1)
+    relay = OutboxRelay(app_container.unit_of_work, OutboxRepository, sink, batch_size=10)
+
+    with pytest.raises(ConnectionError):
+        await relay.drain()
+
+    # The batch was taken and put back by the rollback, so nothing is lost
+    assert sink.batches == []
+    assert await _pending(app_container) == 3
+
+    assert await relay.drain() == 3
+    assert [[event.txn_ref for event in batch] for batch in sink.batches] == [
+        ["topup:1", "topup:2", "topup:3"]
+    ]
+    assert await _pending(app_container) == 0
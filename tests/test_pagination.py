@@ -0,0 +1,118 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from infrastructure.models.main import Topup, Transfer, Withdraw
+
+ROWS = 7
+
+
+async def _seed(app_container) -> None:
+    now = datetime.utcnow()
+    async with app_container.unit_of_work() as session:
+        await session.execute(
+            insert(Topup),
+            [
+                {"user_id": 1, "topup_no": f"T-{i}", "topup_amount": 50_000 + i, "topup_method": "bca",
+                 "topup_time": now - timedelta(minutes=i)}
+                for i in range(ROWS)
+            ],
+        )
+        await session.execute(
+            insert(Transfer),
+            [
+                {"transfer_from": 1 + i % 2, "transfer_to": 2 - i % 2, "transfer_amount": 100 + i,
+                 "transfer_time": now - timedelta(minutes=i)}
+                for i in range(ROWS)
+            ],
+        )
+        await session.execute(
+            insert(Withdraw),
+            [
+                {"user_id": 1, "withdraw_amount": 10_000 + i, "withdraw_time": now - timedelta(minutes=i)}
+                for i in range(ROWS)
+            ],
+        )
+
+
+RESOURCES = [
+    ("/api/topup/", "topup_id", ROWS),
+    ("/api/transfer/", "transfer_id", ROWS),
+    ("/api/withdraw/", "withdraw_id", ROWS),
+    ("/api/saldo/", "saldo_id", ROWS),
+]
+
+
+@pytest.fixture
+async def seeded(app_container, create_users):
+    await create_users(ROWS, balance=1000)
+    await _seed(app_container)
+
+
+@pytest.mark.parametrize("path, id_field, count", RESOURCES)
+async def test_cursor_pages_cover_every_row_once(client, auth_headers, seeded, path, id_field, count):
+    ids, cursors = [], []
+    params = {"limit": 3}
+    while True:
+        response = await client.get(path, params=params, headers=auth_headers(1))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        page = [item[id_field] for item in body["data"]]
+        assert len(page) <= 3
+        ids += page
+        cursors.append(body["next_cursor"])
+        if body["next_cursor"] is None:
+            break
+        # The cursor is the last id of the page
+        assert body["next_cursor"] == page[-1]
+        params["cursor"] = body["next_cursor"]
+
+    assert ids == list(range(1, count + 1))
+    assert cursors == [3, 6, None]
+
+
+@pytest.mark.parametrize("path, id_field, count", RESOURCES)
+async def test_stream_returns_every_row_after_the_cursor(
+    client, auth_headers, seeded, app_container, path, id_field, count
+):
+    response = await client.get(path, params={"stream": "true"}, headers=auth_headers(1))
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row[id_field] for row in rows] == list(range(1, count + 1))
+
+    # Pages and the stream serialize rows the same way
+    page = (await client.get(path, params={"limit": 2}, headers=auth_headers(1))).json()["data"]
+    assert rows[:2] == page
+
+    response = await client.get(path, params={"stream": "true", "cursor": 4}, headers=auth_headers(1))
+    assert [json.loads(line)[id_field] for line in response.text.splitlines()] == list(range(5, count + 1))
+
+    # The stream's own unit of work has given its connection back
+    assert app_container._engine.pool.checkedout() == 0
+
+
+async def test_stream_does_not_use_the_request_session(client, auth_headers, seeded, app_container, monkeypatch):
+    """
+    The request's session may be closed before or after the body is sent, depending
+    on the framework's teardown order, so the stream reads through a session of its own.
+    """
+    sessions = []
+    unit_of_work = app_container.unit_of_work
+
+    def tracking():
+        context = unit_of_work()
+        sessions.append(context)
+        return context
+
+    monkeypatch.setattr(app_container, "unit_of_work", tracking)
+
+    response = await client.get("/api/topup/", params={"stream": "true"}, headers=auth_headers(1))
+
+    assert response.status_code == 200, response.text
+    assert len(response.text.splitlines()) == ROWS
+    # One unit of work for the request's dependencies, another for the stream
+    assert len(sessions) == 2
@@ -0,0 +1,111 @@
+import os
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Tuple
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.dtos.record.topup import TopupRecordDTO
+from infrastructure.models.main import Topup
+from infrastructure.repository.topup import TopupRepository
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = int(os.environ.get("BENCHMARK_ROWS", 1_000_000))
+USERS = 10
+PAGE_SIZE = 10_000
+
+Loader = Callable[[AsyncSession], Awaitable[int]]
+
+
+async def _orm_find_all(session: AsyncSession) -> int:
+    # What every repository did before: load entities, then validate a DTO from each
+    rows, cursor = 0, 0
+    while True:
+        result = await session.execute(
+            select(Topup).where(Topup.topup_id > cursor).order_by(Topup.topup_id).limit(PAGE_SIZE)
+        )
+        page = [TopupRecordDTO.model_validate(topup) for topup in result.scalars().all()]
+        rows += len(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        cursor = page[-1].topup_id
+
+
+async def _projected_find_all(session: AsyncSession) -> int:
+    repository = TopupRepository(session)
+    rows, cursor = 0, None
+    while True:
+        page = await repository.find_all(PAGE_SIZE, cursor)
+        rows += len(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        cursor = page[-1].topup_id
+
+
+async def _orm_find_by_users(session: AsyncSession) -> int:
+    result = await session.execute(select(Topup).filter(Topup.user_id == 1))
+    return len([TopupRecordDTO.model_validate(topup) for topup in result.scalars().all()])
+
+
+async def _projected_find_by_users(session: AsyncSession) -> int:
+    return len(await TopupRepository(session).find_by_users(1))
+
+
+async def _measure(app_container, load: Loader) -> Tuple[float, int]:
+    """
+    Rows per second of a timed run, and the peak memory of a second, traced one.
+    """
+    async with app_container.unit_of_work() as session:
+        start = time.perf_counter()
+        rows = await load(session)
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        async with app_container.unit_of_work() as session:
+            await load(session)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rows / elapsed, peak
+
+
+@pytest.fixture
+async def topups(app_container, create_users) -> None:
+    await create_users(USERS)
+    async with app_container.unit_of_work() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO topups (user_id, topup_no, topup_amount, topup_method, topup_time, created_at, updated_at)
+                SELECT i % :users + 1, 'B-' || i, i % 1000 + 1, 'bca', now(), now(), now()
+                FROM generate_series(1, :rows) AS i
+                """
+            ),
+            {"users": USERS, "rows": ROWS},
+        )
+    async with app_container.unit_of_work() as session:
+        await session.execute(text("ANALYZE topups"))
+
+
+@pytest.mark.parametrize(
+    "name, orm, projected",
+    [
+        ("find_all", _orm_find_all, _projected_find_all),
+        ("find_by_users", _orm_find_by_users, _projected_find_by_users),
+    ],
+)
+async def test_projection_beats_orm_loads(app_container, topups, name, orm, projected):
+    orm_rate, orm_peak = await _measure(app_container, orm)
+    projected_rate, projected_peak = await _measure(app_container, projected)
+
+    print(
+        f"\n{name} over {ROWS} topups: "
+        f"ORM {orm_rate:,.0f} rows/s, {orm_peak / 2**20:.1f} MiB peak; "
+        f"projection {projected_rate:,.0f} rows/s, {projected_peak / 2**20:.1f} MiB peak"
+    )
+    assert projected_rate > orm_rate
+    assert projected_peak < orm_peak
@@ -0,0 +1,202 @@
+from types import SimpleNamespace
+
+import fakeredis
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from api.middleware.ratelimiter import RateLimitMiddleware
+from core.ratelimit import memory, redis
+from core.ratelimit.base import RateLimitBackend
+from core.ratelimit.memory import InMemoryRateLimitBackend
+from core.ratelimit.redis import RedisRateLimitBackend
+from core.security.jwt import JwtConfig
+from core.settings.app import AppSettings
+
+
+class Clock:
+    def __init__(self, now: float = 600.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the backends' view of time moves; the event loop keeps the real clock
+    monkeypatch.setattr(memory, "time", SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(redis, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+async def test_token_bucket_refills_evenly_over_the_window(clock):
+    backend = InMemoryRateLimitBackend()
+
+    results = [await backend.hit("key", 4, 60) for _ in range(5)]
+    assert [result.allowed for result in results] == [True, True, True, True, False]
+    assert [result.remaining for result in results] == [3, 2, 1, 0, 0]
+    # One token comes back every 15 seconds
+    assert results[-1].reset_after == pytest.approx(60)
+
+    clock.now += 15
+    assert (await backend.hit("key", 4, 60)).allowed
+    assert not (await backend.hit("key", 4, 60)).allowed
+
+    # A full window refills the bucket, but never past the limit
+    clock.now += 600
+    result = await backend.hit("key", 4, 60)
+    assert (result.allowed, result.remaining) == (True, 3)
+
+
+async def test_token_buckets_are_evicted(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        await backend.hit(key, 1, 60)
+
+    # Over max_keys, the least recently used bucket goes first
+    assert len(backend) == 2
+    assert (await backend.hit("a", 1, 60)).allowed
+    assert not (await backend.hit("c", 1, 60)).allowed
+
+    # Buckets idle for a full window are full again and are dropped
+    clock.now += 60
+    await backend.hit("d", 1, 60)
+    assert len(backend) == 1
+
+
+async def test_redis_sliding_window_weights_the_previous_window(clock):
+    client = fakeredis.FakeAsyncRedis()
+    backend = RedisRateLimitBackend(client, prefix="test")
+
+    # t=600 starts window 10 of 60 seconds
+    results = [await backend.hit("key", 2, 60) for _ in range(2)]
+    assert [(result.allowed, result.remaining) for result in results] == [(True, 1), (True, 0)]
+    assert results[0].reset_after == 60
+    assert 0 < await client.pttl("test:key:10") <= 120_000
+
+    # Half way through window 11, half of window 10 still counts: 2 * 0.5 + 1
+    clock.now = 690
+    result = await backend.hit("key", 2, 60)
+    assert (result.allowed, result.remaining, result.reset_after) == (True, 0, 30)
+    assert not (await backend.hit("key", 2, 60)).allowed
+
+    # Other keys have their own windows
+    assert (await backend.hit("other", 2, 60)).allowed
+
+    # Two windows later nothing of the burst is left
+    clock.now = 840
+    result = await backend.hit("key", 2, 60)
+    assert (result.allowed, result.remaining) == (True, 1)
+    await backend.close()
+
+
+class RecordingBackend(RateLimitBackend):
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.keys = []
+
+    async def hit(self, key, limit, window):
+        self.keys.append((key, limit))
+        return await self.backend.hit(key, limit, window)
+
+
+class FailingBackend(RateLimitBackend):
+    async def hit(self, key, limit, window):
+        raise ConnectionError("limiter store is down")
+
+
+JWT = JwtConfig("test-secret", 60)
+
+
+def _client(backend: RateLimitBackend) -> httpx.AsyncClient:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/topup/", ok), Route("/api/saldo/", ok)])
+    settings = AppSettings(
+        rate_limit_window_seconds=60,
+        rate_limit_requests=2,
+        rate_limit_user_requests=3,
+        rate_limit_routes={"/api": 10, "/api/topup": 1},
+    )
+    app = RateLimitMiddleware(app, backend=backend, settings=settings, jwt_config=JWT)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _bearer(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {JWT.generate_token(user_id)}"}
+
+
+async def test_limits_are_keyed_per_route_and_per_user(clock):
+    backend = RecordingBackend(InMemoryRateLimitBackend())
+    async with _client(backend) as client:
+        await client.get("/api/topup/", headers=_bearer(1))
+        await client.get("/api/topup/", headers=_bearer(2))
+        await client.get("/api/saldo/", headers=_bearer(1))
+        await client.get("/api/topup/")
+        await client.get("/api/topup/", headers={"Authorization": "Bearer not-a-token"})
+        await client.get("/health")
+        await client.get("/health", headers=_bearer(1))
+
+    assert backend.keys == [
+        # The longest matching route prefix wins
+        ("/api/topup:user:1", 1),
+        ("/api/topup:user:2", 1),
+        ("/api:user:1", 10),
+        # Without a valid token the client IP is used
+        ("/api/topup:ip:127.0.0.1", 1),
+        ("/api/topup:ip:127.0.0.1", 1),
+        # Outside every route the anonymous and user defaults apply
+        ("*:ip:127.0.0.1", 2),
+        ("*:user:1", 3),
+    ]
+
+
+async def test_over_the_limit_responses_are_429(clock):
+    async with _client(InMemoryRateLimitBackend()) as client:
+        allowed = await client.get("/api/topup/", headers=_bearer(1))
+        rejected = await client.get("/api/topup/", headers=_bearer(1))
+        other_user = await client.get("/api/topup/", headers=_bearer(2))
+
+    assert allowed.status_code == 200
+    assert allowed.text == "ok"
+    assert {name: allowed.headers[name] for name in allowed.headers if name.startswith("ratelimit-")} == {
+        "ratelimit-limit": "1",
+        "ratelimit-remaining": "0",
+        "ratelimit-reset": "60",
+        "ratelimit-policy": "1;w=60",
+    }
+
+    assert rejected.status_code == 429
+    assert rejected.json()["type"] == "RateLimitException"
+    assert rejected.headers["retry-after"] == "60"
+    assert rejected.headers["ratelimit-limit"] == "1"
+    assert rejected.headers["ratelimit-remaining"] == "0"
+
+    assert other_user.status_code == 200
+
+
+def _unreachable_server() -> fakeredis.FakeServer:
+    server = fakeredis.FakeServer()
+    server.connected = False
+    return server
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        FailingBackend(),
+        RedisRateLimitBackend(fakeredis.FakeAsyncRedis(server=_unreachable_server())),
+    ],
+    ids=["raising", "redis-disconnected"],
+)
+async def test_backend_errors_fail_open(backend):
+    async with _client(backend) as client:
+        responses = [await client.get("/api/topup/", headers=_bearer(1)) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert "ratelimit-limit" not in responses[0].headers
@@ -0,0 +1,55 @@
+import pytest
+
+PERIOD = {"start": "2020-01-01T00:00:00", "end": "2100-01-01T00:00:00"}
+
+
+async def _report(client, auth_headers, kind: str, group_by: str) -> dict:
+    response = await client.get(
+        f"/api/reports/{kind}", params={"group_by": group_by, **PERIOD}, headers=auth_headers(1)
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+@pytest.mark.settings(report_rollup_batch_size=3)
+async def test_roll_up_folds_each_ledger_entry_once(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    for topup_no, amount, method in (("T-1", 500, "bca"), ("T-2", 200, "ovo"), ("T-3", 100, "bca")):
+        response = await client.post(
+            "/api/topup/",
+            json={"user_id": 1, "topup_no": topup_no, "topup_amount": amount, "topup_method": method},
+            headers=auth_headers(1),
+        )
+        assert response.status_code == 200, response.text
+    response = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200, response.text
+
+    assert (await _report(client, auth_headers, "topup", "method"))["rows"] == []
+
+    # Four movements, two entries each, read in batches smaller than one run
+    assert await app_container.roll_up_reports() == 8
+    assert await app_container.roll_up_reports() == 0
+
+    topups = await _report(client, auth_headers, "topup", "method")
+    assert [(row["method"], row["amount"], row["count"]) for row in topups["rows"]] == [
+        ("bca", 600, 2),
+        ("ovo", 200, 1),
+    ]
+    assert topups["as_of"] is not None
+
+    transfers = await _report(client, auth_headers, "transfer", "user")
+    assert [(row["user_id"], row["amount"], row["count"]) for row in transfers["rows"]] == [(1, 300, 1)]
+    assert transfers["total_amount"] == 300
+
+
+async def test_report_rejects_method_grouping_for_transfers(client, auth_headers, app_container):
+    response = await client.get(
+        "/api/reports/transfer", params={"group_by": "method", **PERIOD}, headers=auth_headers(1)
+    )
+
+    assert response.status_code == 400
+    assert "method" in response.json()["detail"]
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.responses import ModelResponse
+from domain.dtos.response.api import PaginatedApiResponse
+from domain.dtos.response.topup import TopupResponse
+from domain.dtos.response.transfer import TransferResponse
+from domain.dtos.response.withdraw import WithdrawResponse
+
+
+def _page(model, next_cursor: Optional[int]):
+    times = [
+        datetime(2026, 10, 1, 10, 0, 0),
+        datetime(2026, 10, 1, 10, 0, 0, 123456),
+        datetime(2026, 10, 1, 10, 0, 0, 500, tzinfo=timezone.utc),
+        datetime(2026, 10, 1, 10, 0, 0, tzinfo=timezone(timedelta(hours=7))),
+    ]
+    if model is TopupResponse:
+        items = [
+            TopupResponse(topup_id=i, user_id=1, topup_amount=50_000 * i, topup_method="bca é", topup_time=at)
+            for i, at in enumerate(times, start=1)
+        ]
+    elif model is TransferResponse:
+        items = [
+            TransferResponse(transfer_id=i, transfer_from=1, transfer_to=2, tranfer_amount=i, tranfer_time=at)
+            for i, at in enumerate(times, start=1)
+        ]
+    else:
+        items = [
+            WithdrawResponse(withdraw_id=i, user_id=1, withdraw_amount=i, withdtaw_time=at)
+            for i, at in enumerate(times, start=1)
+        ]
+    return PaginatedApiResponse(
+        status="success", message="Page retrieved", data=items, next_cursor=next_cursor
+    )
+
+
+@pytest.mark.parametrize("model", [TopupResponse, TransferResponse, WithdrawResponse])
+@pytest.mark.parametrize("next_cursor", [4, None])
+async def test_model_response_matches_response_model_output(model, next_cursor):
+    page = _page(model, next_cursor)
+    app = FastAPI()
+
+    @app.get("/encoded", response_model=PaginatedApiResponse[List[model]])
+    async def encoded():
+        return page
+
+    @app.get("/direct", response_model=PaginatedApiResponse[List[model]])
+    async def direct():
+        return ModelResponse(page)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        expected = await client.get("/encoded")
+        actual = await client.get("/direct")
+
+    assert actual.status_code == expected.status_code == 200
+    assert actual.headers["content-type"] == expected.headers["content-type"]
+    assert actual.json() == expected.json()
+    assert actual.content == expected.content
+    assert actual.json()["next_cursor"] == next_cursor
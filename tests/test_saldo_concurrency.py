@@ -0,0 +1,87 @@
+import asyncio
+import random
+from datetime import datetime
+
+from core.errors import AppError
+from domain.dtos.request.saldo import UpdateSaldoDeltaRequest, UpdateSaldoWithdraw
+from domain.dtos.request.transfer import CreateTransferRequest
+
+USERS = 10
+INITIAL_BALANCE = 100_000
+MUTATIONS = 1000
+
+
+async def test_parallel_mutations_leave_exact_balances(app_container, create_users, balance_of):
+    """
+    Deltas, withdrawals, transfers and optimistic read-modify-writes race on the same rows.
+
+    Every mutation that commits must be reflected exactly once and every one that
+    fails must leave no trace, so the final balances equal the initial ones plus
+    the committed changes.
+    """
+    user_ids = await create_users(USERS, balance=INITIAL_BALANCE)
+    expected = {user_id: INITIAL_BALANCE for user_id in user_ids}
+    rng = random.Random(1234)
+
+    async def delta(user_id: int, amount: int) -> dict:
+        async with app_container.unit_of_work() as session:
+            repository = await app_container.saldo_repository(session)
+            await repository.apply_delta(
+                UpdateSaldoDeltaRequest(user_id=user_id, amount=amount, min_balance=0)
+            )
+        return {user_id: amount}
+
+    async def withdraw(user_id: int, amount: int) -> dict:
+        async with app_container.unit_of_work() as session:
+            repository = await app_container.saldo_repository(session)
+            await repository.update_saldo_withdraw(
+                UpdateSaldoWithdraw(user_id=user_id, withdraw_amount=amount, withdraw_time=datetime.utcnow())
+            )
+        return {user_id: -amount}
+
+    async def transfer(sender: int, receiver: int, amount: int) -> dict:
+        async with app_container.unit_of_work() as session:
+            repository = await app_container.transfer_repository(session)
+            await repository.execute_transfer(
+                CreateTransferRequest(transfer_from=sender, transfer_to=receiver, transfer_amount=amount)
+            )
+        return {sender: -amount, receiver: amount}
+
+    async def optimistic(user_id: int, amount: int) -> dict:
+        async with app_container.unit_of_work() as session:
+            repository = await app_container.saldo_repository(session)
+            await repository.update_balance_optimistic(
+                user_id, lambda balance: balance + amount, max_retries=50
+            )
+        return {user_id: amount}
+
+    def mutation():
+        kind = rng.randrange(4)
+        user_id = rng.choice(user_ids)
+        amount = rng.randint(1, 5_000)
+        if kind == 0:
+            return delta(user_id, amount if rng.random() < 0.5 else -amount)
+        if kind == 1:
+            return withdraw(user_id, amount)
+        if kind == 2:
+            receiver = rng.choice([other for other in user_ids if other != user_id])
+            return transfer(user_id, receiver, amount)
+        return optimistic(user_id, amount)
+
+    results = await asyncio.gather(
+        *(mutation() for _ in range(MUTATIONS)), return_exceptions=True
+    )
+
+    committed = 0
+    for result in results:
+        if isinstance(result, AppError):
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        committed += 1
+        for user_id, amount in result.items():
+            expected[user_id] += amount
+
+    assert committed > MUTATIONS // 2
+    for user_id in user_ids:
+        assert await balance_of(user_id) == expected[user_id]
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import random
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from core.errors import AppError
+from domain.dtos.request.saldo import UpdateSaldoWithdraw
+from infrastructure.models.main import SaldoShard
+
+HOT_USER = 1
+
+pytestmark = pytest.mark.settings(saldo_hot_user_ids=[HOT_USER], saldo_shard_count=4)
+
+
+async def _shards(app_container, user_id: int = HOT_USER) -> dict:
+    async with app_container.unit_of_work() as session:
+        result = await session.execute(
+            select(SaldoShard.shard_no, SaldoShard.balance).where(SaldoShard.user_id == user_id)
+        )
+        return dict(result.all())
+
+
+async def _credit(app_container, amount: int, user_id: int = HOT_USER) -> None:
+    async with app_container.unit_of_work() as session:
+        await app_container.saldo_shards(session).credit(user_id, amount)
+
+
+async def test_credits_spread_across_shards(app_container, create_users, balance_of):
+    await create_users(1, balance=1000)
+
+    for _ in range(40):
+        await _credit(app_container, 10)
+    # One transaction keeps crediting the same shard
+    async with app_container.unit_of_work() as session:
+        shards = app_container.saldo_shards(session)
+        for _ in range(5):
+            await shards.credit(HOT_USER, 100)
+
+    balances = await _shards(app_container)
+    assert len(balances) > 1
+    assert set(balances) <= set(range(4))
+    assert sum(balances.values()) == 900
+    assert any(balance >= 500 for balance in balances.values())
+    # Credits never touch the saldo row itself
+    assert await balance_of(HOT_USER) == 1000
+
+
+async def test_debit_larger_than_any_shard_compacts_first(
+    client, auth_headers, create_users, app_container, balance_of
+):
+    await create_users(2, balance=100)
+    async with app_container.unit_of_work() as session:
+        await session.execute(
+            insert(SaldoShard),
+            [{"user_id": HOT_USER, "shard_no": shard_no, "balance": 500} for shard_no in (0, 1)],
+        )
+
+    async def transfer(amount: int):
+        return await client.post(
+            "/api/transfer/",
+            json={"transfer_from": HOT_USER, "transfer_to": 2, "transfer_amount": amount},
+            headers=auth_headers(HOT_USER),
+        )
+
+    # Not even the saldo row and every shard together cover it
+    response = await transfer(1200)
+    assert response.status_code >= 400
+    assert await balance_of(HOT_USER) == 100
+    assert sum((await _shards(app_container)).values()) == 1000
+
+    # No single shard covers it, so the shards are folded into the saldo row first
+    response = await transfer(800)
+    assert response.status_code == 200, response.text
+    assert await balance_of(HOT_USER) == 300
+    assert sum((await _shards(app_container)).values()) == 0
+    assert await balance_of(2) == 900
+
+
+async def test_withdrawals_and_compaction_do_not_deadlock(app_container, create_users, balance_of):
+    """
+    Hot withdrawals, credits and compaction race on the same account.
+
+    They all lock the saldo row before the shards, so none of them may fail with a
+    deadlock, and the saldo row ends up holding exactly what was not withdrawn.
+    """
+    await create_users(1, balance=0)
+    for _ in range(8):
+        await _credit(app_container, 10_000)
+    rng = random.Random(1234)
+
+    async def withdraw(amount: int) -> int:
+        async with app_container.unit_of_work() as session:
+            repository = await app_container.saldo_repository(session)
+            await repository.update_saldo_withdraw(
+                UpdateSaldoWithdraw(user_id=HOT_USER, withdraw_amount=amount, withdraw_time=datetime.utcnow())
+            )
+        return -amount
+
+    async def credit(amount: int) -> int:
+        await _credit(app_container, amount)
+        return amount
+
+    async def compact() -> int:
+        await app_container.compact_saldo_shards()
+        return 0
+
+    def operation():
+        kind = rng.randrange(3)
+        if kind == 0:
+            return withdraw(rng.randint(1, 3_000))
+        if kind == 1:
+            return credit(rng.randint(1, 3_000))
+        return compact()
+
+    results = await asyncio.gather(*(operation() for _ in range(200)), return_exceptions=True)
+
+    expected = 80_000
+    for result in results:
+        if isinstance(result, AppError):
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        expected += result
+
+    await app_container.compact_saldo_shards()
+    assert await balance_of(HOT_USER) == expected
+    assert sum((await _shards(app_container)).values()) == 0
+
+
+async def test_every_saldo_read_includes_the_shards(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    for amount in (100, 200, 300):
+        await _credit(app_container, amount)
+    headers = auth_headers(HOT_USER)
+
+    responses = {
+        "page": await client.get("/api/saldo/", headers=headers),
+        "by_id": await client.get(f"/api/saldo/{HOT_USER}", headers=headers),
+        "by_user": await client.get(f"/api/saldo/user/{HOT_USER}", headers=headers),
+        "by_users": await client.get(f"/api/saldo/users/{HOT_USER}", headers=headers),
+        "stream": await client.get("/api/saldo/", params={"stream": "true"}, headers=headers),
+    }
+    for response in responses.values():
+        assert response.status_code == 200, response.text
+
+    balances = {
+        "page": responses["page"].json()["data"][0]["total_balance"],
+        "by_id": responses["by_id"].json()["data"]["total_balance"],
+        "by_user": responses["by_user"].json()["data"]["total_balance"],
+        "by_users": responses["by_users"].json()["data"][0]["total_balance"],
+        "stream": json.loads(responses["stream"].text.splitlines()[0])["total_balance"],
+    }
+    assert balances == dict.fromkeys(balances, 1600)
+    # The other user has no shards and reads as before
+    assert responses["page"].json()["data"][1]["total_balance"] == 1000
+
+
+@pytest.mark.parametrize(
+    "path, items",
+    [
+        (
+            "/api/transfer/batch",
+            [{"transfer_from": HOT_USER, "transfer_to": 2, "transfer_amount": 800}],
+        ),
+        (
+            "/api/withdraw/batch",
+            [{"user_id": HOT_USER, "withdraw_amount": 800, "withdraw_time": "2026-10-01T10:00:00"}],
+        ),
+    ],
+)
+async def test_batches_spend_the_sharded_balance(
+    client, auth_headers, create_users, app_container, balance_of, path, items
+):
+    await create_users(2, balance=100)
+    await _credit(app_container, 500)
+    await _credit(app_container, 500)
+
+    response = await client.post(path, json=items, headers=auth_headers(HOT_USER))
+
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()["data"]] == ["success"]
+    # The shards were folded into the saldo row, which now holds what is left
+    assert await balance_of(HOT_USER) == 300
+    assert sum((await _shards(app_container)).values()) == 0
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from domain.dtos.request.ledger import CreateLedgerEntryRequest
+from infrastructure.models.main import Topup, Transfer, Withdraw
+
+
+async def _seed(app_container) -> None:
+    """
+    User 1's movements: most inside the last 30 days, one topup and one withdrawal before.
+    """
+    now = datetime.utcnow()
+    old = now - timedelta(days=40)
+
+    def at(minutes_ago: int) -> datetime:
+        return now - timedelta(minutes=minutes_ago)
+
+    async with app_container.unit_of_work() as session:
+        await session.execute(
+            insert(Topup),
+            [
+                {"user_id": 1, "topup_no": "T-1", "topup_amount": 100, "topup_method": "bca",
+                 "topup_time": at(30), "created_at": at(30)},
+                {"user_id": 1, "topup_no": "T-2", "topup_amount": 200, "topup_method": "bri",
+                 "topup_time": at(20), "created_at": at(20)},
+                {"user_id": 1, "topup_no": "T-3", "topup_amount": 400, "topup_method": "bca",
+                 "topup_time": at(10), "created_at": at(10)},
+                {"user_id": 1, "topup_no": "T-0", "topup_amount": 999, "topup_method": "bca",
+                 "topup_time": old, "created_at": old},
+                {"user_id": 2, "topup_no": "T-9", "topup_amount": 777, "topup_method": "bca",
+                 "topup_time": at(5), "created_at": at(5)},
+            ],
+        )
+        await session.execute(
+            insert(Transfer),
+            [
+                {"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300,
+                 "transfer_time": at(25), "created_at": at(25)},
+                {"transfer_from": 2, "transfer_to": 1, "transfer_amount": 50,
+                 "transfer_time": at(15), "created_at": at(15)},
+                {"transfer_from": 2, "transfer_to": 1, "transfer_amount": 25,
+                 "transfer_time": at(12), "created_at": at(12)},
+            ],
+        )
+        await session.execute(
+            insert(Withdraw),
+            [
+                {"user_id": 1, "withdraw_amount": 150, "withdraw_time": at(5), "created_at": at(5)},
+                {"user_id": 1, "withdraw_amount": 888, "withdraw_time": old, "created_at": old},
+            ],
+        )
+
+
+async def _summary(client, auth_headers, user_id: int = 1, **params):
+    return await client.get(f"/api/users/{user_id}/summary", params=params, headers=auth_headers(1))
+
+
+async def test_summary_totals_and_recent_items(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    await _seed(app_container)
+
+    response = await _summary(client, auth_headers, limit=2)
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert data["user_id"] == 1
+    assert data["balance"] == 1000
+    # The movements from 40 days ago and user 2's own topup are not counted
+    assert data["topups"] == {"amount": 700, "count": 3}
+    assert data["transfers_in"] == {"amount": 75, "count": 2}
+    assert data["transfers_out"] == {"amount": 300, "count": 1}
+    assert data["withdraws"] == {"amount": 150, "count": 1}
+    # Newest first, at most limit of each
+    assert [item["topup_amount"] for item in data["recent_topups"]] == [400, 200]
+    assert [item["tranfer_amount"] for item in data["recent_transfers"]] == [25, 50]
+    assert [item["withdraw_amount"] for item in data["recent_withdraws"]] == [150, 888]
+
+    # A longer period takes the older movements in
+    data = (await _summary(client, auth_headers, days=60)).json()["data"]
+    assert data["topups"] == {"amount": 1699, "count": 4}
+    assert data["withdraws"] == {"amount": 1038, "count": 2}
+
+
+async def test_summary_is_cached_until_a_ledger_write(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    first = await _summary(client, auth_headers)
+    assert first.json()["data"]["topups"] == {"amount": 0, "count": 0}
+
+    # Rows written behind the repositories' back are not seen: the summary is cached
+    await _seed(app_container)
+    second = await _summary(client, auth_headers)
+    assert second.json() == first.json()
+    assert app_container._summary_cache.stats()["hits"] == 1
+
+    async with app_container.unit_of_work() as session:
+        ledger = await app_container.ledger_repository(session)
+        await ledger.record(CreateLedgerEntryRequest.between("transfer:99", "transfer", 2, 1, 10))
+
+    data = (await _summary(client, auth_headers)).json()["data"]
+    assert data["topups"] == {"amount": 700, "count": 3}
+
+
+async def test_summary_is_invalidated_by_a_delete(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    await _seed(app_container)
+    data = (await _summary(client, auth_headers)).json()["data"]
+    assert data["withdraws"] == {"amount": 150, "count": 1}
+    withdraw_id = data["recent_withdraws"][0]["withdraw_id"]
+
+    response = await client.delete(f"/api/withdraw/{withdraw_id}", headers=auth_headers(1))
+    assert response.status_code == 200, response.text
+
+    data = (await _summary(client, auth_headers)).json()["data"]
+    assert data["withdraws"] == {"amount": 0, "count": 0}
+    assert [item["withdraw_amount"] for item in data["recent_withdraws"]] == [888]
+
+
+async def test_summary_of_unknown_user_is_not_found(client, auth_headers, create_users):
+    await create_users(1)
+
+    response = await _summary(client, auth_headers, user_id=42)
+
+    assert response.status_code == 404
+    assert "42" in response.json()["detail"]
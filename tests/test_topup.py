@@ -0,0 +1,36 @@
+async def test_create_topup_credits_saldo(client, auth_headers, create_users, balance_of):
+    await create_users(1, balance=1000)
+
+    response = await client.post(
+        "/api/topup/",
+        json={"user_id": 1, "topup_no": "T-1", "topup_amount": 500, "topup_method": "bca"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert data["user_id"] == 1
+    assert data["topup_amount"] == 500
+    assert data["topup_method"] == "bca"
+    assert await balance_of(1) == 1500
+
+
+async def test_create_topup_batch_bumps_saldo_version(client, auth_headers, create_users, app_container):
+    await create_users(2, balance=0)
+
+    response = await client.post(
+        "/api/topup/batch",
+        json=[
+            {"user_id": 1, "topup_no": "B-1", "topup_amount": 100, "topup_method": "ovo"},
+            {"user_id": 1, "topup_no": "B-2", "topup_amount": 200, "topup_method": "ovo"},
+            {"user_id": 2, "topup_no": "B-3", "topup_amount": 300, "topup_method": "dana"},
+            {"user_id": 99, "topup_no": "B-4", "topup_amount": 400, "topup_method": "dana"},
+        ],
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    async with app_container.unit_of_work() as session:
+        saldo = await (await app_container.saldo_repository(session)).find_by_user_id(1)
+    assert saldo.total_balance == 300
+    assert saldo.version == 1
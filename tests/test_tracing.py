@@ -0,0 +1,101 @@
+from typing import Dict, Tuple
+
+import httpx
+import pytest
+
+# Tracing is an optional extra
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import ReadableSpan  # noqa: E402
+from opentelemetry.trace import SpanKind, StatusCode  # noqa: E402
+
+from core.settings.app import AppSettings  # noqa: E402
+
+pytestmark = pytest.mark.settings(tracing_exporter="memory")
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+async def traced_client(app_container, monkeypatch):
+    """
+    A client for an app built with the tracing middleware, which the module-level app leaves out.
+    """
+    import app as app_module
+
+    settings = AppSettings(tracing_exporter="memory")
+    monkeypatch.setattr(app_module, "get_app_settings", lambda: settings)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app_module.create_app()), base_url="http://test"
+    ) as client:
+        yield client
+
+
+def _spans(app_container) -> Tuple[Dict[str, ReadableSpan], Tuple[ReadableSpan, ...]]:
+    spans = app_container.span_exporter.get_finished_spans()
+    return {span.name: span for span in spans}, spans
+
+
+async def test_transfer_is_traced_from_request_to_sql(traced_client, auth_headers, create_users, app_container):
+    await create_users(2, balance=1000)
+    app_container.span_exporter.clear()
+
+    response = await traced_client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200, response.text
+
+    by_name, spans = _spans(app_container)
+    request = by_name["POST /api/transfer/"]
+    service = by_name["TransferService.create_transfer"]
+    repository = by_name["TransferRepository.execute_transfer"]
+    statements = [span for span in spans if "db.statement" in span.attributes]
+
+    assert request.kind == SpanKind.SERVER
+    assert request.attributes["http.route"] == "/api/transfer/"
+    assert request.attributes["http.response.status_code"] == 200
+    assert service.parent.span_id == request.context.span_id
+    assert repository.parent.span_id == service.context.span_id
+    assert "LedgerRepository.record" in by_name
+    assert "OutboxRepository.add" in by_name
+
+    # Statements are children of the repository call that issued them
+    transfer_statements = [span for span in statements if span.parent.span_id == repository.context.span_id]
+    assert any("UPDATE saldo" in span.attributes["db.statement"] for span in transfer_statements)
+    assert all(span.attributes["db.system"] == "postgresql" for span in statements)
+    assert {span.context.trace_id for span in spans} == {request.context.trace_id}
+
+
+async def test_failed_transfer_marks_service_span(traced_client, auth_headers, create_users, app_container):
+    await create_users(2, balance=100)
+    app_container.span_exporter.clear()
+
+    response = await traced_client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+    assert response.status_code >= 400
+
+    by_name, _ = _spans(app_container)
+    assert by_name["TransferService.create_transfer"].status.status_code == StatusCode.ERROR
+
+
+async def test_request_continues_callers_trace(traced_client, auth_headers, create_users, app_container):
+    await create_users(1, balance=100)
+    app_container.span_exporter.clear()
+
+    response = await traced_client.get(
+        "/api/saldo/user/1",
+        headers={**auth_headers(1), "traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"},
+    )
+    assert response.status_code == 200, response.text
+
+    by_name, spans = _spans(app_container)
+    request = by_name["GET /api/saldo/user/{user_id}"]
+    assert format(request.context.trace_id, "032x") == TRACE_ID
+    assert request.parent.span_id == 0x00F067AA0BA902B7
+    assert "SaldoRepository.find_by_user_id" in by_name
+    assert {span.context.trace_id for span in spans} == {request.context.trace_id}
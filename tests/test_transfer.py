@@ -0,0 +1,106 @@
+async def test_create_transfer_moves_balances(client, auth_headers, create_users, balance_of):
+    await create_users(2, balance=1000)
+
+    response = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert data["transfer_from"] == 1
+    assert data["transfer_to"] == 2
+    assert data["tranfer_amount"] == 300
+    assert await balance_of(1) == 700
+    assert await balance_of(2) == 1300
+
+
+async def test_create_transfer_rejects_non_positive_amount(client, auth_headers, create_users, balance_of):
+    await create_users(2, balance=1000)
+
+    for amount in (0, -500):
+        response = await client.post(
+            "/api/transfer/",
+            json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": amount},
+            headers=auth_headers(1),
+        )
+        assert response.status_code >= 400
+        assert "positive" in response.json()["detail"]
+
+    assert await balance_of(1) == 1000
+    assert await balance_of(2) == 1000
+
+
+async def test_create_transfer_rolls_back_on_insufficient_balance(
+    client, auth_headers, create_users, balance_of
+):
+    await create_users(2, balance=100)
+
+    response = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code >= 400
+    assert await balance_of(1) == 100
+    assert await balance_of(2) == 100
+
+
+async def test_create_transfer_batch_applies_each_valid_item(
+    client, auth_headers, create_users, balance_of, app_container
+):
+    await create_users(3, balance=1000)
+
+    response = await client.post(
+        "/api/transfer/batch",
+        json=[
+            {"transfer_from": 1, "transfer_to": 2, "transfer_amount": 100},
+            {"transfer_from": 2, "transfer_to": 3, "transfer_amount": -50},
+            {"transfer_from": 3, "transfer_to": 1, "transfer_amount": 5000},
+            {"transfer_from": 2, "transfer_to": 3, "transfer_amount": 200},
+        ],
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    items = response.json()["data"]
+    assert [item["status"] for item in items] == ["success", "error", "error", "success"]
+    assert items[0]["data"]["tranfer_amount"] == 100
+    assert "positive" in items[1]["message"]
+    assert await balance_of(1) == 900
+    assert await balance_of(2) == 900
+    assert await balance_of(3) == 1200
+
+
+async def test_update_transfer_moves_the_difference(client, auth_headers, create_users, balance_of):
+    await create_users(2, balance=1000)
+    created = await client.post(
+        "/api/transfer/",
+        json={"transfer_from": 1, "transfer_to": 2, "transfer_amount": 300},
+        headers=auth_headers(1),
+    )
+    transfer_id = created.json()["data"]["transfer_id"]
+
+    response = await client.put(
+        f"/api/transfer/{transfer_id}",
+        json={"transfer_id": transfer_id, "transfer_from": 1, "transfer_to": 2, "transfer_amount": 500},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["tranfer_amount"] == 500
+    assert await balance_of(1) == 500
+    assert await balance_of(2) == 1500
+
+    # Lowering the amount gives the difference back
+    response = await client.put(
+        f"/api/transfer/{transfer_id}",
+        json={"transfer_id": transfer_id, "transfer_from": 1, "transfer_to": 2, "transfer_amount": 100},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    assert await balance_of(1) == 900
+    assert await balance_of(2) == 1100
@@ -0,0 +1,56 @@
+async def test_create_withdraw_debits_saldo(client, auth_headers, create_users, balance_of):
+    await create_users(1, balance=1000)
+
+    response = await client.post(
+        "/api/withdraw/",
+        json={"user_id": 1, "withdraw_amount": 400, "withdraw_time": "2026-10-01T10:00:00"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["withdraw_amount"] == 400
+    assert await balance_of(1) == 600
+
+
+async def test_create_withdraw_rejects_non_positive_amount(client, auth_headers, create_users, balance_of):
+    await create_users(1, balance=1000)
+
+    response = await client.post(
+        "/api/withdraw/",
+        json={"user_id": 1, "withdraw_amount": -400, "withdraw_time": "2026-10-01T10:00:00"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code >= 400
+    assert await balance_of(1) == 1000
+
+
+async def test_create_withdraw_batch(client, auth_headers, create_users, balance_of, app_container):
+    await create_users(3, balance=1000)
+    time = "2026-10-01T10:00:00"
+
+    response = await client.post(
+        "/api/withdraw/batch",
+        json=[
+            {"user_id": 1, "withdraw_amount": 300, "withdraw_time": time},
+            {"user_id": 1, "withdraw_amount": 200, "withdraw_time": time},
+            {"user_id": 2, "withdraw_amount": -500, "withdraw_time": time},
+            {"user_id": 3, "withdraw_amount": 800, "withdraw_time": time},
+            {"user_id": 3, "withdraw_amount": 800, "withdraw_time": time},
+        ],
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200, response.text
+    items = response.json()["data"]
+    assert [item["status"] for item in items] == ["success", "success", "error", "error", "error"]
+    assert items[0]["data"]["withdraw_amount"] == 300
+    assert "positive" in items[2]["message"]
+    assert await balance_of(1) == 500
+    assert await balance_of(2) == 1000
+    assert await balance_of(3) == 1000
+
+    async with app_container.unit_of_work() as session:
+        saldo = await (await app_container.saldo_repository(session)).find_by_user_id(1)
+    assert saldo.withdraw_amount == 200
+    assert saldo.version == 1